@@ -7,7 +7,7 @@ from rest_framework.views import APIView
 
 from .forms import ProfileForm, UserRegistrationForm
 from .models import FreelancerProfile
-from .utils import rate_limit
+from .ratelimit import rate_limited
 
 
 def _session_payload(request):
@@ -53,10 +53,8 @@ class SessionMeAPIView(APIView):
 class SessionLoginAPIView(APIView):
     permission_classes = [AllowAny]
 
+    @rate_limited("api_login", limit=10, window_seconds=300, message="Too many login attempts. Please wait a few minutes.")
     def post(self, request):
-        if not rate_limit(request, scope="api_login", limit=10, window_seconds=300):
-            return Response({"detail": "Too many login attempts. Please wait a few minutes."}, status=429)
-
         phone_number = (request.data.get("phone_number") or "").strip()
         password = request.data.get("password") or ""
         if not phone_number or not password:
@@ -83,10 +81,8 @@ class SessionLogoutAPIView(APIView):
 class SessionRegisterAPIView(APIView):
     permission_classes = [AllowAny]
 
+    @rate_limited("api_register", limit=5, window_seconds=900, message="Too many sign-up attempts. Please try again later.")
     def post(self, request):
-        if not rate_limit(request, scope="api_register", limit=5, window_seconds=900):
-            return Response({"detail": "Too many sign-up attempts. Please try again later."}, status=429)
-
         form = UserRegistrationForm(data=request.data)
         if not form.is_valid():
             return Response({"errors": form.errors}, status=400)
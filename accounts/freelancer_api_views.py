@@ -1,10 +1,14 @@
 from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from config.pagination import paginate
+
+from .freelancer_search import filter_profiles
 from .models import (
     FreelancerFlair,
     FreelancerProfile,
@@ -45,7 +49,7 @@ def _serialize_service(service: FreelancerServiceOffering):
 
 
 def _serialize_public_profile(profile: FreelancerProfile):
-    services = profile.services.filter(is_active=True).order_by("sort_order", "id")
+    # Expects a profile loaded through _with_profile_relations (active_services is prefetched).
     return {
         "id": profile.id,
         "public_slug": profile.public_slug,
@@ -60,7 +64,7 @@ def _serialize_public_profile(profile: FreelancerProfile):
         "specialties": [_serialize_specialty(item) for item in profile.specialties.all()],
         "custom_specialties": profile.custom_specialties or [],
         "flairs": [_serialize_flair(item) for item in profile.flairs.all()],
-        "services": [_serialize_service(item) for item in services],
+        "services": [_serialize_service(item) for item in profile.active_services],
     }
 
 
@@ -75,20 +79,29 @@ def _serialize_owner_profile(profile: FreelancerProfile):
     }
 
 
+def _with_profile_relations(profiles):
+    """
+    Loads everything the profile serializers read, in a fixed number of queries per page.
+    """
+    return profiles.select_related("user").prefetch_related(
+        Prefetch("specialties", queryset=FreelancerSpecialtyTag.objects.order_by("sort_order", "name")),
+        Prefetch("flairs", queryset=FreelancerFlair.objects.order_by("sort_order", "name")),
+        Prefetch(
+            "services",
+            queryset=FreelancerServiceOffering.objects.filter(is_active=True).order_by("sort_order", "id"),
+            to_attr="active_services",
+        ),
+    )
+
+
 def _profile_queryset():
-    return (
+    return _with_profile_relations(
         FreelancerProfile.objects.filter(status=FreelancerProfile.Status.PUBLISHED, is_public=True)
-        .select_related("user")
-        .prefetch_related("specialties", "flairs", "services")
-        .distinct()
-    )
+    ).distinct()
 
 
-def _safe_int(value, default):
-    try:
-        return int(value)
-    except (TypeError, ValueError):
-        return default
+def _load_owner_profile(profile):
+    return _with_profile_relations(FreelancerProfile.objects.filter(pk=profile.pk)).get()
 
 
 def _ensure_profile(user):
@@ -107,6 +120,9 @@ def _ensure_profile(user):
     return profile
 
 
+PROFILE_LIST_ORDERING = ("-updated_at", "-id")
+
+
 class PublicFreelancersAPIView(APIView):
     permission_classes = [AllowAny]
 
@@ -116,8 +132,6 @@ class PublicFreelancersAPIView(APIView):
         flair_slug = (request.query_params.get("flair") or "").strip()
         work_type = (request.query_params.get("work_type") or "").strip()
         city = (request.query_params.get("city") or "").strip()
-        page = max(_safe_int(request.query_params.get("page"), 1), 1)
-        page_size = min(max(_safe_int(request.query_params.get("page_size"), 12), 1), 100)
 
         profiles = _profile_queryset()
         if tag_slug:
@@ -126,38 +140,10 @@ class PublicFreelancersAPIView(APIView):
             profiles = profiles.filter(flairs__slug=flair_slug)
         if city:
             profiles = profiles.filter(city__icontains=city)
+        profiles = filter_profiles(profiles, query=query, work_type=work_type)
 
-        profile_list = list(profiles)
-        if query:
-            query_cf = query.casefold()
-            profile_list = [
-                profile
-                for profile in profile_list
-                if any(
-                    query_cf in value.casefold()
-                    for value in [
-                        profile.user.full_name or "",
-                        profile.headline or "",
-                        profile.introduction or "",
-                        profile.public_slug or "",
-                    ]
-                )
-                or any(query_cf in item.casefold() for item in (profile.custom_specialties or []))
-            ]
-        if work_type:
-            profile_list = [profile for profile in profile_list if work_type in (profile.work_types or [])]
-
-        total = len(profile_list)
-        offset = (page - 1) * page_size
-        chunk = profile_list[offset : offset + page_size]
-        return Response(
-            {
-                "count": total,
-                "page": page,
-                "page_size": page_size,
-                "results": [_serialize_public_profile(profile) for profile in chunk],
-            }
-        )
+        chunk, meta = paginate(request, profiles, PROFILE_LIST_ORDERING, default_page_size=12)
+        return Response({**meta, "results": [_serialize_public_profile(profile) for profile in chunk]})
 
 
 class PublicFreelancerSpecialtiesAPIView(APIView):
@@ -189,8 +175,7 @@ class OwnerFreelancerProfileAPIView(APIView):
 
     def get(self, request):
         profile = _ensure_profile(request.user)
-        profile.refresh_from_db()
-        return Response({"profile": _serialize_owner_profile(profile)})
+        return Response({"profile": _serialize_owner_profile(_load_owner_profile(profile))})
 
     def patch(self, request):
         profile = _ensure_profile(request.user)
@@ -232,8 +217,7 @@ class OwnerFreelancerProfileAPIView(APIView):
             profile.status = FreelancerProfile.Status.DRAFT
             profile.save(update_fields=["status", "updated_at"])
 
-        profile.refresh_from_db()
-        return Response({"profile": _serialize_owner_profile(profile)})
+        return Response({"profile": _serialize_owner_profile(_load_owner_profile(profile))})
 
 
 class OwnerFreelancerSubmitAPIView(APIView):
@@ -252,7 +236,7 @@ class OwnerFreelancerSubmitAPIView(APIView):
         profile.status = FreelancerProfile.Status.PENDING_APPROVAL
         profile.moderation_note = ""
         profile.save(update_fields=["status", "moderation_note", "updated_at"])
-        return Response({"profile": _serialize_owner_profile(profile)})
+        return Response({"profile": _serialize_owner_profile(_load_owner_profile(profile))})
 
 
 class OwnerFreelancerSpecialtiesAPIView(APIView):
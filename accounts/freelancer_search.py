@@ -0,0 +1,59 @@
+"""
+Database-side filtering for the public freelancer directory.
+
+Each profile keeps a normalized ``search_document`` (name, headline, introduction, slug, custom
+and tagged specialties). It is refreshed by accounts.signals whenever one of those sources
+changes, so ``q`` is a single indexed substring match (pg_trgm GIN on PostgreSQL).
+"""
+
+from django.db import connection
+
+from .models import FreelancerProfile
+from .utils import normalize_search_text
+
+
+def build_profile_search_document(profile):
+    parts = [
+        profile.user.full_name,
+        profile.headline,
+        profile.introduction,
+        profile.public_slug,
+        *(item for item in (profile.custom_specialties or []) if isinstance(item, str)),
+        *(tag.name for tag in profile.specialties.all()),
+    ]
+    return normalize_search_text(" ".join(part for part in parts if part))
+
+
+def refresh_profile_search_documents(profile_ids):
+    """
+    Rebuilds the documents of the given profiles, writing only those that changed.
+    """
+    profiles = list(
+        FreelancerProfile.objects.filter(id__in=set(profile_ids)).select_related("user").prefetch_related("specialties")
+    )
+    changed = []
+    for profile in profiles:
+        document = build_profile_search_document(profile)
+        if profile.search_document != document:
+            profile.search_document = document
+            changed.append(profile)
+    if changed:
+        # bulk_update leaves updated_at alone: a reindex is not a profile edit.
+        FreelancerProfile.objects.bulk_update(changed, ["search_document"])
+    return len(changed)
+
+
+def filter_profiles(profiles, query="", work_type=""):
+    query = normalize_search_text(query)
+    if query:
+        profiles = profiles.filter(search_document__contains=query)
+    if work_type:
+        if work_type not in FreelancerProfile.WorkType.values:
+            return profiles.none()
+        if connection.features.supports_json_field_contains:
+            # jsonb @> uses the GIN index on work_types.
+            profiles = profiles.filter(work_types__contains=[work_type])
+        else:
+            # No JSON containment (SQLite): match the quoted slug in the list's JSON text.
+            profiles = profiles.filter(work_types__icontains=f'"{work_type}"')
+    return profiles
@@ -0,0 +1,110 @@
+"""Idempotency-Key support for retry-safe write endpoints."""
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyRecord
+from .utils import _client_identifier
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_TTL = timedelta(hours=24)
+# A claim whose request never finished (e.g. worker killed) is released after this long.
+IDEMPOTENCY_LOCK_TIMEOUT = timedelta(minutes=1)
+MAX_KEY_LENGTH = 64
+
+
+def _request_hash(request):
+    body = json.dumps(request.data, sort_keys=True, cls=JSONEncoder)
+    return hashlib.sha256(f"{request.method}:{request.path}:{body}".encode("utf-8")).hexdigest()
+
+
+def _claim(owner, scope, key, request_hash):
+    """
+    Inserts an in-progress record for the key. Returns ``(record, created)``.
+    """
+    now = timezone.now()
+    IdempotencyRecord.objects.filter(owner=owner, scope=scope, key=key, expires_at__lte=now).delete()
+    try:
+        with transaction.atomic():
+            record = IdempotencyRecord.objects.create(
+                owner=owner,
+                scope=scope,
+                key=key,
+                request_hash=request_hash,
+                expires_at=now + IDEMPOTENCY_LOCK_TIMEOUT,
+            )
+        return record, True
+    except IntegrityError:
+        return IdempotencyRecord.objects.filter(owner=owner, scope=scope, key=key).first(), False
+
+
+def idempotent(scope):
+    """
+    Decorator for APIView handlers. Requests carrying an ``Idempotency-Key`` header run once per
+    key; retries within the TTL get the stored response (marked ``Idempotent-Replayed: true``)
+    without running the handler. Only successful responses are stored, so failed attempts can
+    be retried with the same key.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            key = (request.headers.get(IDEMPOTENCY_HEADER) or "").strip()
+            if not key:
+                return handler(view, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {"detail": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            request_hash = _request_hash(request)
+            record, created = _claim(_client_identifier(request), scope, key, request_hash)
+            if not created:
+                if record is None:
+                    return Response(
+                        {"detail": "Could not reserve the idempotency key, please retry."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                if record.request_hash != request_hash:
+                    return Response(
+                        {"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request."},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    )
+                if record.status_code is None:
+                    return Response(
+                        {"detail": "A request with this Idempotency-Key is still being processed."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                return Response(
+                    record.response_body,
+                    status=record.status_code,
+                    headers={"Idempotent-Replayed": "true"},
+                )
+
+            try:
+                response = handler(view, request, *args, **kwargs)
+            except Exception:
+                record.delete()
+                raise
+
+            if 200 <= response.status_code < 300 and hasattr(response, "data"):
+                record.status_code = response.status_code
+                record.response_body = json.loads(json.dumps(response.data, cls=JSONEncoder))
+                record.expires_at = timezone.now() + IDEMPOTENCY_TTL
+                record.save(update_fields=["status_code", "response_body", "expires_at"])
+            else:
+                record.delete()
+            return response
+
+        return wrapper
+
+    return decorator
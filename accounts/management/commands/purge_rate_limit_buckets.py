@@ -0,0 +1,13 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import RateLimitBucket
+
+
+class Command(BaseCommand):
+    help = "Deletes rate-limit buckets that have fully drained."
+
+    def handle(self, *args, **options):
+        deleted, _ = RateLimitBucket.objects.filter(tat__lte=time.time()).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} drained rate-limit bucket(s)."))
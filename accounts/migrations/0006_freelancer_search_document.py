@@ -0,0 +1,59 @@
+# Generated by Django 5.2.9 on 2026-10-18 01:11
+
+from django.db import migrations, models
+
+from config.migration_utils import normalize_search_text_v1
+
+
+def _search_document(profile):
+    # Frozen copy of accounts.freelancer_search.build_profile_search_document.
+    parts = [
+        profile.user.full_name,
+        profile.headline,
+        profile.introduction,
+        profile.public_slug,
+        *(item for item in (profile.custom_specialties or []) if isinstance(item, str)),
+        *(tag.name for tag in profile.specialties.all()),
+    ]
+    return normalize_search_text_v1(' '.join(part for part in parts if part))
+
+
+def backfill_and_index(apps, schema_editor):
+    FreelancerProfile = apps.get_model('accounts', 'FreelancerProfile')
+    profiles = list(FreelancerProfile.objects.select_related('user').prefetch_related('specialties'))
+    for profile in profiles:
+        profile.search_document = _search_document(profile)
+    FreelancerProfile.objects.bulk_update(profiles, ['search_document'], batch_size=200)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        # Trigram GIN serves the substring match on search_document; jsonb GIN serves work_types @> [...].
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX accounts_freelancer_search_trgm ON accounts_freelancerprofile '
+            'USING gin (search_document gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX accounts_freelancer_work_types_gin ON accounts_freelancerprofile USING gin (work_types)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS accounts_freelancer_search_trgm')
+        schema_editor.execute('DROP INDEX IF EXISTS accounts_freelancer_work_types_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_idempotencyrecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='freelancerprofile',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(backfill_and_index, drop_indexes),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-18 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_ratelimitbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('namespace', models.CharField(max_length=64, unique=True)),
+                ('version', models.BigIntegerField()),
+            ],
+        ),
+    ]
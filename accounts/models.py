@@ -6,6 +6,8 @@ from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
 
+from . import roles
+
 def validate_iranian_national_id(national_id: str) -> bool:
     """Validates an Iranian National ID (Code Melli)."""
     if not re.match(r'^\d{10}$', national_id):
@@ -66,17 +68,21 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.phone_number
 
+    @property
+    def role_names(self):
+        return roles.get_role_names(self)
+
     @property
     def is_admin(self):
-        return self.is_superuser or self.groups.filter(name='Admin').exists()
+        return self.is_superuser or roles.has_any_role(self, roles.ADMIN)
 
     @property
     def is_barista(self):
-        return self.groups.filter(name='Barista').exists()
+        return roles.has_any_role(self, roles.BARISTA)
 
     @property
     def is_customer(self):
-        return self.groups.filter(name='Customer').exists()
+        return roles.has_any_role(self, roles.CUSTOMER)
 
 
 class FreelancerSpecialtyTag(models.Model):
@@ -142,6 +148,8 @@ class FreelancerProfile(models.Model):
     custom_specialties = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Normalized text for the directory search; maintained by accounts.signals.
+    search_document = models.TextField(blank=True, editable=False)
 
     class Meta:
         ordering = ["-updated_at"]
@@ -211,3 +219,45 @@ class FreelancerServiceOffering(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class IdempotencyRecord(models.Model):
+    """Outcome of a write request replayed for retries carrying the same Idempotency-Key."""
+
+    owner = models.CharField(max_length=64)
+    scope = models.CharField(max_length=64)
+    key = models.CharField(max_length=64)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "scope", "key"], name="unique_idempotency_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}"
+
+
+class RateLimitBucket(models.Model):
+    """Rate-limit state for one client and scope; used by the database rate-limit store."""
+
+    key = models.CharField(max_length=160, unique=True)
+    # GCRA "theoretical arrival time" as a UNIX timestamp; the bucket is empty once it is past.
+    tat = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return self.key
+
+
+class CacheVersion(models.Model):
+    """Version counter for one cache namespace (see config.cache_versions); shared by all workers."""
+
+    namespace = models.CharField(max_length=64, unique=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.namespace}@{self.version}"
@@ -0,0 +1,140 @@
+"""
+Shared rate limiting for the API.
+
+Limits use GCRA, a token bucket kept as a single timestamp (the "theoretical arrival time"): a
+client may send ``limit`` requests in a burst and then one every ``window / limit`` seconds, with
+no 2x burst at window edges. The backend is picked with the ``RATE_LIMIT_STORE`` setting:
+
+* ``database`` (default): one ``RateLimitBucket`` row per client and scope, advanced by a single
+  conditional UPDATE, so the limit holds across workers and hosts.
+* ``memory``: an in-process dict; single-process/dev only.
+
+Views apply a limit with the ``rate_limited`` handler decorator or a ``RateLimitThrottle``
+subclass in ``throttle_classes``.
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+
+from config.backends import build_backend
+
+from .models import RateLimitBucket
+from .utils import _client_identifier
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    retry_after: int = 0
+
+
+class BaseRateLimitStore:
+    def hit(self, key, limit, window_seconds, now=None):
+        """Counts one request against ``key``; returns a RateLimitResult."""
+        raise NotImplementedError
+
+
+def _retry_after(tat, now, window_seconds, interval):
+    return max(1, math.ceil(tat - (now + window_seconds - interval)))
+
+
+class DatabaseRateLimitStore(BaseRateLimitStore):
+    def hit(self, key, limit, window_seconds, now=None):
+        now = time.time() if now is None else now
+        interval = window_seconds / limit
+        bucket = RateLimitBucket.objects.filter(key=key)
+        # Allowed while the bucket is at most ``window - interval`` ahead of now; the check and
+        # the increment are one UPDATE, so concurrent workers cannot both take the last slot.
+        if bucket.filter(tat__lte=now + window_seconds - interval).update(
+            tat=Greatest(F("tat"), Value(now)) + interval
+        ):
+            return RateLimitResult(True)
+        tat = bucket.values_list("tat", flat=True).first()
+        if tat is None:
+            try:
+                with transaction.atomic():
+                    RateLimitBucket.objects.create(key=key, tat=now + interval)
+                return RateLimitResult(True)
+            except IntegrityError:
+                # A concurrent request created the bucket first; count against it instead.
+                return self.hit(key, limit, window_seconds, now)
+        return RateLimitResult(False, _retry_after(tat, now, window_seconds, interval))
+
+
+class LocalRateLimitStore(BaseRateLimitStore):
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window_seconds, now=None):
+        now = time.time() if now is None else now
+        interval = window_seconds / limit
+        with self._lock:
+            tat = self._buckets.get(key, now)
+            if tat > now + window_seconds - interval:
+                return RateLimitResult(False, _retry_after(tat, now, window_seconds, interval))
+            self._buckets[key] = max(tat, now) + interval
+            return RateLimitResult(True)
+
+
+@lru_cache(maxsize=None)
+def get_rate_limit_store():
+    return build_backend(
+        "RATE_LIMIT_STORE", "database", {"database": DatabaseRateLimitStore, "memory": LocalRateLimitStore}
+    )
+
+
+def check_rate_limit(request, scope, limit, window_seconds):
+    key = f"{scope}:{_client_identifier(request)}"
+    return get_rate_limit_store().hit(key, limit, window_seconds)
+
+
+def rate_limited(scope, limit, window_seconds, message="Too many requests. Please try again later."):
+    """
+    Decorator for APIView handlers: over the limit, responds 429 with ``Retry-After`` without
+    running the handler.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            result = check_rate_limit(request, scope, limit, window_seconds)
+            if not result.allowed:
+                return Response(
+                    {"detail": message},
+                    status=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={"Retry-After": str(result.retry_after)},
+                )
+            return handler(view, request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    DRF throttle over check_rate_limit, for views that set ``throttle_classes``. Subclasses set
+    ``scope``, ``limit`` and ``window_seconds``; DRF turns ``wait()`` into the 429's Retry-After.
+    """
+
+    scope = None
+    limit = None
+    window_seconds = None
+
+    def allow_request(self, request, view):
+        self.result = check_rate_limit(request, self.scope, self.limit, self.window_seconds)
+        return self.result.allowed
+
+    def wait(self):
+        return self.result.retry_after
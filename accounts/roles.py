@@ -0,0 +1,40 @@
+"""
+Role resolution for CustomUser.
+
+A user's roles are the names of their groups. They are read once per user instance (request.user
+lives for a single request), or taken from ``prefetch_related("groups")`` when listing users, and
+dropped from the instance when its groups change (see accounts.signals).
+"""
+
+ADMIN = "Admin"
+BARISTA = "Barista"
+CUSTOMER = "Customer"
+
+_CACHE_ATTR = "_role_names"
+
+
+def get_role_names(user):
+    names = getattr(user, _CACHE_ATTR, None)
+    if names is None:
+        prefetched = getattr(user, "_prefetched_objects_cache", {}).get("groups")
+        if prefetched is not None:
+            names = frozenset(group.name for group in prefetched)
+        else:
+            names = frozenset(user.groups.values_list("name", flat=True))
+        setattr(user, _CACHE_ATTR, names)
+    return names
+
+
+def has_any_role(user, *names):
+    return not get_role_names(user).isdisjoint(names)
+
+
+def clear_role_cache(user):
+    user.__dict__.pop(_CACHE_ATTR, None)
+
+
+def with_roles(users):
+    """
+    Prefetches groups so role checks on the listed users run no further queries.
+    """
+    return users.prefetch_related("groups")
@@ -0,0 +1,51 @@
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from .freelancer_search import refresh_profile_search_documents
+from .models import CustomUser, FreelancerProfile, FreelancerSpecialtyTag
+from .roles import clear_role_cache
+
+
+@receiver(post_save, sender=FreelancerProfile)
+def reindex_profile_on_save(sender, instance, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and set(update_fields) <= {"search_document"}:
+        return
+    refresh_profile_search_documents([instance.pk])
+
+
+@receiver(m2m_changed, sender=FreelancerProfile.specialties.through)
+def reindex_profile_on_specialty_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in {"post_add", "post_remove", "post_clear"}:
+            refresh_profile_search_documents([instance.pk])
+        return
+    # Changed from the tag side: pk_set holds profile ids, except for clear().
+    if action == "pre_clear":
+        instance._cleared_profile_ids = list(instance.profiles.values_list("id", flat=True))
+    elif action == "post_clear":
+        refresh_profile_search_documents(getattr(instance, "_cleared_profile_ids", []))
+    elif action in {"post_add", "post_remove"}:
+        refresh_profile_search_documents(pk_set or [])
+
+
+@receiver(post_save, sender=FreelancerSpecialtyTag)
+def reindex_profiles_on_tag_change(sender, instance, created, **kwargs):
+    if not created:
+        refresh_profile_search_documents(instance.profiles.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=CustomUser)
+def reindex_profile_on_name_change(sender, instance, created, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if created or (update_fields is not None and "full_name" not in update_fields):
+        return
+    refresh_profile_search_documents(FreelancerProfile.objects.filter(user=instance).values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def clear_roles_on_group_change(sender, instance, action, reverse, **kwargs):
+    # Only the changed user instance can be reached; other loaded copies keep their roles
+    # until they are reloaded, which for request.user means the next request.
+    if not reverse and action in {"post_add", "post_remove", "post_clear"}:
+        clear_role_cache(instance)
@@ -2,6 +2,7 @@ from django.urls import path
 
 from .staff_api_views import (
     StaffAnalyticsOverviewAPIView,
+    StaffAnalyticsTimeseriesAPIView,
     StaffUserRoleAPIView,
     StaffUserStatusAPIView,
     StaffUsersAPIView,
@@ -11,6 +12,7 @@ app_name = "staff_api"
 
 urlpatterns = [
     path("analytics/overview/", StaffAnalyticsOverviewAPIView.as_view(), name="analytics_overview"),
+    path("analytics/timeseries/", StaffAnalyticsTimeseriesAPIView.as_view(), name="analytics_timeseries"),
     path("users/", StaffUsersAPIView.as_view(), name="users"),
     path("users/<int:user_id>/status/", StaffUserStatusAPIView.as_view(), name="user_status"),
     path("users/<int:user_id>/role/", StaffUserRoleAPIView.as_view(), name="user_role"),
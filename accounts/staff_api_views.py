@@ -1,5 +1,7 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import Group
-from django.db.models import Count, Q, Sum
+from django.db.models import Q, Sum
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import status
@@ -8,7 +10,11 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from accounts.models import CustomUser
-from cafe.models import CafeOrder, OrderItem
+from accounts.roles import with_roles
+from accounts.utils import parse_jalali_date
+from analytics.models import CafeDailyCustomerSpend, CafeDailyItemSales, CafeDailySales, CoworkDailyMemberRevenue
+from analytics.timeseries import BUCKETS, MAX_TIMESERIES_DAYS, METRICS, jalali_today, timeseries
+from config.pagination import paginate
 from cowork.models import Booking, Space
 
 
@@ -46,36 +52,32 @@ class StaffAnalyticsOverviewAPIView(APIView):
     permission_classes = [StaffPermission]
 
     def get(self, request):
-        now = timezone.now()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        today = timezone.localdate()
 
-        cafe_total = CafeOrder.objects.filter(is_paid=True).aggregate(total=Sum("total_price"))["total"] or 0
-        cafe_today = (
-            CafeOrder.objects.filter(is_paid=True, created_at__gte=today_start).aggregate(total=Sum("total_price"))["total"] or 0
-        )
+        # History comes from the daily rollups (analytics.rollups), not the order/booking tables.
+        cafe_total = CafeDailySales.objects.aggregate(total=Sum("paid_revenue"))["total"] or 0
+        cafe_today = CafeDailySales.objects.filter(day=today).values_list("paid_revenue", flat=True).first() or 0
         top_items = (
-            OrderItem.objects.values("menu_item__name")
-            .annotate(total_qty=Sum("quantity"), total_rev=Sum("unit_price"))
+            CafeDailyItemSales.objects.values("menu_item__name")
+            .annotate(total_qty=Sum("quantity"), total_rev=Sum("revenue"))
             .order_by("-total_qty")[:5]
         )
         top_cafe_buyers = (
-            CafeOrder.objects.filter(is_paid=True, user__isnull=False)
-            .values("user__phone_number", "user__full_name")
-            .annotate(total_spent=Sum("total_price"))
+            CafeDailyCustomerSpend.objects.values("user__phone_number", "user__full_name")
+            .annotate(total_spent=Sum("spent"))
             .order_by("-total_spent")[:5]
         )
-        cowork_total = Booking.objects.filter(status=Booking.Status.CONFIRMED).aggregate(total=Sum("price_charged"))["total"] or 0
+        cowork_total = CoworkDailyMemberRevenue.objects.aggregate(total=Sum("revenue"))["total"] or 0
         total_spaces = Space.objects.filter(is_active=True).count()
         active_bookings = Booking.objects.filter(
             status=Booking.Status.CONFIRMED,
-            start_time__lte=now,
-            end_time__gte=now,
+            start_time__lte=today,
+            end_time__gte=today,
         ).count()
         occupancy_rate = int((active_bookings / total_spaces) * 100) if total_spaces else 0
         top_cowork_members = (
-            Booking.objects.filter(status=Booking.Status.CONFIRMED)
-            .values("user__phone_number", "user__full_name")
-            .annotate(total_spent=Sum("price_charged"), total_bookings=Count("id"))
+            CoworkDailyMemberRevenue.objects.values("user__phone_number", "user__full_name")
+            .annotate(total_spent=Sum("revenue"), total_bookings=Sum("booking_count"))
             .order_by("-total_spent")[:5]
         )
         return Response(
@@ -93,16 +95,70 @@ class StaffAnalyticsOverviewAPIView(APIView):
         )
 
 
+DEFAULT_TIMESERIES_DAYS = 30
+
+
+class StaffAnalyticsTimeseriesAPIView(APIView):
+    """
+    ``?metric=cafe_revenue&from=1405-01-01&to=1405-03-31&bucket=day|week|month`` over the daily
+    rollups; dates are Jalali and inclusive, ``to`` defaults to today and ``from`` to 30 days
+    before it.
+    """
+
+    permission_classes = [StaffPermission]
+
+    def get(self, request):
+        params = request.query_params
+        metric = params.get("metric") or "cafe_revenue"
+        bucket = params.get("bucket") or "day"
+        if metric not in METRICS:
+            return Response(
+                {"detail": f"metric must be one of: {', '.join(METRICS)}."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if bucket not in BUCKETS:
+            return Response(
+                {"detail": f"bucket must be one of: {', '.join(BUCKETS)}."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        last_day = parse_jalali_date(params["to"]) if params.get("to") else jalali_today()
+        if params.get("from"):
+            first_day = parse_jalali_date(params["from"])
+        else:
+            first_day = last_day and last_day - timedelta(days=DEFAULT_TIMESERIES_DAYS - 1)
+        if not first_day or not last_day:
+            return Response({"detail": "from and to must be dates (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+        if last_day < first_day:
+            return Response({"detail": "to must not be before from."}, status=status.HTTP_400_BAD_REQUEST)
+        if (last_day - first_day).days >= MAX_TIMESERIES_DAYS:
+            return Response(
+                {"detail": f"The range can cover at most {MAX_TIMESERIES_DAYS} days."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        series = timeseries(metric, first_day, last_day, bucket)
+        return Response(
+            {
+                "metric": metric,
+                "bucket": bucket,
+                "from": first_day.strftime("%Y-%m-%d"),
+                "to": last_day.strftime("%Y-%m-%d"),
+                "total": int(sum(value for _, _, value in series)),
+                "results": [
+                    {"start": start.strftime("%Y-%m-%d"), "end": end.strftime("%Y-%m-%d"), "value": int(value)}
+                    for start, end, value in series
+                ],
+            }
+        )
+
+
 class StaffUsersAPIView(APIView):
     permission_classes = [AdminPermission]
 
     def get(self, request):
-        users = CustomUser.objects.order_by("id")
+        users = with_roles(CustomUser.objects.order_by("id"))
         query = (request.query_params.get("q") or "").strip()
         role = (request.query_params.get("role") or "").strip()
         is_active = (request.query_params.get("is_active") or "").strip()
-        page = max(int(request.query_params.get("page", 1)), 1)
-        page_size = min(max(int(request.query_params.get("page_size", 25)), 1), 100)
 
         if query:
             users = users.filter(Q(phone_number__icontains=query) | Q(full_name__icontains=query))
@@ -111,17 +167,8 @@ class StaffUsersAPIView(APIView):
         if is_active in {"true", "false"}:
             users = users.filter(is_active=(is_active == "true"))
 
-        total = users.count()
-        offset = (page - 1) * page_size
-        chunk = users[offset : offset + page_size]
-        return Response(
-            {
-                "count": total,
-                "page": page,
-                "page_size": page_size,
-                "results": [_serialize_user(user) for user in chunk],
-            }
-        )
+        chunk, meta = paginate(request, users, ("id",), default_page_size=25)
+        return Response({**meta, "results": [_serialize_user(user) for user in chunk]})
 
 
 class StaffUserStatusAPIView(APIView):
@@ -112,3 +112,66 @@ class PublicFreelancerAPITests(TestCase):
         missing_response = self.client.get("/api/freelancers/draft-user/")
         self.assertEqual(missing_response.status_code, 404)
 
+    def test_public_list_filters_in_database(self):
+        self.published_profile.custom_specialties = ["طراحي سايت"]
+        self.published_profile.work_types = ["remote"]
+        self.published_profile.save()
+
+        def slugs(params):
+            response = self.client.get("/api/freelancers/", params)
+            self.assertEqual(response.status_code, 200)
+            return [profile["public_slug"] for profile in response.data["results"]]
+
+        self.assertEqual(slugs({"q": "طراحی"}), ["published-user"])
+        self.assertEqual(slugs({"q": "seo expert"}), ["published-user"])
+        self.assertEqual(slugs({"work_type": "remote"}), ["published-user"])
+        self.assertEqual(slugs({"work_type": "onsite"}), [])
+
+    def test_search_document_follows_name_and_specialty_changes(self):
+        analytics = FreelancerSpecialtyTag.objects.create(name="Analytics", slug="analytics")
+        self.published_profile.specialties.add(analytics)
+        self.published_user.full_name = "Renamed Person"
+        self.published_user.save()
+
+        document = FreelancerProfile.objects.get(id=self.published_profile.id).search_document
+        self.assertIn("analytics", document)
+        self.assertIn("renamed person", document)
+
+        analytics.profiles.clear()
+        document = FreelancerProfile.objects.get(id=self.published_profile.id).search_document
+        self.assertNotIn("analytics", document)
+
+    def _add_profiles(self, count):
+        flair = FreelancerFlair.objects.create(name="Verified", slug="verified")
+        for index in range(count):
+            user = UserFactory(phone_number=f"0912333{index:04d}", full_name=f"Freelancer {index}")
+            profile = FreelancerProfile.objects.create(
+                user=user,
+                public_slug=f"freelancer-{index}",
+                headline="Developer",
+                introduction="Intro",
+                status=FreelancerProfile.Status.PUBLISHED,
+                is_public=True,
+            )
+            profile.specialties.add(self.specialty)
+            profile.flairs.add(flair)
+            FreelancerServiceOffering.objects.create(profile=profile, title="Audit", sort_order=2)
+            FreelancerServiceOffering.objects.create(profile=profile, title="Setup", sort_order=1)
+            FreelancerServiceOffering.objects.create(profile=profile, title="Hidden", is_active=False)
+
+    def test_public_list_query_count_does_not_grow_with_page_size(self):
+        self._add_profiles(15)
+        # count + page + specialties + flairs + services, whatever the page size.
+        with self.assertNumQueries(5):
+            response = self.client.get("/api/freelancers/", {"page_size": 16})
+        self.assertEqual(len(response.data["results"]), 16)
+        services = {item["public_slug"]: [s["title"] for s in item["services"]] for item in response.data["results"]}
+        self.assertEqual(services["freelancer-3"], ["Setup", "Audit"])
+        self.assertEqual(services["published-user"], [])
+
+    def test_public_detail_query_count(self):
+        self._add_profiles(1)
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/freelancers/freelancer-0/")
+        self.assertEqual([item["title"] for item in response.data["profile"]["services"]], ["Setup", "Audit"])
+        self.assertEqual(len(response.data["profile"]["flairs"]), 1)
@@ -0,0 +1,78 @@
+from django.test import TestCase
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from .models import RateLimitBucket
+from .ratelimit import DatabaseRateLimitStore, LocalRateLimitStore, RateLimitThrottle
+
+
+class RateLimitStoreTests(TestCase):
+    def setUp(self):
+        self.stores = {"database": DatabaseRateLimitStore(), "memory": LocalRateLimitStore()}
+
+    def test_burst_then_steady_rate_without_window_edge_doubling(self):
+        for name, store in self.stores.items():
+            with self.subTest(store=name):
+                # 3 per 60s: a burst of 3, then one every 20s.
+                results = [store.hit("login:ip:1", 3, 60, now=1000.0) for _ in range(4)]
+                self.assertEqual([result.allowed for result in results], [True, True, True, False])
+                self.assertEqual(results[-1].retry_after, 20)
+
+                self.assertFalse(store.hit("login:ip:1", 3, 60, now=1019.0).allowed)
+                self.assertTrue(store.hit("login:ip:1", 3, 60, now=1020.0).allowed)
+                self.assertFalse(store.hit("login:ip:1", 3, 60, now=1021.0).allowed)
+                self.assertTrue(store.hit("login:ip:2", 3, 60, now=1021.0).allowed)
+
+    def test_bucket_refills_after_the_window(self):
+        for name, store in self.stores.items():
+            with self.subTest(store=name):
+                for _ in range(3):
+                    store.hit("login:ip:1", 3, 60, now=1000.0)
+                results = [store.hit("login:ip:1", 3, 60, now=1060.0) for _ in range(4)]
+                self.assertEqual([result.allowed for result in results], [True, True, True, False])
+
+    def test_database_allowed_hit_is_a_single_update(self):
+        store = self.stores["database"]
+        store.hit("login:ip:1", 3, 60, now=1000.0)
+        with self.assertNumQueries(1):
+            self.assertTrue(store.hit("login:ip:1", 3, 60, now=1000.0).allowed)
+        self.assertEqual(RateLimitBucket.objects.get(key="login:ip:1").tat, 1040.0)
+
+
+class PingThrottle(RateLimitThrottle):
+    scope = "ping"
+    limit = 2
+    window_seconds = 60
+
+
+class PingView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = [PingThrottle]
+
+    def get(self, request):
+        return Response({"ok": True})
+
+
+class RateLimitThrottleTests(TestCase):
+    def test_throttle_class_answers_429_with_retry_after(self):
+        factory = APIRequestFactory()
+        statuses = [PingView.as_view()(factory.get("/ping/")).status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [200, 200, 429])
+        response = PingView.as_view()(factory.get("/ping/"))
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+
+class LoginRateLimitTests(TestCase):
+    def test_login_is_throttled_with_retry_after(self):
+        client = APIClient()
+        payload = {"phone_number": "09120000000", "password": "wrong"}
+        for _ in range(10):
+            self.assertEqual(client.post("/api/auth/login/", payload, format="json").status_code, 400)
+
+        response = client.post("/api/auth/login/", payload, format="json")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.data["detail"], "Too many login attempts. Please wait a few minutes.")
+        self.assertGreater(int(response["Retry-After"]), 0)
@@ -25,3 +25,46 @@ class StaffAnalyticsAPITests(TestCase):
         self.assertIn("cafe_total", response.data)
         self.assertIn("top_items", response.data)
 
+
+class StaffUsersAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = UserFactory()
+        admin_group, _ = Group.objects.get_or_create(name="Admin")
+        self.admin.groups.add(admin_group)
+        UserFactory.create_batch(4)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_users_cursor_pagination_with_count(self):
+        first = self.client.get("/api/staff/users/", {"cursor": "", "page_size": 3, "count": "approx"})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data["count"], 5)
+        second = self.client.get("/api/staff/users/", {"cursor": first.data["next_cursor"], "page_size": 3})
+
+        ids = [user["id"] for user in first.data["results"] + second.data["results"]]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 5)
+        self.assertIsNone(second.data["next_cursor"])
+
+    def test_user_list_resolves_roles_without_per_user_queries(self):
+        barista_group, _ = Group.objects.get_or_create(name="Barista")
+        for user in UserFactory.create_batch(10):
+            user.groups.add(barista_group)
+
+        # permission check (admin roles) + count + page + prefetched groups
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/staff/users/", {"page_size": 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(user["roles"]["is_barista"] for user in response.data["results"]), 10)
+
+    def test_roles_are_read_once_and_dropped_on_group_change(self):
+        user = UserFactory()
+        with self.assertNumQueries(1):
+            self.assertFalse(user.is_barista)
+            self.assertFalse(user.is_customer)
+            self.assertFalse(user.is_admin)
+
+        user.groups.add(Group.objects.get_or_create(name="Barista")[0])
+        self.assertTrue(user.is_barista)
+        user.groups.clear()
+        self.assertFalse(user.is_barista)
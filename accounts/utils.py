@@ -1,7 +1,7 @@
 import re
+
+import jdatetime
 from django.core.exceptions import PermissionDenied
-from django.core.cache import cache
-from time import time
 
 def normalize_digits(text):
     """
@@ -19,6 +19,47 @@ def normalize_digits(text):
     return ''.join(mapping.get(char, char) for char in text)
 
 
+def parse_jalali_date(value):
+    """
+    Parses ``YYYY-MM-DD`` or ``YYYY/MM/DD`` (Persian digits allowed) into a jdatetime.date;
+    returns None when the value is not a valid Jalali date.
+    """
+    try:
+        year, month, day = (int(part) for part in normalize_digits(value or "").replace("/", "-").split("-"))
+        return jdatetime.date(year, month, day)
+    except (TypeError, ValueError):
+        return None
+
+
+_LETTER_VARIANTS = str.maketrans(
+    {
+        "ي": "ی",
+        "ى": "ی",
+        "ك": "ک",
+        "ة": "ه",
+        "ۀ": "ه",
+        "أ": "ا",
+        "إ": "ا",
+        "آ": "ا",
+        "ٱ": "ا",
+        "ؤ": "و",
+        "\u200c": " ",  # zero-width non-joiner
+        "\u0640": "",  # tatweel
+    }
+)
+_DIACRITICS = re.compile("[\u064b-\u065f\u0670]")
+
+
+def normalize_search_text(text):
+    """
+    Folds digits, Arabic/Persian letter variants, diacritics and case so queries and documents
+    compare equal regardless of keyboard layout.
+    """
+    text = normalize_digits(text or "").translate(_LETTER_VARIANTS)
+    text = _DIACRITICS.sub("", text).lower()
+    return " ".join(text.split())
+
+
 def _client_identifier(request):
     """
     Returns a stable identifier for throttling: user id if authenticated else IP.
@@ -30,22 +71,12 @@ def _client_identifier(request):
 
 def rate_limit(request, scope: str, limit: int, window_seconds: int) -> bool:
     """
-    Simple fixed-window rate limiter using Django cache.
-    Returns True if the request is allowed, False if rate limit exceeded.
+    Returns True if the request is allowed under ``limit`` per ``window_seconds``.
+    See accounts.ratelimit for the shared backend and the ``rate_limited`` view decorator.
     """
-    ident = _client_identifier(request)
-    key = f"ratelimit:{scope}:{ident}"
-    now = int(time())
-    window_start = now - (now % window_seconds)
-    window_key = f"{key}:{window_start}"
-    current = cache.get(window_key)
-    if current is None:
-        cache.set(window_key, 1, timeout=window_seconds)
-        return True
-    if current >= limit:
-        return False
-    cache.incr(window_key)
-    return True
+    from .ratelimit import check_rate_limit
+
+    return check_rate_limit(request, scope, limit, window_seconds).allowed
 
 def admin_required(view_func):
     def wrap(request, *args, **kwargs):
@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from analytics.models import CafeDailyCustomerSpend, CafeDailyItemSales, CafeDailySales, CoworkDailyMemberRevenue
+from analytics.rollups import local_day, refresh_cafe_rollups, refresh_cowork_rollups
+from cafe.models import CafeOrder
+from cowork.models import Booking
+
+CHUNK_DAYS = 31
+
+
+def _parse_day(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}; use YYYY-MM-DD (Gregorian).") from None
+
+
+class Command(BaseCommand):
+    help = "Recomputes the daily sales rollups for a date range (default: the whole history)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", help="First day to rebuild, YYYY-MM-DD.")
+        parser.add_argument("--to", dest="end", help="Last day to rebuild, YYYY-MM-DD (default: today).")
+        parser.add_argument(
+            "--if-empty",
+            action="store_true",
+            help="Do nothing if any rollup row exists; for release steps that run before the web workers start.",
+        )
+
+    def handle(self, *args, **options):
+        rollup_models = (CafeDailySales, CafeDailyItemSales, CafeDailyCustomerSpend, CoworkDailyMemberRevenue)
+        if options["if_empty"] and any(model.objects.exists() for model in rollup_models):
+            self.stdout.write("Rollups already populated; skipping.")
+            return
+        end = _parse_day(options["end"]) if options["end"] else timezone.localdate()
+        if options["start"]:
+            start = _parse_day(options["start"])
+        else:
+            firsts = [
+                value
+                for value in (
+                    CafeOrder.objects.aggregate(first=Min("created_at"))["first"],
+                    Booking.objects.aggregate(first=Min("created_at"))["first"],
+                )
+                if value is not None
+            ]
+            if not firsts:
+                self.stdout.write(self.style.SUCCESS("No orders or bookings to roll up."))
+                return
+            start = min(local_day(value) for value in firsts)
+        if start > end:
+            raise CommandError("--from must not be after --to.")
+
+        day = start
+        while day <= end:
+            chunk = [day + timedelta(days=offset) for offset in range(min(CHUNK_DAYS, (end - day).days + 1))]
+            refresh_cafe_rollups(chunk)
+            refresh_cowork_rollups(chunk)
+            day = chunk[-1] + timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups from {start} to {end}."))
@@ -0,0 +1,72 @@
+"""
+Daily fact tables behind the staff dashboard, maintained by analytics.rollups.
+
+Every row covers one local (Asia/Tehran) calendar day of order or booking creation, so the
+dashboard aggregates a few rows per day instead of the full order and booking history.
+"""
+
+from django.conf import settings
+from django.db import models
+
+
+class CafeDailySales(models.Model):
+    day = models.DateField(unique=True)
+    order_count = models.PositiveIntegerField(default=0)
+    paid_order_count = models.PositiveIntegerField(default=0)
+    paid_revenue = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+
+    class Meta:
+        ordering = ["day"]
+
+    def __str__(self):
+        return f"{self.day}: {self.paid_revenue}"
+
+
+class CafeDailyItemSales(models.Model):
+    day = models.DateField()
+    menu_item = models.ForeignKey("cafe.MenuItem", on_delete=models.CASCADE, related_name="+")
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "menu_item"], name="unique_cafe_item_sales_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.quantity}x {self.menu_item_id}"
+
+
+class CafeDailyCustomerSpend(models.Model):
+    day = models.DateField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    paid_order_count = models.PositiveIntegerField(default=0)
+    spent = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "user"], name="unique_cafe_customer_spend_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.user_id} {self.spent}"
+
+
+class CoworkDailyMemberRevenue(models.Model):
+    """Confirmed bookings and their revenue per member; summed over members for cowork totals."""
+
+    day = models.DateField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    booking_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "user"], name="unique_cowork_member_revenue_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.user_id} {self.revenue}"
@@ -0,0 +1,184 @@
+"""
+Incremental maintenance of the daily fact tables in analytics.models.
+
+Writes to orders and bookings mark the local days they touch (see analytics.signals and the
+bulk write paths in cafe and cowork). Each marked day is recomputed from its own orders or
+bookings once the transaction commits, so the cost of a refresh is bounded by one day's
+activity. ``rebuild_rollups`` backfills any date range the same way.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from cafe.models import CafeOrder, OrderItem
+from config.cache_versions import bump_version
+from config.pending_keys import PendingKeys
+from cowork.models import Booking
+
+from .models import CafeDailyCustomerSpend, CafeDailyItemSales, CafeDailySales, CoworkDailyMemberRevenue
+
+logger = logging.getLogger(__name__)
+
+_MONEY = DecimalField(max_digits=14, decimal_places=0)
+# Bumped when a day before today is rewritten; analytics.timeseries caches closed periods under it.
+CLOSED_ROLLUPS_VERSION_NAMESPACE = "analytics_closed_rollups"
+
+
+def local_day(value):
+    """The local calendar day of a (Jalali or Gregorian) datetime."""
+    if hasattr(value, "togregorian"):
+        value = value.togregorian()
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return timezone.localdate(value)
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def _created_during(day, field="created_at"):
+    # Filtered by range rather than TruncDate: django-jalali stores local times with an offset
+    # that SQLite's date functions ignore.
+    return Q(**{f"{field}__gte": day_start(day), f"{field}__lt": day_start(day + timedelta(days=1))})
+
+
+def invalidate_closed_periods():
+    bump_version(CLOSED_ROLLUPS_VERSION_NAMESPACE)
+
+
+def _replace_days(days, rows_by_model):
+    # Two refreshes of the same day can race on the unique keys; the later one simply retries.
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                # Bumped with the rewrite so no worker re-caches the old rows under the new version.
+                if min(days) < timezone.localdate():
+                    invalidate_closed_periods()
+                for model, rows in rows_by_model.items():
+                    model.objects.filter(day__in=days).delete()
+                    model.objects.bulk_create(rows)
+            return
+        except IntegrityError:
+            if attempt:
+                raise
+
+
+def refresh_cafe_rollups(days):
+    """
+    Recomputes the cafe fact rows of ``days`` from their orders (three queries per day).
+    """
+    days = set(days)
+    if not days:
+        return
+    paid = Q(is_paid=True)
+    rows = {CafeDailySales: [], CafeDailyItemSales: [], CafeDailyCustomerSpend: []}
+    for day in sorted(days):
+        orders = CafeOrder.objects.filter(_created_during(day))
+        sales = orders.aggregate(
+            orders_total=Count("id"),
+            paid_total=Count("id", filter=paid),
+            revenue=Coalesce(Sum("total_price", filter=paid), Value(0), output_field=_MONEY),
+        )
+        if sales["orders_total"]:
+            rows[CafeDailySales].append(
+                CafeDailySales(
+                    day=day,
+                    order_count=sales["orders_total"],
+                    paid_order_count=sales["paid_total"],
+                    paid_revenue=sales["revenue"],
+                )
+            )
+        items = (
+            OrderItem.objects.filter(_created_during(day, "order__created_at"))
+            .values("menu_item")
+            .annotate(total_quantity=Sum("quantity"), total_revenue=Sum(F("unit_price") * F("quantity"), output_field=_MONEY))
+        )
+        rows[CafeDailyItemSales].extend(
+            CafeDailyItemSales(day=day, menu_item_id=row["menu_item"], quantity=row["total_quantity"], revenue=row["total_revenue"])
+            for row in items
+        )
+        customers = (
+            orders.filter(paid, user__isnull=False)
+            .values("user")
+            .annotate(paid_total=Count("id"), spent_total=Sum("total_price"))
+        )
+        rows[CafeDailyCustomerSpend].extend(
+            CafeDailyCustomerSpend(day=day, user_id=row["user"], paid_order_count=row["paid_total"], spent=row["spent_total"])
+            for row in customers
+        )
+    _replace_days(days, rows)
+
+
+def refresh_cowork_rollups(days):
+    """
+    Recomputes the cowork fact rows of ``days`` from their confirmed bookings (one query per day).
+    """
+    days = set(days)
+    if not days:
+        return
+    rows = []
+    for day in sorted(days):
+        members = (
+            Booking.objects.filter(_created_during(day), status=Booking.Status.CONFIRMED)
+            .values("user")
+            .annotate(bookings_total=Count("id"), revenue_total=Sum("price_charged"))
+        )
+        rows.extend(
+            CoworkDailyMemberRevenue(
+                day=day, user_id=row["user"], booking_count=row["bookings_total"], revenue=row["revenue_total"]
+            )
+            for row in members
+        )
+    _replace_days(days, {CoworkDailyMemberRevenue: rows})
+
+
+# ``("cafe" | "cowork", day)`` pairs marked inside a transaction. Every mark registers an on_commit
+# flush and the first one to run takes the whole batch; days left behind by a rolled-back
+# transaction are refreshed by the next flush.
+_pending = PendingKeys()
+
+
+def _flush_pending():
+    batch = _pending.drain()
+    _refresh({day for kind, day in batch if kind == "cafe"}, {day for kind, day in batch if kind == "cowork"})
+
+
+def _refresh(cafe_days, cowork_days):
+    # The order or booking write has already committed; a failed refresh must not turn it into an
+    # error response. The affected days can be recomputed with ``rebuild_rollups``.
+    try:
+        refresh_cafe_rollups(cafe_days)
+        refresh_cowork_rollups(cowork_days)
+    except Exception:
+        logger.exception(
+            "Rollup refresh failed (cafe days %s, cowork days %s)", sorted(cafe_days), sorted(cowork_days)
+        )
+
+
+def schedule_rollup_refresh(cafe_days=(), cowork_days=()):
+    """
+    Refreshes the given days once the current transaction commits (immediately in autocommit).
+    Failures are logged, not raised.
+    """
+    cafe_days, cowork_days = set(cafe_days), set(cowork_days)
+    if not cafe_days and not cowork_days:
+        return
+    if not transaction.get_connection().in_atomic_block:
+        _refresh(cafe_days, cowork_days)
+        return
+    _pending.add({("cafe", day) for day in cafe_days} | {("cowork", day) for day in cowork_days})
+    transaction.on_commit(_flush_pending)
+
+
+def order_days(order_ids):
+    return {local_day(value) for value in CafeOrder.objects.filter(id__in=order_ids).values_list("created_at", flat=True)}
+
+
+def booking_days(booking_ids):
+    return {local_day(value) for value in Booking.objects.filter(id__in=booking_ids).values_list("created_at", flat=True)}
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from cafe.models import CafeOrder
+from cowork.models import Booking
+
+from .rollups import local_day, schedule_rollup_refresh
+
+# The CafeOrder fields the cafe rollups are computed from; saves touching none of them (a barista
+# moving an order along, say) leave every rollup row as it was.
+CAFE_ROLLUP_FIELDS = frozenset({"is_paid", "total_price", "user", "created_at"})
+
+
+@receiver([post_save, post_delete], sender=CafeOrder)
+def refresh_cafe_rollups_on_order_change(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not CAFE_ROLLUP_FIELDS.intersection(update_fields):
+        return
+    schedule_rollup_refresh(cafe_days=[local_day(instance.created_at)])
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def refresh_cowork_rollups_on_booking_change(sender, instance, **kwargs):
+    schedule_rollup_refresh(cowork_days=[local_day(instance.created_at)])
@@ -0,0 +1,175 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+import jdatetime
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.factories import UserFactory
+from accounts.models import CacheVersion
+from cafe.factories import MenuItemFactory
+from cafe.models import CafeOrder, OrderItem
+from cowork.booking_batch import approve_bookings
+from cowork.factories import BookingFactory
+from cowork.models import Booking
+
+from .models import CafeDailyCustomerSpend, CafeDailyItemSales, CafeDailySales, CoworkDailyMemberRevenue
+from .rollups import CLOSED_ROLLUPS_VERSION_NAMESPACE, day_start, invalidate_closed_periods, refresh_cafe_rollups
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = UserFactory()
+        self.staff.groups.add(Group.objects.get_or_create(name="Barista")[0])
+        self.client.force_authenticate(user=self.staff)
+        self.customer = UserFactory(full_name="Regular Customer")
+        self.latte = MenuItemFactory(name="Latte", price=Decimal("50000"))
+        self.cake = MenuItemFactory(name="Cake", price=Decimal("80000"))
+
+    def _order(self, lines, is_paid=True, user=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = CafeOrder.objects.create(user=user or self.customer, is_paid=is_paid)
+            for menu_item, quantity in lines:
+                OrderItem.objects.create(order=order, menu_item=menu_item, quantity=quantity)
+        return order
+
+    def test_orders_and_bookings_maintain_today_rollups(self):
+        self._order([(self.latte, 3), (self.cake, 1)])
+        self._order([(self.latte, 1)], is_paid=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingFactory(user=self.customer, price_charged=150000)
+            BookingFactory(status=Booking.Status.PENDING_PAYMENT, price_charged=90000)
+
+        today = timezone.localdate()
+        sales = CafeDailySales.objects.get(day=today)
+        self.assertEqual((sales.order_count, sales.paid_order_count, sales.paid_revenue), (2, 1, 230000))
+        latte = CafeDailyItemSales.objects.get(day=today, menu_item=self.latte)
+        self.assertEqual((latte.quantity, latte.revenue), (4, 200000))
+        self.assertEqual(CafeDailyCustomerSpend.objects.get(day=today, user=self.customer).spent, 230000)
+        self.assertEqual(CoworkDailyMemberRevenue.objects.get(day=today).revenue, 150000)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_bookings(Booking.objects.filter(status=Booking.Status.PENDING_PAYMENT))
+        self.assertEqual(sum(row.revenue for row in CoworkDailyMemberRevenue.objects.filter(day=today)), 240000)
+
+    def test_dashboard_reads_rollups_with_price_times_quantity(self):
+        self._order([(self.latte, 3)])
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingFactory(user=self.customer, price_charged=150000)
+
+        with self.assertNumQueries(9):
+            response = self.client.get("/api/staff/analytics/overview/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["cafe_total"], 150000)
+        self.assertEqual(response.data["cafe_today"], 150000)
+        self.assertEqual(response.data["cowork_total"], 150000)
+        top_item = response.data["top_items"][0]
+        self.assertEqual((top_item["menu_item__name"], top_item["total_qty"], top_item["total_rev"]), ("Latte", 3, 150000))
+        self.assertEqual(response.data["top_cafe_buyers"][0]["user__full_name"], "Regular Customer")
+        self.assertEqual(response.data["top_cowork_members"][0]["total_bookings"], 1)
+
+    def test_refresh_failure_is_logged_without_failing_the_write(self):
+        with mock.patch("analytics.rollups.refresh_cafe_rollups", side_effect=DatabaseError("rollup table locked")):
+            with self.assertLogs("analytics.rollups", level="ERROR"):
+                order = self._order([(self.latte, 1)])
+
+        self.assertTrue(CafeOrder.objects.filter(id=order.id).exists())
+        self.assertFalse(CafeDailySales.objects.exists())
+
+    def test_status_changes_do_not_refresh_rollups(self):
+        order = self._order([(self.latte, 1)])
+        order.status = CafeOrder.Status.PREPARING
+
+        with mock.patch("analytics.signals.schedule_rollup_refresh") as schedule:
+            order.save(update_fields=["status", "updated_at"])
+            order.save(update_fields=["is_paid"])
+
+        self.assertEqual(schedule.call_count, 1)
+
+    def test_rebuild_command_backfills_history(self):
+        order = self._order([(self.cake, 2)])
+        yesterday = timezone.localdate() - timedelta(days=1)
+        CafeOrder.objects.filter(id=order.id).update(created_at=day_start(yesterday) + timedelta(hours=23, minutes=30))
+        for model in (CafeDailySales, CafeDailyItemSales, CafeDailyCustomerSpend):
+            model.objects.all().delete()
+
+        call_command("rebuild_rollups", "--if-empty", stdout=StringIO())
+
+        self.assertEqual(CafeDailySales.objects.get(day=yesterday).paid_revenue, 160000)
+        self.assertFalse(CafeDailySales.objects.filter(day=timezone.localdate()).exists())
+        self.assertEqual(CafeDailyItemSales.objects.get(day=yesterday).quantity, 2)
+
+        CafeDailySales.objects.filter(day=yesterday).update(paid_revenue=1)
+        call_command("rebuild_rollups", "--if-empty", stdout=StringIO())
+        self.assertEqual(CafeDailySales.objects.get(day=yesterday).paid_revenue, 1)
+
+
+class TimeseriesAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = UserFactory()
+        self.staff.groups.add(Group.objects.get_or_create(name="Barista")[0])
+        self.client.force_authenticate(user=self.staff)
+        invalidate_closed_periods()
+        # 1404 Esfand 28..29 and 1405 Farvardin 1..2: a Jalali year and month boundary.
+        for jalali_day, revenue in [((1404, 12, 28), 100), ((1404, 12, 29), 200), ((1405, 1, 1), 300), ((1405, 1, 2), 400)]:
+            CafeDailySales.objects.create(
+                day=jdatetime.date(*jalali_day).togregorian(), order_count=1, paid_order_count=1, paid_revenue=revenue
+            )
+
+    def _get(self, **params):
+        response = self.client.get("/api/staff/analytics/timeseries/", {"metric": "cafe_revenue", **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_month_and_week_buckets_follow_the_jalali_calendar(self):
+        months = self._get(**{"from": "1404/12/01", "to": "۱۴۰۵-۰۱-۳۱", "bucket": "month"})
+        self.assertEqual(
+            [(row["start"], row["end"], row["value"]) for row in months["results"]],
+            [("1404-12-01", "1404-12-29", 300), ("1405-01-01", "1405-01-31", 700)],
+        )
+        self.assertEqual(months["total"], 1000)
+
+        # 1404-12-30 does not exist (1404 is not a leap year); Saturday 1405-01-01 starts a week.
+        weeks = self._get(**{"from": "1404-12-28", "to": "1405-01-02", "bucket": "week"})
+        self.assertEqual([row["value"] for row in weeks["results"]], [300, 700])
+        self.assertEqual(weeks["results"][1]["start"], "1405-01-01")
+
+    def test_closed_buckets_are_served_from_memory_until_a_past_day_changes(self):
+        params = {"from": "1404-12-01", "to": "1405-01-31", "bucket": "month"}
+        self._get(**params)
+        with self.assertNumQueries(1):  # closed-period version; roles are memoized on the forced user
+            self.assertEqual(self._get(**params)["total"], 1000)
+
+        CafeDailySales.objects.filter(paid_revenue=400).update(paid_revenue=1400)
+        refresh_cafe_rollups([jdatetime.date(1405, 1, 2).togregorian()])  # rewrites a past day
+        self.assertEqual(self._get(**params)["total"], 600)  # no orders behind that day any more
+
+    def test_closed_buckets_follow_a_rebuild_made_by_another_process(self):
+        params = {"from": "1404-12-01", "to": "1405-01-31", "bucket": "month"}
+        self.assertEqual(self._get(**params)["total"], 1000)
+
+        # What rebuild_rollups in another process leaves behind: new rows and a bumped counter.
+        CafeDailySales.objects.filter(paid_revenue=100).update(paid_revenue=1100)
+        CacheVersion.objects.filter(namespace=CLOSED_ROLLUPS_VERSION_NAMESPACE).update(version=F("version") + 1)
+        self.assertEqual(self._get(**params)["total"], 2000)
+
+    def test_rejects_unknown_metric_bucket_and_bad_ranges(self):
+        client = self.client
+        for params in (
+            {"metric": "visits"},
+            {"bucket": "year"},
+            {"from": "1405-13-01"},
+            {"from": "1405-02-01", "to": "1405-01-01"},
+            {"from": "1390-01-01", "to": "1405-01-01"},
+        ):
+            response = client.get("/api/staff/analytics/timeseries/", params)
+            self.assertEqual(response.status_code, 400, params)
@@ -0,0 +1,126 @@
+"""
+Jalali-bucketed time series over the daily rollups in analytics.models.
+
+Buckets are Jalali days, Saturday-based weeks or Jalali months, clipped to the requested range.
+A bucket that ended before today is closed: its value is cached in process memory under a
+database-backed version that is bumped whenever a past day's rollup is rewritten (see
+``invalidate_closed_periods``), so a repeated range only reads the rollup rows of the still-open
+bucket, and a rebuild by any worker or ``rebuild_rollups`` reaches every process.
+"""
+
+import bisect
+import threading
+import time
+from datetime import timedelta
+
+import jdatetime
+from django.db.models import Sum
+from django.utils import timezone
+
+from config.cache_versions import get_version
+
+from .models import CafeDailyItemSales, CafeDailySales, CoworkDailyMemberRevenue
+from .rollups import CLOSED_ROLLUPS_VERSION_NAMESPACE
+
+BUCKETS = ("day", "week", "month")
+METRICS = {
+    "cafe_revenue": (CafeDailySales, "paid_revenue"),
+    "cafe_orders": (CafeDailySales, "paid_order_count"),
+    "cafe_items_sold": (CafeDailyItemSales, "quantity"),
+    "cowork_revenue": (CoworkDailyMemberRevenue, "revenue"),
+    "cowork_bookings": (CoworkDailyMemberRevenue, "booking_count"),
+}
+MAX_TIMESERIES_DAYS = 1830
+# Backstop for rollup rows edited without going through analytics.rollups.
+CLOSED_VALUES_TIMEOUT = 60 * 10
+
+
+def jalali_today():
+    return jdatetime.date.fromgregorian(date=timezone.localdate())
+
+
+def bucket_start(day, bucket):
+    if bucket == "week":
+        # jdatetime weeks start on Saturday (weekday 0).
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return jdatetime.date(day.year, day.month, 1)
+    return day
+
+
+def _next_bucket_start(start, bucket):
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return jdatetime.date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+
+def iter_buckets(first_day, last_day, bucket):
+    """
+    Yields ``(start, end)`` Jalali dates (inclusive) covering ``first_day..last_day``.
+    """
+    start = first_day
+    while start <= last_day:
+        following = _next_bucket_start(bucket_start(start, bucket), bucket)
+        end = min(following - timedelta(days=1), last_day)
+        yield start, end
+        start = end + timedelta(days=1)
+
+
+_lock = threading.Lock()
+_loaded_version = None
+_loaded_at = 0.0
+_closed = {}
+
+
+def _closed_values():
+    global _loaded_version, _loaded_at, _closed
+    version = get_version(CLOSED_ROLLUPS_VERSION_NAMESPACE)
+    if version != _loaded_version or time.monotonic() - _loaded_at > CLOSED_VALUES_TIMEOUT:
+        with _lock:
+            if version != _loaded_version or time.monotonic() - _loaded_at > CLOSED_VALUES_TIMEOUT:
+                _closed = {}
+                _loaded_version = version
+                _loaded_at = time.monotonic()
+    return _closed
+
+
+def timeseries(metric, first_day, last_day, bucket, today=None):
+    """
+    Returns ``[(start, end, value)]`` for ``metric`` over the Jalali dates ``first_day..last_day``.
+    """
+    model, field = METRICS[metric]
+    today = today or jalali_today()
+    closed = _closed_values()
+    buckets = list(iter_buckets(first_day, last_day, bucket))
+    values = {}
+    missing = []
+    for start, end in buckets:
+        cached = closed.get((metric, start, end)) if end < today else None
+        if cached is None:
+            missing.append((start, end))
+        else:
+            values[start] = cached
+
+    if missing:
+        starts = [start for start, _ in missing]
+        totals = dict.fromkeys(starts, 0)
+        daily = (
+            model.objects.filter(day__range=(missing[0][0].togregorian(), missing[-1][1].togregorian()))
+            .values("day")
+            .annotate(total=Sum(field))
+            .values_list("day", "total")
+        )
+        for day, total in daily:
+            index = bisect.bisect_right(starts, jdatetime.date.fromgregorian(date=day)) - 1
+            start, end = missing[index]
+            # Days between two missing buckets belong to cached ones and are skipped.
+            if jdatetime.date.fromgregorian(date=day) <= end:
+                totals[start] += total or 0
+        for start, end in missing:
+            values[start] = totals[start]
+            if end < today:
+                closed[(metric, start, end)] = totals[start]
+
+    return [(start, end, values[start]) for start, end in buckets]
@@ -5,7 +5,11 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from config.pagination import paginate
+
 from .models import BlogPost, BlogTag
+from .related import RELATED_POSTS_LIMIT
+from .search import search_posts
 
 
 def _parse_bool(value: str | None):
@@ -59,10 +63,12 @@ def _published_posts_qs():
         )
         .select_related("author")
         .prefetch_related("tags")
-        .distinct()
     )
 
 
+POST_LIST_ORDERING = ("-published_at", "-id")
+
+
 class BlogPostsAPIView(APIView):
     permission_classes = [AllowAny]
 
@@ -71,35 +77,21 @@ class BlogPostsAPIView(APIView):
         tag = (request.query_params.get("tag") or "").strip()
         city = (request.query_params.get("city") or "").strip()
         featured = _parse_bool(request.query_params.get("featured"))
-        page = max(int(request.query_params.get("page", 1)), 1)
-        page_size = min(max(int(request.query_params.get("page_size", 10)), 1), 100)
 
         posts = _published_posts_qs()
-        if query:
-            posts = posts.filter(
-                Q(title__icontains=query)
-                | Q(excerpt__icontains=query)
-                | Q(seo_title__icontains=query)
-                | Q(seo_description__icontains=query)
-            )
         if tag:
             posts = posts.filter(tags__slug=tag)
         if city:
             posts = posts.filter(geo_city__icontains=city)
         if featured is not None:
             posts = posts.filter(is_featured=featured)
+        ordering = POST_LIST_ORDERING
+        if query:
+            posts = search_posts(posts, query)
+            ordering = ("-search_rank", *POST_LIST_ORDERING)
 
-        total = posts.count()
-        offset = (page - 1) * page_size
-        chunk = posts[offset : offset + page_size]
-        return Response(
-            {
-                "count": total,
-                "page": page,
-                "page_size": page_size,
-                "results": [_serialize_post_card(request, post) for post in chunk],
-            }
-        )
+        chunk, meta = paginate(request, posts, ordering, default_page_size=10)
+        return Response({**meta, "results": [_serialize_post_card(request, post) for post in chunk]})
 
 
 class BlogPostDetailAPIView(APIView):
@@ -107,13 +99,9 @@ class BlogPostDetailAPIView(APIView):
 
     def get(self, request, slug):
         post = get_object_or_404(_published_posts_qs(), slug=slug)
-        related = (
-            _published_posts_qs()
-            .filter(tags__in=post.tags.all())
-            .exclude(id=post.id)
-            .order_by("-published_at", "-id")
-            .distinct()[:3]
-        )
+        related = _published_posts_qs().filter(related_to_links__post=post).order_by("related_to_links__rank")[
+            :RELATED_POSTS_LIMIT
+        ]
         return Response(
             {
                 "post": {
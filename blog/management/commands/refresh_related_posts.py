@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from blog.models import BlogPost
+from blog.related import DUE_WINDOW, refresh_due_related_posts, refresh_related_posts
+
+
+class Command(BaseCommand):
+    help = "Recomputes stored related-post lists."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--due",
+            action="store_true",
+            help="Only the lists around posts whose scheduled publish time has recently passed.",
+        )
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=int(DUE_WINDOW.total_seconds() // 3600),
+            help="With --due, how far back to look for publish times (default: 24).",
+        )
+
+    def handle(self, *args, **options):
+        if options["due"]:
+            rebuilt = refresh_due_related_posts(timedelta(hours=options["hours"]))
+        else:
+            rebuilt = refresh_related_posts(BlogPost.objects.values_list("id", flat=True))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} related-post list(s)."))
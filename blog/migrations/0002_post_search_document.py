@@ -0,0 +1,77 @@
+# Generated by Django 5.2.9 on 2026-10-18 01:04
+
+from django.db import OperationalError, migrations, models
+
+from config.migration_utils import normalize_search_text_v1
+
+# Names and search config shared with blog.search, frozen here so the migration does not import
+# app code that may change after it has run.
+FTS_TABLE = 'blog_post_fts'
+SEARCH_CONFIG = 'simple'
+PG_SEARCH_INDEX = 'blog_post_search_gin'
+
+
+def _block_text(block):
+    if not isinstance(block, dict):
+        return ''
+    parts = [block.get('text'), block.get('caption'), block.get('alt')]
+    parts.extend(block.get('items') or [])
+    return ' '.join(part for part in parts if isinstance(part, str))
+
+
+def _search_document(post):
+    # Frozen copy of blog.search.build_search_document.
+    blocks = post.content_blocks if isinstance(post.content_blocks, list) else []
+    parts = [post.title, post.excerpt, post.seo_title, post.seo_description, *map(_block_text, blocks)]
+    return normalize_search_text_v1(' '.join(part for part in parts if part))
+
+
+def create_search_index(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    posts = list(BlogPost.objects.all())
+    for post in posts:
+        post.search_document = _search_document(post)
+    BlogPost.objects.bulk_update(posts, ['search_document'], batch_size=200)
+
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # Must match the expression SearchVector("search_document", config=...) compiles to.
+        schema_editor.execute(
+            f"CREATE INDEX {PG_SEARCH_INDEX} ON blog_blogpost USING gin "
+            f"(to_tsvector('{SEARCH_CONFIG}'::regconfig, COALESCE(search_document, '')))"
+        )
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(search_document)')
+        except OperationalError:
+            # No FTS5 in this SQLite build; blog.search falls back to a substring match.
+            return
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, search_document) VALUES (%s, %s)',
+                [(post.pk, post.search_document) for post in posts],
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {PG_SEARCH_INDEX}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
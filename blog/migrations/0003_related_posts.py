@@ -0,0 +1,80 @@
+# Generated by Django 5.2.9 on 2026-10-18 01:16
+
+import heapq
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+STORED_RELATED_POSTS = 6
+
+
+def _rank_related_posts(source_ids, memberships, published_at):
+    # Frozen copy of blog.related.rank_related_posts.
+    tags_by_post = {}
+    posts_by_tag = {}
+    for post_id, tag_id in memberships:
+        tags_by_post.setdefault(post_id, set()).add(tag_id)
+        if post_id in published_at:
+            posts_by_tag.setdefault(tag_id, set()).add(post_id)
+
+    ranked = {}
+    for source_id in source_ids:
+        shared = {}
+        for tag_id in tags_by_post.get(source_id, ()):
+            for post_id in posts_by_tag.get(tag_id, ()):
+                if post_id != source_id:
+                    shared[post_id] = shared.get(post_id, 0) + 1
+        ranked[source_id] = heapq.nlargest(
+            STORED_RELATED_POSTS,
+            shared.items(),
+            key=lambda item: (item[1], published_at[item[0]] is not None, published_at[item[0]], item[0]),
+        )
+    return ranked
+
+
+def build_related_posts(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    RelatedPost = apps.get_model('blog', 'RelatedPost')
+    published = BlogPost.objects.filter(status='published')
+    source_ids = list(published.values_list('id', flat=True))
+    # Only posts already visible can be related; scheduled ones join at their next refresh.
+    published_at = dict(
+        published.filter(Q(published_at__isnull=True) | Q(published_at__lte=timezone.now())).values_list('id', 'published_at')
+    )
+    memberships = BlogPost.tags.through.objects.filter(blogpost_id__in=source_ids).values_list('blogpost_id', 'blogtag_id')
+    ranked = _rank_related_posts(source_ids, list(memberships), published_at)
+    RelatedPost.objects.bulk_create(
+        [
+            RelatedPost(post_id=source_id, related_id=related_id, rank=rank, shared_tags=shared)
+            for source_id, related in ranked.items()
+            for rank, (related_id, shared) in enumerate(related)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_post_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('shared_tags', models.PositiveSmallIntegerField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='blog.blogpost')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to_links', to='blog.blogpost')),
+            ],
+            options={
+                'ordering': ['post', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('post', 'rank'), name='unique_related_post_rank')],
+            },
+        ),
+        migrations.RunPython(build_related_posts, migrations.RunPython.noop),
+    ]
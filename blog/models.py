@@ -48,6 +48,8 @@ class BlogPost(models.Model):
     tags = models.ManyToManyField(BlogTag, blank=True, related_name="posts")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Normalized text for blog.search; rebuilt on every save.
+    search_document = models.TextField(blank=True, editable=False)
 
     class Meta:
         ordering = ["-published_at", "-created_at"]
@@ -84,6 +86,35 @@ class BlogPost(models.Model):
         if self.status == self.Status.PUBLISHED and not self.published_at:
             self.published_at = timezone.now()
 
+    def save(self, *args, **kwargs):
+        from .search import build_search_document, sync_search_index
+
+        self.search_document = build_search_document(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "search_document"}
+        super().save(*args, **kwargs)
+        sync_search_index(self)
+
     def __str__(self):
         return self.title
 
+
+class RelatedPost(models.Model):
+    """
+    One precomputed "related posts" entry, maintained by blog.related.
+    """
+
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name="related_links")
+    related = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name="related_to_links")
+    rank = models.PositiveSmallIntegerField()
+    shared_tags = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ["post", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["post", "rank"], name="unique_related_post_rank"),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} (#{self.rank})"
@@ -0,0 +1,119 @@
+"""
+Related posts for the blog detail page.
+
+For every published post, ``RelatedPost`` stores its best matches among the other posts that
+are already visible (published, with no future publish time): most shared tags first, then the
+most recent. blog.signals recomputes the affected posts whenever a post, its tags or a tag
+changes, so the detail view reads the list with one lookup on the (post, rank) index. A post
+scheduled for later is picked up by ``refresh_related_posts --due`` once its publish time passes.
+"""
+
+import heapq
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import BlogPost, RelatedPost
+
+RELATED_POSTS_LIMIT = 3
+# Stored beyond what is shown, so the list stays full if a related post is hidden before the
+# refresh that follows its change has run.
+STORED_RELATED_POSTS = 6
+# How far back ``refresh_due_related_posts`` looks; long enough to cover a worker restart.
+DUE_WINDOW = timedelta(days=1)
+
+
+def rank_related_posts(source_ids, memberships, published_at, limit=STORED_RELATED_POSTS):
+    """
+    Returns ``{source_id: [(related_id, shared_tags), ...]}``, best first.
+
+    ``memberships`` holds ``(post_id, tag_id)`` pairs for the sources and every visible
+    candidate; ``published_at`` maps each visible candidate to its publish time.
+    """
+    tags_by_post = {}
+    posts_by_tag = {}
+    for post_id, tag_id in memberships:
+        tags_by_post.setdefault(post_id, set()).add(tag_id)
+        if post_id in published_at:
+            posts_by_tag.setdefault(tag_id, set()).add(post_id)
+
+    ranked = {}
+    for source_id in source_ids:
+        shared = {}
+        for tag_id in tags_by_post.get(source_id, ()):
+            for post_id in posts_by_tag.get(tag_id, ()):
+                if post_id != source_id:
+                    shared[post_id] = shared.get(post_id, 0) + 1
+        # Ties go to the newest post; posts without a publish time sort last, as in the list view.
+        ranked[source_id] = heapq.nlargest(
+            limit,
+            shared.items(),
+            key=lambda item: (item[1], published_at[item[0]] is not None, published_at[item[0]], item[0]),
+        )
+    return ranked
+
+
+def refresh_related_posts(post_ids):
+    """
+    Recomputes the related lists touched by a change to ``post_ids``: the posts themselves, the
+    posts sharing a tag with them and the posts that currently list them. Returns how many lists
+    were rebuilt.
+    """
+    post_ids = set(post_ids)
+    if not post_ids:
+        return 0
+    through = BlogPost.tags.through
+    tag_ids = set(through.objects.filter(blogpost_id__in=post_ids).values_list("blogtag_id", flat=True))
+    affected = post_ids | set(through.objects.filter(blogtag_id__in=tag_ids).values_list("blogpost_id", flat=True))
+    affected |= set(RelatedPost.objects.filter(related_id__in=post_ids).values_list("post_id", flat=True))
+
+    sources = set(BlogPost.objects.filter(id__in=affected, status=BlogPost.Status.PUBLISHED).values_list("id", flat=True))
+    source_tags = through.objects.filter(blogpost_id__in=sources).values_list("blogpost_id", "blogtag_id")
+    candidates = (
+        through.objects.filter(
+            blogtag_id__in=set(tag_id for _, tag_id in source_tags),
+            blogpost__status=BlogPost.Status.PUBLISHED,
+        )
+        .filter(Q(blogpost__published_at__isnull=True) | Q(blogpost__published_at__lte=timezone.now()))
+        .values_list("blogpost_id", "blogtag_id", "blogpost__published_at")
+    )
+
+    published_at = {}
+    memberships = list(source_tags)
+    for post_id, tag_id, published in candidates:
+        published_at[post_id] = published
+        memberships.append((post_id, tag_id))
+
+    rows = [
+        RelatedPost(post_id=source_id, related_id=related_id, rank=rank, shared_tags=shared)
+        for source_id, related in rank_related_posts(sources, memberships, published_at).items()
+        for rank, (related_id, shared) in enumerate(related)
+    ]
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=affected).delete()
+        RelatedPost.objects.bulk_create(rows)
+    return len(affected)
+
+
+def refresh_due_related_posts(window=DUE_WINDOW):
+    """
+    Recomputes the lists around posts whose publish time passed within ``window``. Nothing is
+    saved when a scheduled post goes live, so the signals never see it. Returns how many lists
+    were rebuilt.
+    """
+    now = timezone.now()
+    due = BlogPost.objects.filter(
+        status=BlogPost.Status.PUBLISHED, published_at__gt=now - window, published_at__lte=now
+    ).values_list("id", flat=True)
+    return refresh_related_posts(due)
+
+
+def schedule_related_refresh(post_ids):
+    """
+    Refreshes the related lists around ``post_ids`` once the current transaction commits.
+    """
+    post_ids = set(post_ids)
+    if post_ids:
+        transaction.on_commit(lambda: refresh_related_posts(post_ids))
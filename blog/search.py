@@ -0,0 +1,140 @@
+"""
+Blog post search.
+
+Each post keeps a normalized ``search_document`` (title, excerpt, SEO fields and the text of its
+content blocks). PostgreSQL searches it through a GIN expression index with ranking; SQLite uses
+an FTS5 table kept in sync on save/delete. Both match every word of the query and treat the
+last one as a prefix, so results do not depend on the backend. Other backends fall back to a
+substring match.
+"""
+
+import re
+
+from django.db import OperationalError, connection
+from django.db.models import Case, IntegerField, Value, When
+
+from accounts.utils import normalize_search_text
+
+FTS_TABLE = "blog_post_fts"
+SEARCH_CONFIG = "simple"
+# SQLite ranks at most this many matches per query.
+MAX_RANKED_MATCHES = 1000
+_WORD = re.compile(r"\w+")
+
+
+def _block_text(block):
+    if not isinstance(block, dict):
+        return ""
+    parts = [block.get("text"), block.get("caption"), block.get("alt")]
+    parts.extend(block.get("items") or [])
+    return " ".join(part for part in parts if isinstance(part, str))
+
+
+def build_search_document(post):
+    blocks = post.content_blocks if isinstance(post.content_blocks, list) else []
+    parts = [post.title, post.excerpt, post.seo_title, post.seo_description, *map(_block_text, blocks)]
+    return normalize_search_text(" ".join(part for part in parts if part))
+
+
+def sync_search_index(post):
+    if connection.vendor != "sqlite":
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post.pk])
+            cursor.execute(f"INSERT INTO {FTS_TABLE} (rowid, search_document) VALUES (%s, %s)", [post.pk, post.search_document])
+    except OperationalError:
+        # SQLite build without FTS5: search falls back to a substring match.
+        pass
+
+
+def remove_from_search_index(post_id):
+    if connection.vendor != "sqlite":
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id])
+    except OperationalError:
+        pass
+
+
+def _fts_match_expression(query):
+    # Quote every word so user input cannot inject FTS5 syntax; prefix-match the last one.
+    words = _WORD.findall(query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _tsquery_expression(query):
+    # The same query as _fts_match_expression in tsquery syntax: quoted words ANDed together,
+    # the last one as a prefix. \w+ never contains a quote, so the input cannot add operators.
+    words = _WORD.findall(query)
+    if not words:
+        return None
+    terms = [f"'{word}'" for word in words]
+    terms[-1] += ":*"
+    return " & ".join(terms)
+
+
+def _search_postgres(posts, query):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    expression = _tsquery_expression(query)
+    if expression is None:
+        return _unranked(posts.none())
+    vector = SearchVector("search_document", config=SEARCH_CONFIG)
+    search_query = SearchQuery(expression, config=SEARCH_CONFIG, search_type="raw")
+    # Filtering on the vector (not the rank) lets PostgreSQL use the GIN expression index.
+    return (
+        posts.annotate(search=vector, search_rank=SearchRank(vector, search_query))
+        .filter(search=search_query)
+        .order_by("-search_rank", "-published_at", "-id")
+    )
+
+
+def _unranked(posts):
+    return posts.annotate(search_rank=Value(0, output_field=IntegerField()))
+
+
+def _search_sqlite(posts, query):
+    expression = _fts_match_expression(query)
+    if expression is None:
+        return _unranked(posts.none())
+    # Restricted to ``posts`` before the limit, so matching drafts cannot crowd out visible posts.
+    visible_sql, visible_params = posts.order_by().values("id").query.sql_with_params()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid IN ({visible_sql}) "
+                f"ORDER BY bm25({FTS_TABLE}) LIMIT %s",
+                [expression, *visible_params, MAX_RANKED_MATCHES],
+            )
+            ranked_ids = [row[0] for row in cursor.fetchall()]
+    except OperationalError:
+        return _unranked(posts.filter(search_document__contains=query))
+    if not ranked_ids:
+        return _unranked(posts.none())
+    # Higher is better on every backend, so callers can order by "-search_rank".
+    rank = Case(
+        *[When(id=post_id, then=Value(len(ranked_ids) - i)) for i, post_id in enumerate(ranked_ids)],
+        output_field=IntegerField(),
+    )
+    return posts.filter(id__in=ranked_ids).annotate(search_rank=rank).order_by("-search_rank", "-published_at", "-id")
+
+
+def search_posts(posts, query):
+    """
+    Filters ``posts`` to those matching ``query``, most relevant first. Matches are annotated
+    with ``search_rank`` (higher is more relevant).
+    """
+    query = normalize_search_text(query)
+    if not query:
+        return posts
+    if connection.vendor == "postgresql":
+        return _search_postgres(posts, query)
+    if connection.vendor == "sqlite":
+        return _search_sqlite(posts, query)
+    return _unranked(posts.filter(search_document__contains=query))
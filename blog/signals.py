@@ -0,0 +1,43 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import BlogPost, BlogTag, RelatedPost
+from .related import schedule_related_refresh
+from .search import remove_from_search_index
+
+
+@receiver(post_delete, sender=BlogPost)
+def remove_post_from_search_index(sender, instance, **kwargs):
+    remove_from_search_index(instance.pk)
+
+
+@receiver(post_save, sender=BlogPost)
+def refresh_related_on_post_save(sender, instance, created, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and not {"status", "published_at"} & set(update_fields):
+        return
+    schedule_related_refresh([instance.pk])
+
+
+@receiver(pre_delete, sender=BlogPost)
+def refresh_related_on_post_delete(sender, instance, **kwargs):
+    # The rows pointing at this post cascade away; refill the lists that held them.
+    schedule_related_refresh(RelatedPost.objects.filter(related=instance).values_list("post_id", flat=True))
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def refresh_related_on_tag_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in {"post_add", "post_remove", "post_clear"}:
+            schedule_related_refresh([instance.pk])
+        return
+    # Changed from the tag side: pk_set holds post ids, except for clear().
+    if action == "pre_clear":
+        schedule_related_refresh(instance.posts.values_list("id", flat=True))
+    elif action in {"post_add", "post_remove"}:
+        schedule_related_refresh(pk_set or [])
+
+
+@receiver(pre_delete, sender=BlogTag)
+def refresh_related_on_tag_delete(sender, instance, **kwargs):
+    schedule_related_refresh(instance.posts.values_list("id", flat=True))
@@ -1,12 +1,17 @@
 from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 from rest_framework.test import APIClient
 
 from accounts.factories import UserFactory
 from accounts.models import FreelancerProfile
-from .models import BlogPost, BlogTag
+from .models import BlogPost, BlogTag, RelatedPost
+from .related import STORED_RELATED_POSTS
+from .search import _tsquery_expression
 
 
 class BlogPublicAPITests(TestCase):
@@ -85,3 +90,174 @@ class SeoEndpointTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("Sitemap:", response.content.decode("utf-8"))
 
+
+class BlogSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def _post(self, slug, title, blocks, **extra):
+        return BlogPost.objects.create(
+            title=title,
+            slug=slug,
+            content_blocks=blocks,
+            status=BlogPost.Status.PUBLISHED,
+            published_at=timezone.now() - timedelta(hours=1),
+            **extra,
+        )
+
+    def _search(self, query):
+        response = self.client.get("/api/blog/posts/", {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return [post["slug"] for post in response.data["results"]]
+
+    def test_search_covers_content_blocks_and_normalizes_persian_text(self):
+        self._post("coworking-guide", "راهنمای فضای کار", [{"type": "list", "items": ["ميز اشتراكي ۲۴ ساعته"]}])
+        self._post("cafe-menu", "منوی کافه", [{"type": "paragraph", "text": "قهوه دمی"}])
+
+        self.assertEqual(self._search("میز اشتراکی"), ["coworking-guide"])
+        self.assertEqual(self._search("24"), ["coworking-guide"])
+        self.assertEqual(self._search("قهو"), ["cafe-menu"])
+
+    def test_search_document_follows_edits_and_deletes(self):
+        post = self._post("espresso", "Espresso basics", [{"type": "paragraph", "text": "crema"}])
+        post.content_blocks = [{"type": "paragraph", "text": "latte art"}]
+        post.save(update_fields=["content_blocks"])
+
+        self.assertEqual(self._search("latte"), ["espresso"])
+        self.assertEqual(self._search("crema"), [])
+        post.delete()
+        self.assertEqual(self._search("latte"), [])
+
+    def test_matching_drafts_do_not_crowd_out_published_posts(self):
+        drafts = [self._post(f"draft-{index}", "latte latte latte", []) for index in range(3)]
+        BlogPost.objects.filter(id__in=[post.id for post in drafts]).update(status=BlogPost.Status.DRAFT)
+        self._post("published", "latte notes", [])
+
+        with mock.patch("blog.search.MAX_RANKED_MATCHES", 2):
+            self.assertEqual(self._search("latte"), ["published"])
+
+    def test_postgres_query_matches_words_and_last_prefix_like_sqlite(self):
+        self.assertEqual(_tsquery_expression("latte ar"), "'latte' & 'ar':*")
+        self.assertIsNone(_tsquery_expression("!!"))
+
+
+class BlogCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        published_at = timezone.now() - timedelta(days=1)
+        for index in range(5):
+            BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                status=BlogPost.Status.PUBLISHED,
+                # Two posts share a timestamp so the id tie-breaker is exercised.
+                published_at=published_at - timedelta(hours=min(index, 3)),
+            )
+
+    def test_cursor_pages_walk_every_post_once(self):
+        slugs = []
+        params = {"cursor": "", "page_size": 2}
+        while True:
+            response = self.client.get("/api/blog/posts/", params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            slugs.extend(post["slug"] for post in response.data["results"])
+            if not response.data["next_cursor"]:
+                break
+            params["cursor"] = response.data["next_cursor"]
+
+        self.assertEqual(slugs, ["post-0", "post-1", "post-2", "post-4", "post-3"])
+
+    def test_numbered_pages_keep_exact_count_and_bad_cursor_is_rejected(self):
+        response = self.client.get("/api/blog/posts/", {"page": 2, "page_size": 2})
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(response.data["page"], 2)
+
+        invalid = self.client.get("/api/blog/posts/", {"cursor": "not-a-cursor"})
+        self.assertEqual(invalid.status_code, 404)
+
+
+class BlogRelatedPostsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.coffee = BlogTag.objects.create(name="Coffee", slug="coffee")
+        self.brewing = BlogTag.objects.create(name="Brewing", slug="brewing")
+
+    def _post(self, slug, tags, hours_ago=1):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = BlogPost.objects.create(
+                title=slug,
+                slug=slug,
+                content_blocks=[{"type": "paragraph", "text": "body"}],
+                status=BlogPost.Status.PUBLISHED,
+                published_at=timezone.now() - timedelta(hours=hours_ago),
+            )
+            post.tags.set(tags)
+        return post
+
+    def _related(self, slug, queries=None):
+        if queries is None:
+            response = self.client.get(f"/api/blog/posts/{slug}/")
+        else:
+            with self.assertNumQueries(queries):
+                response = self.client.get(f"/api/blog/posts/{slug}/")
+        self.assertEqual(response.status_code, 200)
+        return [item["slug"] for item in response.data["related"]]
+
+    def test_related_posts_rank_by_shared_tags_then_recency(self):
+        self._post("source", [self.coffee, self.brewing], hours_ago=10)
+        self._post("one-tag-new", [self.coffee], hours_ago=1)
+        self._post("two-tags-old", [self.coffee, self.brewing], hours_ago=5)
+        self._post("unrelated", [])
+        self._post("future", [self.coffee, self.brewing], hours_ago=-5)
+
+        # post + tags, then related + their tags: no per-request tag join.
+        self.assertEqual(self._related("source", queries=4), ["two-tags-old", "one-tag-new"])
+
+    def test_scheduled_posts_do_not_take_related_slots(self):
+        self._post("source", [self.coffee, self.brewing], hours_ago=10)
+        self._post("visible", [self.coffee], hours_ago=2)
+        for index in range(STORED_RELATED_POSTS):
+            self._post(f"scheduled-{index}", [self.coffee, self.brewing], hours_ago=-(index + 1))
+
+        self.assertEqual(self._related("source"), ["visible"])
+        self.assertEqual(RelatedPost.objects.filter(post__slug="source").count(), 1)
+
+    def test_due_refresh_adds_scheduled_posts_once_they_go_live(self):
+        self._post("source", [self.coffee], hours_ago=10)
+        scheduled = self._post("scheduled", [self.coffee], hours_ago=-1)
+        self.assertEqual(self._related("source"), [])
+
+        # Going live saves nothing, so only the due refresh notices.
+        BlogPost.objects.filter(id=scheduled.id).update(published_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(self._related("source"), [])
+        call_command("refresh_related_posts", "--due", stdout=StringIO())
+        self.assertEqual(self._related("source"), ["scheduled"])
+
+    def test_related_posts_follow_tag_status_and_delete_changes(self):
+        source = self._post("source", [self.coffee])
+        other = self._post("other", [self.coffee])
+        self.assertEqual(self._related("source"), ["other"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.status = BlogPost.Status.DRAFT
+            other.save()
+        self.assertEqual(self._related("source"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.status = BlogPost.Status.PUBLISHED
+            other.save()
+            self.brewing.posts.add(source)
+        self.assertEqual(self._related("source"), ["other"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.coffee.delete()
+        self.assertEqual(self._related("source"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.tags.add(self.brewing)
+        self.assertEqual(self._related("source"), ["other"])
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(self._related("source"), [])
+        self.assertFalse(RelatedPost.objects.exists())
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import MenuCategory, MenuItem, CafeOrder, OrderItem
+from .order_totals import batched_order_totals, recalculate_order_totals
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
@@ -12,6 +13,17 @@ class CafeOrderAdmin(admin.ModelAdmin):
     search_fields = ('user__phone_number', 'notes')
     date_hierarchy = 'created_at'
     inlines = [OrderItemInline]
+    actions = ('recalculate_totals',)
+
+    def save_related(self, request, form, formsets, change):
+        # Inline line edits are totalled once for the order instead of once per line.
+        with batched_order_totals():
+            super().save_related(request, form, formsets, change)
+
+    @admin.action(description="Recalculate totals for selected orders")
+    def recalculate_totals(self, request, queryset):
+        updated = recalculate_order_totals(queryset.values_list('id', flat=True))
+        self.message_user(request, f"Recalculated {updated} order(s).")
 
 @admin.register(MenuCategory)
 class MenuCategoryAdmin(admin.ModelAdmin):
@@ -2,6 +2,7 @@ from django.urls import path
 
 from .api_views import (
     CafeCartAPIView,
+    CafeCartBatchAPIView,
     CafeCartItemsAPIView,
     CafeCheckoutAPIView,
     CafeMenuAPIView,
@@ -12,6 +13,7 @@ from .api_views import (
     CafeStaffMenuCategoriesAPIView,
     CafeStaffMenuItemAvailabilityAPIView,
     CafeStaffMenuItemsAPIView,
+    CafeStaffOrderEventsAPIView,
     CafeStaffOrderPaymentToggleAPIView,
     CafeStaffOrdersAPIView,
     CafeStaffOrderStatusAPIView,
@@ -23,10 +25,12 @@ urlpatterns = [
     path("menu/", CafeMenuAPIView.as_view(), name="menu"),
     path("cart/", CafeCartAPIView.as_view(), name="cart"),
     path("cart/items/", CafeCartItemsAPIView.as_view(), name="cart_items"),
+    path("cart/items/batch/", CafeCartBatchAPIView.as_view(), name="cart_items_batch"),
     path("checkout/", CafeCheckoutAPIView.as_view(), name="checkout"),
     path("orders/", CafeOrdersAPIView.as_view(), name="orders"),
     path("orders/<int:order_id>/reorder/", CafeReorderAPIView.as_view(), name="reorder"),
     path("staff/orders/", CafeStaffOrdersAPIView.as_view(), name="staff_orders"),
+    path("staff/orders/events/", CafeStaffOrderEventsAPIView.as_view(), name="staff_order_events"),
     path("staff/orders/<int:order_id>/status/", CafeStaffOrderStatusAPIView.as_view(), name="staff_order_status"),
     path("staff/orders/<int:order_id>/toggle-payment/", CafeStaffOrderPaymentToggleAPIView.as_view(), name="staff_order_toggle_payment"),
     path("staff/menu-items/", CafeStaffMenuItemsAPIView.as_view(), name="staff_menu_items"),
@@ -1,14 +1,34 @@
+import math
+from datetime import timedelta
+
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Prefetch, Q, prefetch_related_objects
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import serializers, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .cart import MAX_CART_ITEMS, MAX_PER_ITEM, get_cart as _get_cart, save_cart as _save_cart
-from .models import CafeOrder, MenuCategory, MenuItem, OrderItem
+from .cart import (
+    MAX_CART_ITEMS,
+    MAX_PER_ITEM,
+    change_quantities as _change_quantities,
+    change_quantity as _change_quantity,
+    get_cart as _get_cart,
+    save_cart as _save_cart,
+)
+from .catalog import get_catalog
+from .menu_snapshot import get_menu_snapshot
+from .models import CafeOrder, MenuCategory, MenuItem, OrderEvent, OrderItem
+from .order_assembly import OrderAssemblyError, OrderDraft, create_orders, lines_from_cart, lines_from_payload
+from .order_events import latest_event_id, publish_order_event, publish_order_events, wait_for_order_events
+from accounts.idempotency import idempotent
 from accounts.models import CustomUser
+from accounts.roles import ADMIN, BARISTA, has_any_role
+from config.conditional import revalidated_response
 
 
 def _as_price(value):
@@ -51,9 +71,9 @@ class PublicMenuCategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "order", "items"]
 
     def get_items(self, obj):
+        # Relies on the filtered/ordered prefetch from _public_menu_queryset().
         request = self.context.get("request")
-        items = obj.items.filter(is_available=True).order_by("name")
-        return PublicMenuItemSerializer(items, many=True, context={"request": request}).data
+        return PublicMenuItemSerializer(obj.items.all(), many=True, context={"request": request}).data
 
 
 class OrderItemReadSerializer(serializers.ModelSerializer):
@@ -113,6 +133,22 @@ class StaffOrderReadSerializer(serializers.ModelSerializer):
         }
 
 
+def _publish_orders_created(orders):
+    prefetch_related_objects(orders, "items__menu_item")
+    publish_order_events(
+        [(order, OrderEvent.Kind.CREATED, StaffOrderReadSerializer(order).data) for order in orders]
+    )
+
+
+def _serialize_order_event(event):
+    return {
+        "id": event.id,
+        "order_id": event.order_id,
+        "kind": event.kind,
+        "payload": event.payload,
+    }
+
+
 class StaffMenuItemSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source="category.name", read_only=True)
 
@@ -139,13 +175,24 @@ class StaffOrAdminPermission(IsAuthenticated):
         if not has_auth:
             return False
         user = request.user
-        return bool(user.is_staff or user.groups.filter(name__in=["Barista", "Admin"]).exists())
+        return bool(user.is_staff or has_any_role(user, BARISTA, ADMIN))
+
 
+def _media_url_builder(request):
+    # Resolve the host once instead of calling build_absolute_uri per item.
+    base = request.build_absolute_uri("/").rstrip("/")
+    return lambda url: f"{base}{url}" if url.startswith("/") else url
 
-def _build_cart_payload(request):
-    cart = _get_cart(request)
-    fetched_items = MenuItem.objects.filter(id__in=cart.keys(), is_available=True).select_related("category")
-    items_by_id = {str(item.id): item for item in fetched_items}
+
+def _build_cart_payload(request, cart=None):
+    """
+    Builds the cart response from the in-memory menu catalog. Callers that already hold the
+    cart can pass it to skip the cart read.
+    """
+    if cart is None:
+        cart = _get_cart(request)
+    catalog = get_catalog()
+    media_url = _media_url_builder(request)
 
     payload_items = []
     total = 0
@@ -169,8 +216,8 @@ def _build_cart_payload(request):
             cart[item_id] = quantity
             changed = True
 
-        item = items_by_id.get(str(item_id))
-        if not item:
+        item = catalog.get(int(item_id)) if str(item_id).isdigit() else None
+        if not item or not item.is_available:
             cart.pop(str(item_id), None)
             changed = True
             continue
@@ -182,11 +229,11 @@ def _build_cart_payload(request):
                 "item_id": item.id,
                 "name": item.name,
                 "description": item.description,
-                "category_name": item.category.name,
+                "category_name": item.category_name,
                 "price": _as_price(item.price),
                 "quantity": quantity,
                 "subtotal": _as_price(subtotal),
-                "image_url": request.build_absolute_uri(item.image.url) if item.image else None,
+                "image_url": media_url(item.image_url) if item.image_url else None,
             }
         )
 
@@ -203,13 +250,21 @@ def _build_cart_payload(request):
     }
 
 
+def _public_menu_queryset():
+    available_items = MenuItem.objects.filter(is_available=True).order_by("name")
+    return MenuCategory.objects.prefetch_related(Prefetch("items", queryset=available_items))
+
+
 class CafeMenuAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        categories = MenuCategory.objects.prefetch_related("items").all()
-        serializer = PublicMenuCategorySerializer(categories, many=True, context={"request": request})
-        return Response({"categories": serializer.data})
+        def build_payload():
+            serializer = PublicMenuCategorySerializer(_public_menu_queryset(), many=True, context={"request": request})
+            return {"categories": serializer.data}
+
+        body, etag = get_menu_snapshot(request, build_payload)
+        return revalidated_response(request, etag, lambda: HttpResponse(body, content_type="application/json"))
 
 
 class CafeCartAPIView(APIView):
@@ -234,84 +289,100 @@ class CafeCartItemsAPIView(APIView):
         if delta not in (-1, 1):
             return Response({"detail": "delta must be 1 or -1."}, status=status.HTTP_400_BAD_REQUEST)
 
-        cart = _get_cart(request)
-        item_id_str = str(menu_item_id)
-
         if delta == 1:
-            item = get_object_or_404(MenuItem, id=menu_item_id)
+            item = get_catalog().get(menu_item_id)
+            if item is None:
+                return Response({"detail": "Menu item not found."}, status=status.HTTP_404_NOT_FOUND)
             if not item.is_available:
                 return Response({"detail": "Item is unavailable."}, status=status.HTTP_409_CONFLICT)
 
+            cart = _get_cart(request)
             current_total = sum(int(v) for v in cart.values() if str(v).isdigit())
             if current_total >= MAX_CART_ITEMS:
                 return Response({"detail": "Cart limit reached."}, status=status.HTTP_400_BAD_REQUEST)
 
-            current_quantity = int(cart.get(item_id_str, 0))
-            cart[item_id_str] = min(current_quantity + 1, MAX_PER_ITEM)
-        else:
-            if item_id_str in cart:
-                quantity = int(cart[item_id_str])
-                if quantity <= 1:
-                    cart.pop(item_id_str, None)
-                else:
-                    cart[item_id_str] = quantity - 1
+        _change_quantity(request, menu_item_id, delta)
+        return Response(_build_cart_payload(request))
 
-        _save_cart(request, cart)
+
+class CafeCartBatchAPIView(APIView):
+    """
+    Applies ``operations`` (``[{menu_item_id, quantity | delta}]``) in order, all or nothing,
+    and returns one cart payload.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        operations = request.data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            return Response({"detail": "operations must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+
+        parsed = []
+        for operation in operations:
+            if not isinstance(operation, dict) or ("quantity" in operation) == ("delta" in operation):
+                return Response(
+                    {"detail": "Each operation needs menu_item_id and exactly one of quantity or delta."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            is_delta = "delta" in operation
+            try:
+                menu_item_id = int(operation.get("menu_item_id"))
+                value = int(operation["delta"] if is_delta else operation["quantity"])
+            except (TypeError, ValueError):
+                return Response({"detail": "menu_item_id, quantity and delta must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+            parsed.append((menu_item_id, is_delta, value))
+
+        cart = _get_cart(request)
+        menu_items = get_catalog()
+
+        updated = dict(cart)
+        for menu_item_id, is_delta, value in parsed:
+            key = str(menu_item_id)
+            current = int(updated.get(key, 0))
+            quantity = max(current + value if is_delta else value, 0)
+            if quantity > current:
+                item = menu_items.get(menu_item_id)
+                if item is None:
+                    return Response({"detail": f"Menu item {menu_item_id} not found."}, status=status.HTTP_404_NOT_FOUND)
+                if not item.is_available:
+                    return Response({"detail": f"Item '{item.name}' is unavailable."}, status=status.HTTP_409_CONFLICT)
+            if quantity > MAX_PER_ITEM:
+                return Response({"detail": f"At most {MAX_PER_ITEM} of each item."}, status=status.HTTP_400_BAD_REQUEST)
+            if quantity:
+                updated[key] = quantity
+            else:
+                updated.pop(key, None)
+
+        new_total = sum(updated.values())
+        if new_total > MAX_CART_ITEMS and new_total > sum(cart.values()):
+            return Response({"detail": "Cart limit reached."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Written as deltas against the cart read above, so a concurrent add is not overwritten.
+        deltas = {key: updated.get(key, 0) - cart.get(key, 0) for key in cart.keys() | updated.keys()}
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return Response(_build_cart_payload(request, cart=cart))
+        _change_quantities(request, deltas)
         return Response(_build_cart_payload(request))
 
 
 class CafeCheckoutAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent("cafe_checkout")
     def post(self, request):
         cart = _get_cart(request)
         if not cart:
             return Response({"detail": "Cart is empty."}, status=status.HTTP_400_BAD_REQUEST)
 
-        notes = request.data.get("notes", "")
-        with transaction.atomic():
-            order = CafeOrder.objects.create(user=request.user, notes=notes)
-            item_ids = [int(k) for k in cart.keys() if str(k).isdigit()]
-            menu_items = MenuItem.objects.in_bulk(item_ids)
-
-            order_items = []
-            total_price = 0
-            for item_id_str, quantity in cart.items():
-                if not str(item_id_str).isdigit():
-                    continue
-                try:
-                    quantity = int(quantity)
-                except (TypeError, ValueError):
-                    continue
-
-                if quantity < 1 or quantity > MAX_PER_ITEM:
-                    continue
-
-                menu_item = menu_items.get(int(item_id_str))
-                if not menu_item:
-                    continue
-                if not menu_item.is_available:
-                    return Response(
-                        {"detail": f"Item '{menu_item.name}' is unavailable."},
-                        status=status.HTTP_409_CONFLICT,
-                    )
-
-                order_items.append(
-                    OrderItem(
-                        order=order,
-                        menu_item=menu_item,
-                        quantity=quantity,
-                        unit_price=menu_item.price,
-                    )
-                )
-                total_price += menu_item.price * quantity
-
-            if not order_items:
-                return Response({"detail": "No valid cart items found."}, status=status.HTTP_400_BAD_REQUEST)
-
-            OrderItem.objects.bulk_create(order_items)
-            order.total_price = total_price
-            order.save(update_fields=["total_price", "updated_at"])
+        draft = OrderDraft(user=request.user, notes=request.data.get("notes", ""), lines=lines_from_cart(cart))
+        try:
+            with transaction.atomic():
+                (order,) = create_orders([draft], empty_detail="No valid cart items found.")
+                _publish_orders_created([order])
+        except OrderAssemblyError as exc:
+            return Response({"detail": exc.detail}, status=exc.status_code)
 
         _save_cart(request, {})
         return Response(
@@ -338,7 +409,7 @@ class CafeReorderAPIView(APIView):
 
     def post(self, request, order_id):
         order = get_object_or_404(
-            CafeOrder.objects.prefetch_related("items__menu_item"),
+            CafeOrder.objects.prefetch_related("items"),
             id=order_id,
             user=request.user,
         )
@@ -349,18 +420,74 @@ class CafeReorderAPIView(APIView):
         return Response(_build_cart_payload(request))
 
 
+# Incremental syncs re-read this much history so slow commits are not skipped.
+STAFF_ORDERS_SYNC_OVERLAP = timedelta(seconds=2)
+
+
 class CafeStaffOrdersAPIView(APIView):
+    """
+    Open orders for the barista queue. With ``?since=<token>`` only orders updated after the
+    token are returned, plus ``removed`` ids for orders that were delivered or cancelled.
+    """
+
     permission_classes = [StaffOrAdminPermission]
 
     def get(self, request):
+        # Read the cursor first so events racing with the list are replayed, not lost.
+        cursor = latest_event_id()
+        next_since = timezone.now() - STAFF_ORDERS_SYNC_OVERLAP
         orders = (
-            CafeOrder.objects.exclude(status__in=[CafeOrder.Status.DELIVERED, CafeOrder.Status.CANCELLED])
+            CafeOrder.objects.filter(status__in=CafeOrder.OPEN_STATUSES)
             .select_related("user")
             .prefetch_related("items__menu_item")
             .order_by("created_at")
         )
-        serializer = StaffOrderReadSerializer(orders, many=True)
-        return Response({"orders": serializer.data})
+        payload = {"cursor": cursor, "since": next_since.isoformat()}
+
+        raw_since = request.query_params.get("since")
+        if raw_since:
+            since = parse_datetime(raw_since)
+            if since is None or timezone.is_naive(since):
+                return Response({"detail": "since must be a timezone-aware ISO datetime."}, status=status.HTTP_400_BAD_REQUEST)
+            orders = orders.filter(updated_at__gt=since)
+            payload["removed"] = list(
+                CafeOrder.objects.filter(status__in=CafeOrder.CLOSED_STATUSES, updated_at__gt=since)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+
+        payload["orders"] = StaffOrderReadSerializer(orders, many=True).data
+        return Response(payload)
+
+
+class CafeStaffOrderEventsAPIView(APIView):
+    """
+    Long-poll feed of order deltas: ``?cursor=<id>&wait=<seconds>`` (wait is capped at 3 seconds).
+    Without a cursor it returns the current one so clients can start following.
+    """
+
+    permission_classes = [StaffOrAdminPermission]
+
+    def get(self, request):
+        raw_cursor = request.query_params.get("cursor")
+        if raw_cursor is None:
+            return Response({"cursor": latest_event_id(), "events": []})
+
+        try:
+            cursor = int(raw_cursor)
+            wait = float(request.query_params.get("wait", 0))
+        except (TypeError, ValueError):
+            wait = None
+        if wait is None or not math.isfinite(wait):
+            return Response({"detail": "cursor and wait must be numbers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = wait_for_order_events(cursor, timeout=wait)
+        return Response(
+            {
+                "cursor": events[-1].id if events else cursor,
+                "events": [_serialize_order_event(event) for event in events],
+            }
+        )
 
 
 class CafeStaffOrderStatusAPIView(APIView):
@@ -375,6 +502,7 @@ class CafeStaffOrderStatusAPIView(APIView):
             order = get_object_or_404(CafeOrder.objects.select_for_update(), id=order_id)
             order.status = new_status
             order.save(update_fields=["status", "updated_at"])
+            publish_order_event(order, OrderEvent.Kind.STATUS, {"status": order.status})
         return Response({"order_id": order.id, "status": order.status})
 
 
@@ -386,6 +514,7 @@ class CafeStaffOrderPaymentToggleAPIView(APIView):
             order = get_object_or_404(CafeOrder.objects.select_for_update(), id=order_id)
             order.is_paid = not order.is_paid
             order.save(update_fields=["is_paid", "updated_at"])
+            publish_order_event(order, OrderEvent.Kind.PAYMENT, {"is_paid": order.is_paid})
         return Response({"order_id": order.id, "is_paid": order.is_paid})
 
 
@@ -458,51 +587,48 @@ class CafeStaffCustomerLookupAPIView(APIView):
 
 
 class CafeStaffManualOrdersAPIView(APIView):
+    """
+    Creates paid walk-in orders. Accepts a single order (``items``) or a POS batch
+    (``orders``: list of ``{phone_number, notes, items}``) committed in one transaction.
+    """
+
     permission_classes = [StaffOrAdminPermission]
 
+    @idempotent("cafe_manual_orders")
     def post(self, request):
-        items = request.data.get("items") or []
-        if not isinstance(items, list) or not items:
-            return Response({"detail": "items must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
-
-        phone_number = (request.data.get("phone_number") or "").strip()
-        notes = request.data.get("notes") or "Walk-in Guest"
-        customer = None
-        if phone_number:
-            customer = CustomUser.objects.filter(phone_number=phone_number).first()
-
-        with transaction.atomic():
-            order = CafeOrder.objects.create(user=customer, notes=notes, is_paid=True)
-            total_price = 0
-            order_items = []
-            for item in items:
-                menu_item_id = item.get("menu_item_id")
-                quantity = item.get("quantity", 1)
-                try:
-                    menu_item_id = int(menu_item_id)
-                    quantity = int(quantity)
-                except (TypeError, ValueError):
-                    continue
-                if quantity < 1 or quantity > MAX_PER_ITEM:
-                    continue
-
-                menu_item = MenuItem.objects.filter(id=menu_item_id).first()
-                if not menu_item:
-                    continue
-                order_items.append(
-                    OrderItem(
-                        order=order,
-                        menu_item=menu_item,
-                        quantity=quantity,
-                        unit_price=menu_item.price,
-                    )
-                )
-                total_price += menu_item.price * quantity
-
-            if not order_items:
-                return Response({"detail": "No valid items."}, status=status.HTTP_400_BAD_REQUEST)
-
-            OrderItem.objects.bulk_create(order_items)
-            order.total_price = total_price
-            order.save(update_fields=["total_price", "updated_at"])
-        return Response({"order_id": order.id, "total_price": _as_price(order.total_price)}, status=status.HTTP_201_CREATED)
+        batch = request.data.get("orders")
+        specs = batch if batch is not None else [request.data]
+        if not isinstance(specs, list) or not specs:
+            return Response({"detail": "orders must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if any(not isinstance(spec, dict) for spec in specs):
+            return Response({"detail": "Each order must be an object."}, status=status.HTTP_400_BAD_REQUEST)
+        for spec in specs:
+            items = spec.get("items") or []
+            if not isinstance(items, list) or not items:
+                return Response({"detail": "items must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+
+        phone_numbers = {(spec.get("phone_number") or "").strip() for spec in specs} - {""}
+        customers = {}
+        if phone_numbers:
+            customers = {user.phone_number: user for user in CustomUser.objects.filter(phone_number__in=phone_numbers)}
+
+        drafts = [
+            OrderDraft(
+                user=customers.get((spec.get("phone_number") or "").strip()),
+                notes=spec.get("notes") or "Walk-in Guest",
+                is_paid=True,
+                lines=lines_from_payload(spec["items"]),
+            )
+            for spec in specs
+        ]
+        try:
+            with transaction.atomic():
+                orders = create_orders(drafts)
+                _publish_orders_created(orders)
+        except OrderAssemblyError as exc:
+            return Response({"detail": exc.detail}, status=exc.status_code)
+
+        results = [{"order_id": order.id, "total_price": _as_price(order.total_price)} for order in orders]
+        if batch is not None:
+            return Response({"orders": results}, status=status.HTTP_201_CREATED)
+        return Response(results[0], status=status.HTTP_201_CREATED)
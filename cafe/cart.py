@@ -1,25 +1,68 @@
 """Shared cart/session logic for cafe APIs."""
 
-CART_SCHEMA_VERSION = 1
+import secrets
+
+from .cart_store import get_cart_store
+
 MAX_CART_ITEMS = 50
 MAX_PER_ITEM = 20
+CART_ID_SESSION_KEY = "cart_id"
+
+
+def _cart_id(request, create=False):
+    """
+    Returns the cart id stored in the session. The session is written only when a cart is
+    created; later quantity changes go to the cart store alone.
+    """
+    cart_id = request.session.get(CART_ID_SESSION_KEY)
+    if cart_id or not create:
+        return cart_id
+    cart_id = secrets.token_urlsafe(24)
+    request.session[CART_ID_SESSION_KEY] = cart_id
+    return cart_id
+
+
+def _migrate_session_cart(request):
+    # Carts saved before the cart store existed lived in the session itself.
+    legacy = request.session.get("cart")
+    if legacy is None:
+        return
+    request.session.pop("cart", None)
+    request.session.pop("cart_v", None)
+    if isinstance(legacy, dict) and legacy:
+        cleaned = {str(k): int(v) for k, v in legacy.items() if str(k).isdigit() and str(v).isdigit()}
+        get_cart_store().replace(_cart_id(request, create=True), cleaned)
 
 
 def get_cart(request):
     """
-    Retrieve a validated cart from session, resetting if schema changed or malformed.
+    Retrieve the cart as ``{"<menu_item_id>": quantity}``.
     """
-    cart = request.session.get("cart", {})
-    version = request.session.get("cart_v")
-    if not isinstance(cart, dict):
-        cart = {}
-    if version != CART_SCHEMA_VERSION:
-        request.session["cart_v"] = CART_SCHEMA_VERSION
-        # Keep existing cart if it is still valid.
-        request.session["cart"] = cart
-    return cart
+    _migrate_session_cart(request)
+    cart_id = _cart_id(request)
+    if not cart_id:
+        return {}
+    return get_cart_store().get(cart_id)
 
 
 def save_cart(request, cart):
-    request.session["cart"] = cart
-    request.session["cart_v"] = CART_SCHEMA_VERSION
+    """
+    Replaces the whole cart; use change_quantity for single-item updates.
+    """
+    if not cart and not _cart_id(request):
+        return
+    get_cart_store().replace(_cart_id(request, create=True), cart)
+
+
+def change_quantity(request, item_id, delta):
+    """
+    Atomically adds ``delta`` to one item, keeping it within MAX_PER_ITEM.
+    """
+    get_cart_store().incr(_cart_id(request, create=True), int(item_id), delta, MAX_PER_ITEM)
+
+
+def change_quantities(request, deltas):
+    """
+    Adds several deltas at once (``{"<menu_item_id>": delta}``), keeping each item within MAX_PER_ITEM.
+    """
+    get_cart_store().incr_many(_cart_id(request, create=True), deltas, MAX_PER_ITEM)
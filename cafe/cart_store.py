@@ -0,0 +1,222 @@
+"""
+Server-side cart storage.
+
+Carts are keyed by an opaque cart id kept in the session, so quantity changes update a single
+line in the store instead of rewriting the whole session row. The backend is picked with the
+``CAFE_CART_STORE`` setting:
+
+* ``database`` (default): one ``CartLine`` row per item, changed with atomic UPDATEs.
+* ``redis``: one hash per cart on ``CAFE_CART_REDIS_URL``; increments run as one Lua script.
+* ``memory``: the same hash layout on an in-process stand-in; single-process/dev only.
+"""
+
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+from config.backends import build_backend
+
+from .models import CartLine
+
+CART_TTL_SECONDS = 60 * 60 * 24 * 14
+
+# Adds ARGV[2] to field ARGV[1], removes the field at 0 and caps it at ARGV[3], in one step on
+# the server so two increments cannot both pass the cap.
+INCR_CAPPED_SCRIPT = """
+local quantity = redis.call("HINCRBY", KEYS[1], ARGV[1], ARGV[2])
+if quantity <= 0 then
+    redis.call("HDEL", KEYS[1], ARGV[1])
+    quantity = 0
+elseif quantity > tonumber(ARGV[3]) then
+    quantity = tonumber(ARGV[3])
+    redis.call("HSET", KEYS[1], ARGV[1], quantity)
+end
+redis.call("EXPIRE", KEYS[1], ARGV[4])
+return quantity
+"""
+
+
+class BaseCartStore:
+    def get(self, cart_id):
+        """Returns ``{"<menu_item_id>": quantity}`` for the cart."""
+        raise NotImplementedError
+
+    def incr(self, cart_id, item_id, delta, max_quantity):
+        """Atomically adds ``delta`` to one line, capped at ``max_quantity``; lines reaching 0 are removed."""
+        raise NotImplementedError
+
+    def incr_many(self, cart_id, deltas, max_quantity):
+        """
+        Applies ``{"<menu_item_id>": delta}`` with the same semantics as incr, so an increment
+        made by a concurrent request between reading the cart and this call is kept.
+        """
+        for item_id, delta in deltas.items():
+            if delta:
+                self.incr(cart_id, int(item_id), int(delta), max_quantity)
+
+    def replace(self, cart_id, cart):
+        raise NotImplementedError
+
+    def clear(self, cart_id):
+        raise NotImplementedError
+
+
+class DatabaseCartStore(BaseCartStore):
+    def get(self, cart_id):
+        lines = CartLine.objects.filter(cart_key=cart_id, quantity__gt=0).values_list("menu_item_id", "quantity")
+        return {str(item_id): quantity for item_id, quantity in lines}
+
+    def incr(self, cart_id, item_id, delta, max_quantity):
+        line = CartLine.objects.filter(cart_key=cart_id, menu_item_id=item_id)
+        new_quantity = Least(Greatest(F("quantity") + delta, 0), max_quantity)
+        if line.update(quantity=new_quantity, updated_at=timezone.now()):
+            if delta < 0:
+                line.filter(quantity=0).delete()
+            return
+        if delta <= 0:
+            return
+        try:
+            with transaction.atomic():
+                CartLine.objects.create(cart_key=cart_id, menu_item_id=item_id, quantity=min(delta, max_quantity))
+        except IntegrityError:
+            # A concurrent request created the line first; apply the increment to it instead.
+            line.update(quantity=new_quantity, updated_at=timezone.now())
+
+    def incr_many(self, cart_id, deltas, max_quantity):
+        with transaction.atomic():
+            super().incr_many(cart_id, deltas, max_quantity)
+
+    def replace(self, cart_id, cart):
+        with transaction.atomic():
+            CartLine.objects.filter(cart_key=cart_id).delete()
+            CartLine.objects.bulk_create(
+                [
+                    CartLine(cart_key=cart_id, menu_item_id=int(item_id), quantity=int(quantity))
+                    for item_id, quantity in cart.items()
+                    if int(quantity) > 0
+                ]
+            )
+
+    def clear(self, cart_id):
+        CartLine.objects.filter(cart_key=cart_id).delete()
+
+
+class LocalHashClient:
+    """In-process stand-in for the subset of the Redis hash API used by HashCartStore."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def hgetall(self, name):
+        with self._lock:
+            return dict(self._data.get(name, {}))
+
+    def hincrby(self, name, key, amount=1):
+        with self._lock:
+            bucket = self._data.setdefault(name, {})
+            bucket[key] = int(bucket.get(key, 0)) + amount
+            return bucket[key]
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        with self._lock:
+            bucket = self._data.setdefault(name, {})
+            if key is not None:
+                bucket[key] = value
+            bucket.update(mapping or {})
+
+    def hdel(self, name, *keys):
+        with self._lock:
+            bucket = self._data.get(name, {})
+            for key in keys:
+                bucket.pop(key, None)
+
+    def delete(self, *names):
+        with self._lock:
+            for name in names:
+                self._data.pop(name, None)
+
+    def expire(self, name, seconds):
+        # Entries live for the process lifetime; expiry only matters on a real server.
+        return True
+
+    def register_script(self, script):
+        """
+        Returns a callable running INCR_CAPPED_SCRIPT (the only script the cart store uses)
+        under the stand-in's lock, with redis-py's ``script(keys=..., args=...)`` signature.
+        """
+        if script != INCR_CAPPED_SCRIPT:
+            raise NotImplementedError("LocalHashClient only runs INCR_CAPPED_SCRIPT.")
+
+        def incr_capped(keys, args):
+            (name,), (key, delta, max_quantity, _seconds) = keys, args
+            with self._lock:
+                bucket = self._data.setdefault(name, {})
+                quantity = min(int(bucket.get(key, 0)) + int(delta), int(max_quantity))
+                if quantity <= 0:
+                    bucket.pop(key, None)
+                    return 0
+                bucket[key] = quantity
+                return quantity
+
+        return incr_capped
+
+
+def _decode(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+class HashCartStore(BaseCartStore):
+    def __init__(self, client):
+        self.client = client
+        self._incr_capped = client.register_script(INCR_CAPPED_SCRIPT)
+
+    def _name(self, cart_id):
+        return f"cafe:cart:{cart_id}"
+
+    def get(self, cart_id):
+        raw = self.client.hgetall(self._name(cart_id))
+        cart = {}
+        for item_id, quantity in raw.items():
+            quantity = int(_decode(quantity))
+            if quantity > 0:
+                cart[_decode(item_id)] = quantity
+        return cart
+
+    def incr(self, cart_id, item_id, delta, max_quantity):
+        self._incr_capped(keys=[self._name(cart_id)], args=[str(item_id), delta, max_quantity, CART_TTL_SECONDS])
+
+    def replace(self, cart_id, cart):
+        name = self._name(cart_id)
+        self.client.delete(name)
+        mapping = {str(item_id): int(quantity) for item_id, quantity in cart.items() if int(quantity) > 0}
+        if mapping:
+            self.client.hset(name, mapping=mapping)
+            self.client.expire(name, CART_TTL_SECONDS)
+
+    def clear(self, cart_id):
+        self.client.delete(self._name(cart_id))
+
+
+def _redis_cart_store():
+    import redis
+
+    return HashCartStore(redis.Redis.from_url(settings.CAFE_CART_REDIS_URL))
+
+
+@lru_cache(maxsize=None)
+def get_cart_store():
+    return build_backend(
+        "CAFE_CART_STORE",
+        "database",
+        {
+            "database": DatabaseCartStore,
+            "memory": lambda: HashCartStore(LocalHashClient()),
+            "redis": _redis_cart_store,
+        },
+    )
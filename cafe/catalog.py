@@ -0,0 +1,61 @@
+"""
+Process-local menu catalog for cart display and add-to-cart checks.
+
+The whole menu is small, so each process keeps it in memory and reloads it only when the
+menu version (a database counter bumped by menu edits, see cafe.signals) moves. Orders are
+priced from the menu rows themselves (see cafe.order_assembly), not from this catalog.
+"""
+
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+
+from .menu_snapshot import menu_version
+from .models import MenuItem
+
+
+@dataclass(frozen=True)
+class CatalogItem:
+    id: int
+    name: str
+    description: str
+    price: Decimal
+    category_id: int
+    category_name: str
+    is_available: bool
+    image_url: str | None
+
+
+_lock = threading.Lock()
+_loaded_version = None
+_items = {}
+
+
+def _load():
+    return {
+        item.id: CatalogItem(
+            id=item.id,
+            name=item.name,
+            description=item.description,
+            price=item.price,
+            category_id=item.category_id,
+            category_name=item.category.name,
+            is_available=item.is_available,
+            image_url=item.image.url if item.image else None,
+        )
+        for item in MenuItem.objects.select_related("category")
+    }
+
+
+def get_catalog():
+    """
+    Returns ``{menu_item_id: CatalogItem}`` for every menu item, available or not.
+    """
+    global _loaded_version, _items
+    version = menu_version()
+    if version != _loaded_version:
+        with _lock:
+            if version != _loaded_version:
+                _items = _load()
+                _loaded_version = version
+    return _items
@@ -1,17 +1,17 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cart import get_cart
+
+
 def cart_context(request):
     """
     Context processor to provide the cart count globally.
+
+    The cart is only read when a template actually uses ``cart_count``.
     """
     if not hasattr(request, 'session'):
         return {'cart_count': 0}
-        
-    cart = request.session.get('cart', {})
-    # Simple count of total items in cart
-    try:
-        cart_items_count = sum(cart.values()) if isinstance(cart, dict) else 0
-    except (AttributeError, TypeError):
-        cart_items_count = 0
-        
+
     return {
-        'cart_count': cart_items_count
-    }
\ No newline at end of file
+        'cart_count': SimpleLazyObject(lambda: sum(get_cart(request).values()))
+    }
@@ -0,0 +1,41 @@
+"""Versioned, pre-rendered snapshot of the public cafe menu."""
+
+import hashlib
+
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from config.cache_versions import bump_version, get_version
+
+MENU_VERSION_NAMESPACE = "cafe_menu"
+# A price change made with queryset.update() or raw SQL fires no signal and leaves the version
+# alone; the rendered menu expires after ten minutes so such changes still show up.
+MENU_SNAPSHOT_TIMEOUT = 60 * 10
+
+
+def menu_version():
+    return get_version(MENU_VERSION_NAMESPACE)
+
+
+def invalidate_menu():
+    """
+    Moves the menu version forward. The counter row is written in the surrounding transaction,
+    so every worker switches to a fresh snapshot once the menu edit commits.
+    """
+    bump_version(MENU_VERSION_NAMESPACE)
+
+
+def get_menu_snapshot(request, build_payload):
+    """
+    Returns ``(body, etag)`` for the current menu version.
+
+    ``build_payload`` is only called when no snapshot exists for this version and host;
+    image URLs are absolute, so the host is part of the key.
+    """
+    key = f"cafe_menu_snapshot:{menu_version()}:{request.build_absolute_uri('/')}"
+    snapshot = cache.get(key)
+    if snapshot is None:
+        body = JSONRenderer().render(build_payload())
+        snapshot = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        cache.set(key, snapshot, timeout=MENU_SNAPSHOT_TIMEOUT)
+    return snapshot
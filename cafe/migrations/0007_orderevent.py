@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-18 00:41
+
+import django.db.models.deletion
+import django_jalali.db.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0006_alter_menuitem_image_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('CREATED', 'Created'), ('STATUS', 'Status Changed'), ('PAYMENT', 'Payment Changed')], max_length=10, verbose_name='Kind')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Payload')),
+                ('created_at', django_jalali.db.models.jDateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='cafe.cafeorder')),
+            ],
+            options={
+                'verbose_name': 'Order Event',
+                'verbose_name_plural': 'Order Events',
+                'ordering': ['id'],
+            },
+        ),
+    ]
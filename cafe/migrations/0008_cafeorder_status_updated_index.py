@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-18 00:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0007_orderevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cafeorder',
+            index=models.Index(fields=['status', 'updated_at'], name='cafe_order_status_updated_idx'),
+        ),
+    ]
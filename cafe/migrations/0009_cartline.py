@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-18 00:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0008_cafeorder_status_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CartLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cart_key', models.CharField(max_length=64, verbose_name='Cart Key')),
+                ('quantity', models.PositiveIntegerField(default=0, verbose_name='Quantity')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cafe.menuitem', verbose_name='Menu Item')),
+            ],
+            options={
+                'verbose_name': 'Cart Line',
+                'verbose_name_plural': 'Cart Lines',
+                'indexes': [models.Index(fields=['updated_at'], name='cafe_cartline_updated_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cart_key', 'menu_item'), name='unique_cart_line_item')],
+            },
+        ),
+    ]
@@ -57,6 +57,9 @@ class CafeOrder(models.Model):
         DELIVERED = 'DELIVERED', _('Delivered')
         CANCELLED = 'CANCELLED', _('Cancelled')
 
+    OPEN_STATUSES = (Status.PENDING, Status.PREPARING, Status.READY)
+    CLOSED_STATUSES = (Status.DELIVERED, Status.CANCELLED)
+
     user = models.ForeignKey('accounts.CustomUser', on_delete=models.SET_NULL, null=True, blank=True, verbose_name=_("Customer"))
     status = models.CharField(_("Status"), max_length=20, choices=Status.choices, default=Status.PENDING)
     is_paid = models.BooleanField(_("Is Paid"), default=False)
@@ -76,6 +79,9 @@ class CafeOrder(models.Model):
         verbose_name = _("Cafe Order")
         verbose_name_plural = _("Cafe Orders")
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='cafe_order_status_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.get_status_display()}"
@@ -86,7 +92,28 @@ class CafeOrder(models.Model):
             total=models.Sum(models.F('unit_price') * models.F('quantity'))
         )['total'] or 0
         self.total_price = total
-        self.save()
+        self.save(update_fields=['total_price', 'updated_at'])
+
+class OrderEvent(models.Model):
+    """Append-only feed of order changes; the id doubles as the staff feed cursor."""
+
+    class Kind(models.TextChoices):
+        CREATED = 'CREATED', _('Created')
+        STATUS = 'STATUS', _('Status Changed')
+        PAYMENT = 'PAYMENT', _('Payment Changed')
+
+    order = models.ForeignKey(CafeOrder, related_name='events', on_delete=models.CASCADE)
+    kind = models.CharField(_("Kind"), max_length=10, choices=Kind.choices)
+    payload = models.JSONField(_("Payload"), default=dict, blank=True)
+    created_at = jmodels.jDateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Order Event")
+        verbose_name_plural = _("Order Events")
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} order {self.order_id}"
 
 class OrderItem(models.Model):
     order = models.ForeignKey(CafeOrder, related_name='items', on_delete=models.CASCADE)
@@ -98,10 +125,44 @@ class OrderItem(models.Model):
         return self.unit_price * self.quantity
 
     def save(self, *args, **kwargs):
+        from .order_totals import mark_order_dirty
+
         if not self.unit_price:
             self.unit_price = self.menu_item.price
         super().save(*args, **kwargs)
-        self.order.update_total_price()
+        # Inside batched_order_totals the total is recalculated once per block rather than per line.
+        mark_order_dirty(self.order_id, using=self._state.db)
+
+    def delete(self, *args, **kwargs):
+        from .order_totals import mark_order_dirty
+
+        order_id = self.order_id
+        using = self._state.db
+        result = super().delete(*args, **kwargs)
+        mark_order_dirty(order_id, using=using)
+        return result
 
     def __str__(self):
         return f"{self.quantity}x {self.menu_item.name}"
+
+
+class CartLine(models.Model):
+    """One menu item in a server-side cart; used by the database cart store."""
+
+    cart_key = models.CharField(_("Cart Key"), max_length=64)
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, verbose_name=_("Menu Item"))
+    quantity = models.PositiveIntegerField(_("Quantity"), default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Cart Line")
+        verbose_name_plural = _("Cart Lines")
+        constraints = [
+            models.UniqueConstraint(fields=['cart_key', 'menu_item'], name='unique_cart_line_item'),
+        ]
+        indexes = [
+            models.Index(fields=['updated_at'], name='cafe_cartline_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cart_key}: {self.quantity}x {self.menu_item_id}"
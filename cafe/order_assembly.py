@@ -0,0 +1,112 @@
+"""Order assembly shared by checkout and staff manual orders."""
+
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from rest_framework import status
+
+from analytics.rollups import local_day, schedule_rollup_refresh
+
+from .cart import MAX_PER_ITEM
+from .models import CafeOrder, MenuItem, OrderItem
+
+
+class OrderAssemblyError(Exception):
+    def __init__(self, detail, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+@dataclass
+class OrderDraft:
+    user: object = None
+    notes: str = ""
+    is_paid: bool = False
+    lines: list = field(default_factory=list)  # [(menu_item_id, quantity), ...]
+
+
+def _valid_line(menu_item_id, quantity):
+    try:
+        menu_item_id = int(menu_item_id)
+        quantity = int(quantity)
+    except (TypeError, ValueError):
+        return None
+    if quantity < 1 or quantity > MAX_PER_ITEM:
+        return None
+    return menu_item_id, quantity
+
+
+def lines_from_cart(cart):
+    """
+    Converts a session cart (``{"<item_id>": quantity}``) to order lines, dropping malformed entries.
+    """
+    lines = []
+    for item_id, quantity in cart.items():
+        if not str(item_id).isdigit():
+            continue
+        line = _valid_line(item_id, quantity)
+        if line:
+            lines.append(line)
+    return lines
+
+
+def lines_from_payload(items):
+    """
+    Converts ``[{"menu_item_id": ..., "quantity": ...}]`` to order lines, dropping malformed entries.
+    """
+    lines = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        line = _valid_line(item.get("menu_item_id"), item.get("quantity", 1))
+        if line:
+            lines.append(line)
+    return lines
+
+
+def create_orders(drafts, empty_detail="No valid items."):
+    """
+    Validates every draft against the current menu rows and inserts them in one transaction.
+
+    Prices and availability are read from the database, never from a cached catalog. Unknown
+    items are skipped; an unavailable item or a draft with no valid lines raises
+    OrderAssemblyError and nothing is written.
+    """
+    menu_item_ids = {menu_item_id for draft in drafts for menu_item_id, _ in draft.lines}
+    menu_items = MenuItem.objects.only("id", "name", "price", "is_available").in_bulk(menu_item_ids)
+
+    prepared = []
+    for draft in drafts:
+        resolved = []
+        for menu_item_id, quantity in draft.lines:
+            menu_item = menu_items.get(menu_item_id)
+            if not menu_item:
+                continue
+            if not menu_item.is_available:
+                raise OrderAssemblyError(f"Item '{menu_item.name}' is unavailable.", status.HTTP_409_CONFLICT)
+            resolved.append((menu_item, quantity))
+        if not resolved:
+            raise OrderAssemblyError(empty_detail)
+        prepared.append((draft, resolved))
+
+    orders = [
+        CafeOrder(
+            user=draft.user,
+            notes=draft.notes,
+            is_paid=draft.is_paid,
+            total_price=sum(menu_item.price * quantity for menu_item, quantity in resolved),
+        )
+        for draft, resolved in prepared
+    ]
+    with transaction.atomic():
+        CafeOrder.objects.bulk_create(orders)
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(order=order, menu_item_id=menu_item.id, quantity=quantity, unit_price=menu_item.price)
+                for order, (_, resolved) in zip(orders, prepared)
+                for menu_item, quantity in resolved
+            ]
+        )
+        schedule_rollup_refresh(cafe_days=[local_day(order.created_at) for order in orders])
+    return orders
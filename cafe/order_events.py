@@ -0,0 +1,70 @@
+"""Order change feed for barista screens (long-poll over an OrderEvent cursor)."""
+
+from datetime import timedelta
+from time import monotonic, sleep
+
+from django.utils import timezone
+
+from .models import OrderEvent
+
+# A waiting request holds one of the 8 sync gunicorn threads (2 workers x 4 threads) for up to
+# this long, so screens polling back to back occupy at most one thread each; see the thread
+# budget in deploy/DEPLOYMENT.md.
+MAX_WAIT_SECONDS = 3
+POLL_INTERVAL_SECONDS = 1.0
+MAX_EVENTS_PER_RESPONSE = 200
+# Ids are taken at insert time but become visible at commit, so a lower id can still appear
+# after a higher one. A gap younger than this is assumed to be an open transaction.
+LATE_COMMIT_SECONDS = 5
+
+
+def publish_order_event(order, kind, payload=None):
+    """
+    Records a change for the staff feed. Call it inside the transaction that changes the order.
+    """
+    return OrderEvent.objects.create(order=order, kind=kind, payload=payload or {})
+
+
+def publish_order_events(entries):
+    """
+    Bulk variant of publish_order_event for ``(order, kind, payload)`` tuples.
+    """
+    return OrderEvent.objects.bulk_create(
+        [OrderEvent(order=order, kind=kind, payload=payload or {}) for order, kind, payload in entries]
+    )
+
+
+def latest_event_id():
+    return OrderEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def _settled(events, cursor):
+    """
+    Returns the leading run of ``events`` that cannot be overtaken by a late commit: it stops
+    before the first event that follows a missing id and is younger than LATE_COMMIT_SECONDS.
+    """
+    settled_before = timezone.now() - timedelta(seconds=LATE_COMMIT_SECONDS)
+    expected = cursor + 1
+    for index, event in enumerate(events):
+        if event.id != expected and event.created_at.togregorian() > settled_before:
+            return events[:index]
+        expected = event.id + 1
+    return events
+
+
+def wait_for_order_events(cursor, timeout=0):
+    """
+    Returns events after ``cursor``, waiting up to ``timeout`` seconds for one to appear.
+
+    Events behind a recent gap in the ids are held back (the window after the cursor is read
+    again on the next poll) until the gap fills or ages out, so advancing the cursor never
+    skips an event that commits late. While idle each poll is a single primary-key range probe.
+    """
+    deadline = monotonic() + min(max(timeout, 0), MAX_WAIT_SECONDS)
+    pending = OrderEvent.objects.filter(id__gt=cursor).order_by("id")
+    while True:
+        events = _settled(list(pending[:MAX_EVENTS_PER_RESPONSE]), cursor)
+        remaining = deadline - monotonic()
+        if events or remaining <= 0:
+            return events
+        sleep(min(POLL_INTERVAL_SECONDS, remaining))
@@ -0,0 +1,79 @@
+"""Batched recalculation of CafeOrder.total_price."""
+
+import threading
+from contextlib import contextmanager
+
+from django.db import router, transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from analytics.rollups import order_days, schedule_rollup_refresh
+from config.pending_keys import PendingKeys
+
+from .models import CafeOrder, OrderItem
+
+# Orders marked dirty inside ``batched_order_totals``, and how deeply each thread has entered it
+# per database alias. Ids left behind by a rolled-back savepoint are recalculated with the rest.
+_pending = PendingKeys()
+_depth = threading.local()
+
+
+@contextmanager
+def batched_order_totals(using=None):
+    """
+    Collects the orders whose lines are written inside the block and recalculates them with a
+    single UPDATE when it exits, before the surrounding transaction commits.
+    """
+    using = using or router.db_for_write(CafeOrder)
+    depth = getattr(_depth, using, 0)
+    setattr(_depth, using, depth + 1)
+    try:
+        with transaction.atomic(using=using):
+            yield
+            if not depth:
+                recalculate_order_totals(_pending.drain(using), using=using)
+    finally:
+        setattr(_depth, using, depth)
+        if not depth:
+            _pending.drain(using)
+
+
+def mark_order_dirty(order_id, using=None):
+    """
+    Recalculates the order's total, or defers it to the end of the enclosing
+    ``batched_order_totals`` block.
+    """
+    using = using or router.db_for_write(CafeOrder)
+    if getattr(_depth, using, 0):
+        _pending.add([order_id], using=using)
+    else:
+        recalculate_order_totals([order_id], using=using)
+
+
+def recalculate_order_totals(order_ids, using=None):
+    """
+    Recomputes total_price for many orders in one statement. Returns the number of rows updated.
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return 0
+
+    line_totals = (
+        OrderItem.objects.filter(order=OuterRef("pk"))
+        .values("order")
+        .annotate(total=Sum(F("unit_price") * F("quantity")))
+        .values("total")
+    )
+    price_field = DecimalField(max_digits=12, decimal_places=0)
+    updated = (
+        CafeOrder.objects.using(using or router.db_for_write(CafeOrder))
+        .filter(pk__in=order_ids)
+        .update(
+            total_price=Coalesce(Subquery(line_totals, output_field=price_field), Value(0), output_field=price_field),
+            updated_at=timezone.now(),
+        )
+    )
+    # The UPDATE bypasses post_save, so the sales rollups are told directly.
+    schedule_rollup_refresh(cafe_days=order_days(order_ids))
+    return updated
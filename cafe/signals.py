@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .menu_snapshot import invalidate_menu
+from .models import MenuCategory, MenuItem
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+@receiver([post_save, post_delete], sender=MenuCategory)
+def invalidate_menu_on_change(sender, **kwargs):
+    invalidate_menu()
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from cafe.cart_store import DatabaseCartStore, HashCartStore, LocalHashClient
+from cafe.factories import MenuItemFactory
+from cafe.models import CartLine
+
+
+class CartStoreTests(TestCase):
+    def setUp(self):
+        self.item = MenuItemFactory()
+        self.other = MenuItemFactory()
+        self.stores = {"database": DatabaseCartStore(), "memory": HashCartStore(LocalHashClient())}
+
+    def test_incr_creates_caps_and_removes_lines(self):
+        for name, store in self.stores.items():
+            with self.subTest(store=name):
+                store.incr("cart-a", self.item.id, 1, 3)
+                store.incr("cart-a", self.item.id, 5, 3)
+                store.incr("cart-a", self.other.id, 1, 3)
+                self.assertEqual(store.get("cart-a"), {str(self.item.id): 3, str(self.other.id): 1})
+
+                store.incr("cart-a", self.other.id, -1, 3)
+                store.incr("cart-a", self.other.id, -1, 3)
+                self.assertEqual(store.get("cart-a"), {str(self.item.id): 3})
+
+    def test_incr_many_keeps_concurrent_increments(self):
+        for name, store in self.stores.items():
+            with self.subTest(store=name):
+                store.incr("cart-a", self.item.id, 1, 20)
+                read = store.get("cart-a")
+                store.incr("cart-a", self.item.id, 1, 20)  # another request adds one meanwhile
+
+                store.incr_many("cart-a", {str(self.item.id): 2, str(self.other.id): 1}, 20)
+                self.assertEqual(read, {str(self.item.id): 1})
+                self.assertEqual(store.get("cart-a"), {str(self.item.id): 4, str(self.other.id): 1})
+
+                store.incr_many("cart-a", {str(self.other.id): -1}, 20)
+                self.assertEqual(store.get("cart-a"), {str(self.item.id): 4})
+
+    def test_replace_and_clear_are_scoped_to_one_cart(self):
+        for name, store in self.stores.items():
+            with self.subTest(store=name):
+                store.replace("cart-a", {str(self.item.id): 2})
+                store.replace("cart-b", {str(self.other.id): 1})
+                store.clear("cart-a")
+
+                self.assertEqual(store.get("cart-a"), {})
+                self.assertEqual(store.get("cart-b"), {str(self.other.id): 1})
+
+    def test_database_quantity_change_is_a_single_row_update(self):
+        store = self.stores["database"]
+        store.incr("cart-a", self.item.id, 1, 20)
+        with self.assertNumQueries(1):
+            store.incr("cart-a", self.item.id, 1, 20)
+        self.assertEqual(CartLine.objects.get(cart_key="cart-a").quantity, 2)
+
+    def test_hash_capped_increment_is_a_single_script_call(self):
+        client = mock.Mock(wraps=LocalHashClient())
+        store = HashCartStore(client)
+
+        store.incr("cart-a", self.item.id, 5, 3)
+
+        client.hincrby.assert_not_called()
+        client.hset.assert_not_called()
+        self.assertEqual(store.get("cart-a"), {str(self.item.id): 3})
@@ -0,0 +1,73 @@
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.factories import UserFactory
+from cafe.factories import MenuItemFactory
+from cafe.models import CafeOrder, OrderItem
+from cafe.order_totals import batched_order_totals, recalculate_order_totals
+
+
+class OrderTotalsTests(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.item = MenuItemFactory(price=100000)
+        self.order = CafeOrder.objects.create(user=self.user)
+
+    def test_line_item_writes_recalculate_once_per_batch(self):
+        with CaptureQueriesContext(connection) as ctx:
+            with batched_order_totals():
+                OrderItem.objects.create(order=self.order, menu_item=self.item, quantity=1, unit_price=100000)
+                line = OrderItem.objects.create(order=self.order, menu_item=self.item, quantity=3, unit_price=100000)
+                line.quantity = 2
+                line.save()
+
+        totals_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "cafe_cafeorder"')]
+        self.assertEqual(len(totals_updates), 1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, 300000)
+
+    def test_total_is_written_before_the_transaction_commits(self):
+        with transaction.atomic():
+            with batched_order_totals():
+                OrderItem.objects.create(order=self.order, menu_item=self.item, quantity=2, unit_price=100000)
+            # Still inside the transaction: nobody can read the new line with the old total.
+            self.order.refresh_from_db()
+            self.assertEqual(self.order.total_price, 200000)
+
+    def test_deleting_line_item_marks_order_dirty(self):
+        line = OrderItem.objects.create(order=self.order, menu_item=self.item, quantity=2, unit_price=100000)
+        line.delete()
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, 0)
+
+    def test_marks_from_a_rolled_back_savepoint_do_not_block_later_ones(self):
+        with batched_order_totals():
+            try:
+                with transaction.atomic():
+                    OrderItem.objects.create(order=self.order, menu_item=self.item, quantity=5, unit_price=100000)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            OrderItem.objects.create(order=self.order, menu_item=self.item, quantity=1, unit_price=100000)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, 100000)
+
+    def test_bulk_recalculation_updates_many_orders(self):
+        other = CafeOrder.objects.create(user=self.user)
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(order=self.order, menu_item=self.item, quantity=2, unit_price=50000),
+                OrderItem(order=other, menu_item=self.item, quantity=1, unit_price=70000),
+            ]
+        )
+
+        updated = recalculate_order_totals([self.order.id, other.id])
+
+        self.assertEqual(updated, 2)
+        self.order.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.order.total_price, 100000)
+        self.assertEqual(other.total_price, 70000)
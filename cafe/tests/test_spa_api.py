@@ -1,11 +1,19 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import F
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.contrib.auth.models import Group
 from rest_framework.test import APIClient
 
 from accounts.factories import UserFactory
+from accounts.models import CacheVersion
 from cafe.factories import MenuCategoryFactory, MenuItemFactory
-from cafe.models import CafeOrder, OrderItem
-from cafe.cart import MAX_CART_ITEMS
+from cafe.models import CafeOrder, MenuItem, OrderEvent, OrderItem
+from cafe.cart import MAX_CART_ITEMS, MAX_PER_ITEM
+from cafe.menu_snapshot import MENU_VERSION_NAMESPACE
 
 
 class CafeSPAApiTests(TestCase):
@@ -18,8 +26,39 @@ class CafeSPAApiTests(TestCase):
     def test_menu_endpoint_returns_categories(self):
         response = self.client.get("/api/cafe/menu/")
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data["categories"]), 1)
-        self.assertEqual(response.data["categories"][0]["name"], "Coffee")
+        self.assertEqual(len(response.json()["categories"]), 1)
+        self.assertEqual(response.json()["categories"][0]["name"], "Coffee")
+
+    def test_menu_endpoint_supports_conditional_get(self):
+        response = self.client.get("/api/cafe/menu/")
+        etag = response["ETag"]
+
+        cached = self.client.get("/api/cafe/menu/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+
+    def test_menu_snapshot_rebuilt_after_availability_change(self):
+        first = self.client.get("/api/cafe/menu/")
+        self.assertEqual(len(first.json()["categories"][0]["items"]), 1)
+
+        self.item.is_available = False
+        self.item.save(update_fields=["is_available", "updated_at"])
+
+        second = self.client.get("/api/cafe/menu/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second.json()["categories"][0]["items"], [])
+
+    def test_menu_snapshot_follows_version_bumped_by_another_process(self):
+        first = self.client.get("/api/cafe/menu/")
+
+        # Simulates an edit handled by another worker: no signal or cache write reaches this one.
+        MenuItem.objects.filter(id=self.item.id).update(name="Flat white")
+        CacheVersion.objects.filter(namespace=MENU_VERSION_NAMESPACE).update(version=F("version") + 1)
+
+        second = self.client.get("/api/cafe/menu/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()["categories"][0]["items"][0]["name"], "Flat white")
 
     def test_cart_add_and_remove_item(self):
         add_response = self.client.post(
@@ -38,6 +77,56 @@ class CafeSPAApiTests(TestCase):
         self.assertEqual(remove_response.status_code, 200)
         self.assertEqual(remove_response.data["cart_count"], 0)
 
+    def test_cart_batch_applies_operations_in_one_request(self):
+        other = MenuItemFactory(category=self.category, price=50000)
+        self.client.post("/api/cafe/cart/items/", {"menu_item_id": self.item.id, "delta": 1}, format="json")
+
+        response = self.client.post(
+            "/api/cafe/cart/items/batch/",
+            {
+                "operations": [
+                    {"menu_item_id": self.item.id, "delta": 4},
+                    {"menu_item_id": other.id, "quantity": 2},
+                    {"menu_item_id": self.item.id, "delta": -2},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        quantities = {item["item_id"]: item["quantity"] for item in response.data["items"]}
+        self.assertEqual(quantities, {self.item.id: 3, other.id: 2})
+        self.assertEqual(response.data["total"], 3 * 120000 + 2 * 50000)
+        self.assertEqual(self.client.get("/api/cafe/cart/").data["cart_count"], 5)
+
+    def test_cart_batch_is_all_or_nothing(self):
+        hidden = MenuItemFactory(category=self.category, is_available=False)
+        response = self.client.post(
+            "/api/cafe/cart/items/batch/",
+            {"operations": [{"menu_item_id": self.item.id, "delta": 1}, {"menu_item_id": hidden.id, "delta": 1}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 409)
+
+        over_limit = self.client.post(
+            "/api/cafe/cart/items/batch/",
+            {"operations": [{"menu_item_id": self.item.id, "quantity": MAX_PER_ITEM + 1}]},
+            format="json",
+        )
+        self.assertEqual(over_limit.status_code, 400)
+        self.assertEqual(self.client.get("/api/cafe/cart/").data["cart_count"], 0)
+
+    def test_cart_reads_use_menu_catalog(self):
+        self.client.post("/api/cafe/cart/items/", {"menu_item_id": self.item.id, "delta": 1}, format="json")
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/cafe/cart/")
+        self.assertEqual(response.data["total"], 120000)
+        self.assertFalse([q for q in ctx.captured_queries if "cafe_menuitem" in q["sql"]])
+
+        self.item.price = 90000
+        self.item.save()
+        self.assertEqual(self.client.get("/api/cafe/cart/").data["total"], 90000)
+
     def test_cart_item_delta_validation(self):
         response = self.client.post(
             "/api/cafe/cart/items/",
@@ -86,6 +175,39 @@ class CafeSPAApiTests(TestCase):
         self.assertEqual(cart_response.status_code, 200)
         self.assertEqual(cart_response.data["cart_count"], 0)
 
+    def test_checkout_prices_and_availability_come_from_the_database(self):
+        self.client.post("/api/cafe/cart/items/", {"menu_item_id": self.item.id, "delta": 1}, format="json")
+        self.client.force_authenticate(user=self.user)
+        # Queryset updates skip the signals, so the catalog in this process is left stale.
+        MenuItem.objects.filter(id=self.item.id).update(price=150000)
+
+        response = self.client.post("/api/cafe/checkout/", {"notes": "desk 3"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        order = CafeOrder.objects.get(user=self.user)
+        self.assertEqual(order.total_price, 150000)
+        self.assertEqual(order.items.get().unit_price, 150000)
+
+        self.client.post("/api/cafe/cart/items/", {"menu_item_id": self.item.id, "delta": 1}, format="json")
+        MenuItem.objects.filter(id=self.item.id).update(is_available=False)
+        response = self.client.post("/api/cafe/checkout/", {}, format="json")
+        self.assertEqual(response.status_code, 409)
+
+    def test_checkout_retry_with_idempotency_key_replays_response(self):
+        self.client.post("/api/cafe/cart/items/", {"menu_item_id": self.item.id, "delta": 1}, format="json")
+        self.client.force_authenticate(user=self.user)
+
+        first = self.client.post("/api/cafe/checkout/", {"notes": "desk 3"}, format="json", HTTP_IDEMPOTENCY_KEY="abc-1")
+        retry = self.client.post("/api/cafe/checkout/", {"notes": "desk 3"}, format="json", HTTP_IDEMPOTENCY_KEY="abc-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.data["order_id"], first.data["order_id"])
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(CafeOrder.objects.filter(user=self.user).count(), 1)
+
+        reused = self.client.post("/api/cafe/checkout/", {"notes": "desk 4"}, format="json", HTTP_IDEMPOTENCY_KEY="abc-1")
+        self.assertEqual(reused.status_code, 422)
+
 
 class CafeStaffSPAApiTests(TestCase):
     def setUp(self):
@@ -132,6 +254,86 @@ class CafeStaffSPAApiTests(TestCase):
         self.assertEqual(self.order.status, CafeOrder.Status.PREPARING)
         self.assertTrue(self.order.is_paid)
 
+    def test_staff_order_events_feed_returns_deltas_after_cursor(self):
+        self.client.force_authenticate(user=self.staff)
+        cursor = self.client.get("/api/cafe/staff/orders/").data["cursor"]
+
+        self.client.post(
+            f"/api/cafe/staff/orders/{self.order.id}/status/",
+            {"status": CafeOrder.Status.READY},
+            format="json",
+        )
+        self.client.post(f"/api/cafe/staff/orders/{self.order.id}/toggle-payment/", {}, format="json")
+        self.client.post(
+            "/api/cafe/staff/manual-orders/",
+            {"items": [{"menu_item_id": self.item.id, "quantity": 2}]},
+            format="json",
+        )
+
+        feed = self.client.get("/api/cafe/staff/orders/events/", {"cursor": cursor})
+        self.assertEqual(feed.status_code, 200)
+        kinds = [event["kind"] for event in feed.data["events"]]
+        self.assertEqual(kinds, [OrderEvent.Kind.STATUS, OrderEvent.Kind.PAYMENT, OrderEvent.Kind.CREATED])
+        self.assertEqual(feed.data["events"][0]["payload"], {"status": CafeOrder.Status.READY})
+        self.assertEqual(len(feed.data["events"][2]["payload"]["items"]), 1)
+
+        idle = self.client.get("/api/cafe/staff/orders/events/", {"cursor": feed.data["cursor"], "wait": 0})
+        self.assertEqual(idle.data["events"], [])
+        self.assertEqual(idle.data["cursor"], feed.data["cursor"])
+
+    def test_staff_order_events_feed_waits_for_late_commits_behind_the_cursor(self):
+        self.client.force_authenticate(user=self.staff)
+        first = OrderEvent.objects.create(order=self.order, kind=OrderEvent.Kind.STATUS)
+        # The id in between belongs to a transaction that has not committed yet.
+        third = OrderEvent.objects.create(id=first.id + 2, order=self.order, kind=OrderEvent.Kind.PAYMENT)
+
+        feed = self.client.get("/api/cafe/staff/orders/events/", {"cursor": first.id - 1})
+        self.assertEqual([event["id"] for event in feed.data["events"]], [first.id])
+        self.assertEqual(feed.data["cursor"], first.id)
+
+        late = OrderEvent.objects.create(id=first.id + 1, order=self.order, kind=OrderEvent.Kind.STATUS)
+        feed = self.client.get("/api/cafe/staff/orders/events/", {"cursor": feed.data["cursor"]})
+        self.assertEqual([event["id"] for event in feed.data["events"]], [late.id, third.id])
+
+    def test_staff_order_events_feed_skips_gaps_once_they_are_old(self):
+        self.client.force_authenticate(user=self.staff)
+        first = OrderEvent.objects.create(order=self.order, kind=OrderEvent.Kind.STATUS)
+        rolled_back_past = OrderEvent.objects.create(id=first.id + 2, order=self.order, kind=OrderEvent.Kind.PAYMENT)
+        OrderEvent.objects.filter(id=rolled_back_past.id).update(created_at=timezone.now() - timedelta(minutes=1))
+
+        feed = self.client.get("/api/cafe/staff/orders/events/", {"cursor": first.id})
+        self.assertEqual([event["id"] for event in feed.data["events"]], [rolled_back_past.id])
+
+    def test_staff_order_events_feed_rejects_non_finite_wait(self):
+        self.client.force_authenticate(user=self.staff)
+        for wait in ("nan", "inf", "abc"):
+            response = self.client.get("/api/cafe/staff/orders/events/", {"cursor": 0, "wait": wait})
+            self.assertEqual(response.status_code, 400)
+
+    def test_staff_orders_incremental_sync_returns_changes_and_tombstones(self):
+        self.client.force_authenticate(user=self.staff)
+        untouched = CafeOrder.objects.create(user=self.customer, notes="desk 9")
+        CafeOrder.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        since = (timezone.now() - timedelta(minutes=10)).isoformat()
+
+        self.client.post(
+            f"/api/cafe/staff/orders/{self.order.id}/status/",
+            {"status": CafeOrder.Status.DELIVERED},
+            format="json",
+        )
+        response = self.client.get("/api/cafe/staff/orders/", {"since": since})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["orders"], [])
+        self.assertEqual(response.data["removed"], [self.order.id])
+        self.assertIn("since", response.data)
+
+        self.client.post(f"/api/cafe/staff/orders/{untouched.id}/toggle-payment/", {}, format="json")
+        response = self.client.get("/api/cafe/staff/orders/", {"since": since})
+        self.assertEqual([order["id"] for order in response.data["orders"]], [untouched.id])
+
+        invalid = self.client.get("/api/cafe/staff/orders/", {"since": "yesterday"})
+        self.assertEqual(invalid.status_code, 400)
+
     def test_staff_status_rejects_invalid_value(self):
         self.client.force_authenticate(user=self.staff)
         response = self.client.post(
@@ -188,6 +390,54 @@ class CafeStaffSPAApiTests(TestCase):
         )
         self.assertEqual(manual_response.status_code, 201)
 
+    def test_manual_order_rejects_unavailable_items(self):
+        self.client.force_authenticate(user=self.staff)
+        hidden = MenuItemFactory(category=self.category, is_available=False)
+
+        response = self.client.post(
+            "/api/cafe/staff/manual-orders/",
+            {"items": [{"menu_item_id": self.item.id}, {"menu_item_id": hidden.id}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(CafeOrder.objects.count(), 1)
+
+    def test_manual_order_query_count_does_not_grow_with_lines(self):
+        self.client.force_authenticate(user=self.staff)
+        extra_items = [MenuItemFactory(category=self.category) for _ in range(4)]
+
+        def post_lines(menu_items):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(
+                    "/api/cafe/staff/manual-orders/",
+                    {"items": [{"menu_item_id": item.id, "quantity": 1} for item in menu_items]},
+                    format="json",
+                )
+            self.assertEqual(response.status_code, 201)
+            return len(ctx.captured_queries)
+
+        post_lines([self.item])  # warms per-user role lookups
+        self.assertEqual(post_lines([self.item]), post_lines([self.item, *extra_items]))
+
+    def test_manual_orders_batch_is_created_in_one_request(self):
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.post(
+            "/api/cafe/staff/manual-orders/",
+            {
+                "orders": [
+                    {"phone_number": self.customer.phone_number, "items": [{"menu_item_id": self.item.id, "quantity": 2}]},
+                    {"notes": "table 4", "items": [{"menu_item_id": self.item.id, "quantity": 1}]},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([order["total_price"] for order in response.data["orders"]], [200000, 100000])
+        created = CafeOrder.objects.filter(id__in=[order["order_id"] for order in response.data["orders"]]).order_by("id")
+        self.assertEqual(created[0].user, self.customer)
+        self.assertTrue(all(order.is_paid for order in created))
+        self.assertEqual(created[1].items.get().quantity, 1)
+
     def test_staff_customer_lookup_by_name_and_empty_query(self):
         self.customer.full_name = "Customer SearchName"
         self.customer.save(update_fields=["full_name"])
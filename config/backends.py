@@ -0,0 +1,15 @@
+"""
+Settings-selected storage backends (cart store, rate-limit store).
+"""
+
+from django.conf import settings
+
+
+def build_backend(setting_name, default, factories):
+    """
+    Builds the backend named by ``settings.<setting_name>`` from ``{name: factory}``.
+    """
+    name = getattr(settings, setting_name, default)
+    if name not in factories:
+        raise ValueError(f"Unknown {setting_name} backend: {name!r}")
+    return factories[name]()
@@ -0,0 +1,49 @@
+"""
+Version counters for cached snapshots, stored in the database.
+
+Snapshots themselves may live in a per-process cache, but the version each one is keyed by is
+read from the database so a bump made by any worker (or a management command) reaches them all.
+"""
+
+from time import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def _initial_version() -> int:
+    # Millisecond seed so a recreated counter never reuses an old snapshot key.
+    return int(time() * 1000)
+
+
+def _counters():
+    from accounts.models import CacheVersion
+
+    return CacheVersion.objects
+
+
+def get_version(namespace: str) -> int:
+    """
+    Returns the current version for a namespace, creating it on first use.
+    """
+    version = _counters().filter(namespace=namespace).values_list("version", flat=True).first()
+    if version is None:
+        try:
+            with transaction.atomic():
+                version = _counters().create(namespace=namespace, version=_initial_version()).version
+        except IntegrityError:
+            version = _counters().get(namespace=namespace).version
+    return version
+
+
+def bump_version(namespace: str) -> int:
+    """
+    Invalidates every snapshot built for the namespace by moving its version forward.
+
+    The update is part of the surrounding transaction, so other workers only see the new version
+    once the change that caused it has been committed.
+    """
+    if not _counters().filter(namespace=namespace).update(version=F("version") + 1):
+        get_version(namespace)
+        _counters().filter(namespace=namespace).update(version=F("version") + 1)
+    return _counters().get(namespace=namespace).version
@@ -0,0 +1,17 @@
+"""
+ETag revalidation for the versioned snapshot endpoints (cafe menu, cowork floor plan).
+"""
+
+from django.utils.cache import get_conditional_response
+
+
+def revalidated_response(request, etag, build_response):
+    """
+    Answers 304 when the request's If-None-Match covers ``etag``, otherwise ``build_response()``.
+    Either way the response carries the ETag and ``Cache-Control: no-cache``, so clients always
+    revalidate instead of reusing a stale copy.
+    """
+    response = get_conditional_response(request, etag=etag) or build_response()
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
@@ -1,6 +1,13 @@
+import random
+import time
 import uuid
+from contextlib import ExitStack
+
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
+from django.db import connections
+
+from . import request_metrics
 
 
 class RequestIDMiddleware(MiddlewareMixin):
@@ -26,3 +33,56 @@ class ContentSecurityPolicyMiddleware(MiddlewareMixin):
         if csp:
             response["Content-Security-Policy"] = csp
         return response
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures wall time, DB queries/time, render time and response size of each request.
+    Adds a ``Server-Timing`` header when REQUEST_METRICS_SERVER_TIMING is on (by default only
+    with DEBUG) and feeds config.request_metrics (per-route aggregates and sampled log lines
+    keyed by X-Request-ID).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "REQUEST_METRICS_SAMPLE_RATE", 1.0)
+        self.slow_ms = getattr(settings, "REQUEST_METRICS_SLOW_MS", 500)
+        self.flush_seconds = getattr(settings, "REQUEST_METRICS_FLUSH_SECONDS", 60)
+        self.server_timing = getattr(settings, "REQUEST_METRICS_SERVER_TIMING", settings.DEBUG)
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        queries = request_metrics.QueryTimer()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(queries))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, "resolver_match", None)
+        metrics = request_metrics.RequestMetrics(
+            route=match.route if match and match.route else "<unresolved>",
+            method=request.method,
+            status=response.status_code,
+            total_ms=total_ms,
+            db_ms=queries.seconds * 1000,
+            queries=queries.count,
+            render_ms=getattr(request, "_metrics_render_ms", None),
+            response_bytes=None if response.streaming else len(response.content),
+        )
+        if self.server_timing:
+            response["Server-Timing"] = metrics.server_timing()
+        request_metrics.record(metrics, self.flush_seconds)
+        if total_ms >= self.slow_ms or random.random() < self.sample_rate:
+            request_metrics.log_request(getattr(request, "id", None), metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered (serialized to JSON) after the view returns.
+        render_start = time.perf_counter()
+
+        def finish(rendered):
+            request._metrics_render_ms = (time.perf_counter() - render_start) * 1000
+
+        response.add_post_render_callback(finish)
+        return response
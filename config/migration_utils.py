@@ -0,0 +1,35 @@
+"""
+Frozen helpers for data migrations.
+
+Migrations must keep producing what they produced when they first ran, so they import these
+copies instead of app code. Never change a function here; add a new one when the app's
+behaviour changes and point new migrations at it.
+"""
+
+import re
+
+# accounts.utils.normalize_search_text as of the search_document migrations.
+_FOLD = str.maketrans(
+    {
+        **{chr(0x06F0 + digit): str(digit) for digit in range(10)},  # Persian digits
+        **{chr(0x0660 + digit): str(digit) for digit in range(10)},  # Arabic-Indic digits
+        '\u064a': '\u06cc',  # Arabic yeh -> Persian yeh
+        '\u0649': '\u06cc',  # alef maksura -> Persian yeh
+        '\u0643': '\u06a9',  # Arabic kaf -> keheh
+        '\u0629': '\u0647',  # teh marbuta -> heh
+        '\u06c0': '\u0647',  # heh with yeh above -> heh
+        '\u0623': '\u0627',  # alef variants -> alef
+        '\u0625': '\u0627',
+        '\u0622': '\u0627',
+        '\u0671': '\u0627',
+        '\u0624': '\u0648',  # waw with hamza -> waw
+        '\u200c': ' ',  # zero-width non-joiner
+        '\u0640': '',  # tatweel
+    }
+)
+_DIACRITICS = re.compile('[\u064b-\u065f\u0670]')
+
+
+def normalize_search_text_v1(text):
+    text = _DIACRITICS.sub('', (text or '').translate(_FOLD)).lower()
+    return ' '.join(text.split())
@@ -0,0 +1,137 @@
+"""
+Shared list pagination for the API views.
+
+Two modes, chosen per request:
+
+* ``?cursor=`` (empty for the first page): keyset pagination over the view's ordering, e.g.
+  ``("-published_at", "-id")``. Each page is a bounded index range scan however deep it is;
+  the response carries an opaque ``next_cursor``.
+* ``?page=N``: numbered pages (OFFSET), kept for the numbered pagers in the SPA.
+
+``?count=exact|approx|none`` controls the total. Numbered pages default to ``exact``; cursor
+pages skip it unless asked. ``approx`` uses the planner's row estimate on PostgreSQL and falls
+back to an exact count elsewhere.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from django.db import connection
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+COUNT_MODES = {"exact", "approx", "none"}
+
+
+def _safe_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _fields(ordering):
+    return [(key.lstrip("-"), key.startswith("-")) for key in ordering]
+
+
+def _order_by(ordering):
+    return [F(name).desc(nulls_last=True) if desc else F(name).asc(nulls_last=True) for name, desc in _fields(ordering)]
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict):
+        parsed = parse_datetime(value.get("dt") or "")
+        if parsed is None:
+            raise ValueError("bad datetime")
+        return parsed
+    return value
+
+
+def encode_cursor(values):
+    raw = json.dumps([_dump(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("bad cursor")
+        return [_load(value) for value in values]
+    except (ValueError, TypeError, UnicodeError):
+        raise NotFound("Invalid cursor.") from None
+
+
+def _after(ordering, values):
+    """
+    Rows strictly after ``values`` in ``ordering`` (NULLs sort last in both directions).
+    """
+    condition = Q(pk__in=[])
+    prefix = Q()
+    for (name, desc), value in zip(_fields(ordering), values):
+        if value is not None:
+            beyond = Q(**{f"{name}__lt" if desc else f"{name}__gt": value}) | Q(**{f"{name}__isnull": True})
+            condition |= prefix & beyond
+            prefix &= Q(**{name: value})
+        else:
+            prefix &= Q(**{f"{name}__isnull": True})
+    return condition
+
+
+def approximate_count(queryset):
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate(request, queryset, ordering, default_page_size=20, max_page_size=100):
+    """
+    Returns ``(items, meta)``; ``meta`` holds the pagination keys for the response body.
+    """
+    params = request.query_params
+    page_size = min(max(_safe_int(params.get("page_size"), default_page_size), 1), max_page_size)
+    cursor_mode = "cursor" in params
+    count_mode = params.get("count")
+    if count_mode not in COUNT_MODES:
+        count_mode = "none" if cursor_mode else "exact"
+
+    meta = {"page_size": page_size}
+    if count_mode == "exact":
+        meta["count"] = queryset.count()
+    elif count_mode == "approx":
+        meta["count"] = approximate_count(queryset)
+        meta["count_is_approximate"] = connection.vendor == "postgresql"
+
+    queryset = queryset.order_by(*_order_by(ordering))
+    if not cursor_mode:
+        page = max(_safe_int(params.get("page"), 1), 1)
+        offset = (page - 1) * page_size
+        meta["page"] = page
+        return list(queryset[offset : offset + page_size]), meta
+
+    cursor = params.get("cursor") or ""
+    if cursor:
+        queryset = queryset.filter(_after(ordering, decode_cursor(cursor, len(ordering))))
+    items = list(queryset[: page_size + 1])
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    last = items[-1] if items else None
+    meta["next_cursor"] = (
+        encode_cursor([getattr(last, name) for name, _ in _fields(ordering)]) if has_more else None
+    )
+    return items, meta
@@ -0,0 +1,32 @@
+"""
+Per-thread sets of keys collected during a unit of work and processed together at its end.
+
+Callers decide when the batch is processed (at the end of an atomic block, or in an on_commit
+callback); this module only keeps the keys, separately for each thread and database alias.
+"""
+
+import threading
+
+
+class PendingKeys:
+    def __init__(self):
+        self._local = threading.local()
+
+    def _keys(self, using):
+        keys = getattr(self._local, using, None)
+        if keys is None:
+            keys = set()
+            setattr(self._local, using, keys)
+        return keys
+
+    def add(self, keys, using="default"):
+        self._keys(using).update(keys)
+
+    def drain(self, using="default"):
+        """
+        Returns the collected keys and starts a new, empty batch.
+        """
+        keys = self._keys(using)
+        batch = set(keys)
+        keys.clear()
+        return batch
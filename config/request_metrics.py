@@ -0,0 +1,127 @@
+"""
+Per-request cost measurements, used by config.middleware.RequestMetricsMiddleware.
+
+Every request is added to an in-process, per-route aggregate (count, total/max wall time, queries,
+response bytes). The aggregate is written to the ``config.request_metrics`` logger as one JSON
+line per route every ``REQUEST_METRICS_FLUSH_SECONDS``, so slow endpoints can be found from the
+logs of each worker. Individual requests are logged for a ``REQUEST_METRICS_SAMPLE_RATE`` sample,
+and always when slower than ``REQUEST_METRICS_SLOW_MS``.
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+logger = logging.getLogger("config.request_metrics")
+
+
+class QueryTimer:
+    """``connection.execute_wrapper`` callable counting queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+@dataclass
+class RequestMetrics:
+    route: str
+    method: str
+    status: int
+    total_ms: float
+    db_ms: float
+    queries: int
+    render_ms: float | None = None
+    response_bytes: int | None = None
+
+    def server_timing(self):
+        parts = [f"app;dur={self.total_ms:.1f}", f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"']
+        if self.render_ms is not None:
+            parts.append(f"render;dur={self.render_ms:.1f}")
+        return ", ".join(parts)
+
+
+@dataclass
+class RouteStats:
+    count: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    db_ms: float = 0.0
+    queries: int = 0
+    response_bytes: int = 0
+    statuses: dict = field(default_factory=dict)
+
+    def add(self, metrics):
+        self.count += 1
+        self.errors += metrics.status >= 500
+        self.total_ms += metrics.total_ms
+        self.max_ms = max(self.max_ms, metrics.total_ms)
+        self.db_ms += metrics.db_ms
+        self.queries += metrics.queries
+        self.response_bytes += metrics.response_bytes or 0
+        self.statuses[metrics.status] = self.statuses.get(metrics.status, 0) + 1
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 1),
+            "max_ms": round(self.max_ms, 1),
+            "avg_db_ms": round(self.db_ms / self.count, 1),
+            "avg_queries": round(self.queries / self.count, 1),
+            "avg_bytes": self.response_bytes // self.count,
+            "statuses": {str(code): count for code, count in sorted(self.statuses.items())},
+        }
+
+
+_lock = threading.Lock()
+_routes = {}
+_last_flush = time.monotonic()
+
+
+def record(metrics, flush_seconds):
+    """
+    Adds a request to its route's aggregate; logs and resets all aggregates when
+    ``flush_seconds`` have passed since the last flush.
+    """
+    global _routes, _last_flush
+    key = f"{metrics.method} {metrics.route}"
+    now = time.monotonic()
+    with _lock:
+        _routes.setdefault(key, RouteStats()).add(metrics)
+        if now - _last_flush < flush_seconds:
+            return
+        flushed, _routes, _last_flush = _routes, {}, now
+    for route, stats in sorted(flushed.items()):
+        logger.info(json.dumps({"event": "route_summary", "route": route, **stats.summary()}, sort_keys=True))
+
+
+def route_stats():
+    """Snapshot of this process's unflushed aggregates, ``{"METHOD route": summary}``."""
+    with _lock:
+        return {route: stats.summary() for route, stats in _routes.items()}
+
+
+def reset():
+    global _routes, _last_flush
+    with _lock:
+        _routes, _last_flush = {}, time.monotonic()
+
+
+def log_request(request_id, metrics):
+    payload = {"event": "request", "request_id": request_id, **vars(metrics)}
+    for key in ("total_ms", "db_ms", "render_ms"):
+        if payload[key] is not None:
+            payload[key] = round(payload[key], 1)
+    logger.info(json.dumps(payload, sort_keys=True))
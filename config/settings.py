@@ -60,10 +60,12 @@ INSTALLED_APPS = [
     # Local apps
     'cafe',
     'cowork',
+    'analytics',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'config.middleware.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -137,6 +139,25 @@ else:
     }
 
 
+# Cache
+# Holds rebuildable snapshots only. Their version counters live in the database
+# (config.cache_versions), so a per-process cache stays correct with several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', ''),
+    }
+}
+
+# Cafe cart storage: "database", "redis" (CAFE_CART_REDIS_URL) or "memory" (single process only).
+CAFE_CART_STORE = os.getenv('CAFE_CART_STORE', 'database')
+CAFE_CART_REDIS_URL = os.getenv('CAFE_CART_REDIS_URL', '')
+
+# Rate-limit state: "database" (shared by all workers) or "memory" (single process only).
+RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'database')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -188,6 +209,13 @@ if not DEBUG:
 
 # Logging
 LOG_LEVEL = os.getenv('DJANGO_LOG_LEVEL', 'INFO')
+# Request instrumentation (config.middleware.RequestMetricsMiddleware).
+REQUEST_METRICS_SAMPLE_RATE = float(os.getenv('REQUEST_METRICS_SAMPLE_RATE', '0.05'))
+REQUEST_METRICS_SLOW_MS = int(os.getenv('REQUEST_METRICS_SLOW_MS', '500'))
+REQUEST_METRICS_FLUSH_SECONDS = int(os.getenv('REQUEST_METRICS_FLUSH_SECONDS', '60'))
+# Server-Timing exposes query counts and timings to any client, so it is off unless debugging.
+REQUEST_METRICS_SERVER_TIMING = os.getenv('REQUEST_METRICS_SERVER_TIMING', str(DEBUG)).lower() == 'true'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -1,5 +1,8 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from analytics.rollups import booking_days, schedule_rollup_refresh
+from . import booking_batch
 from .models import PricingPlan, Space, Booking
+from .space_status import schedule_status_refresh
 
 @admin.register(PricingPlan)
 class PricingPlanAdmin(admin.ModelAdmin):
@@ -21,8 +24,19 @@ class BookingAdmin(admin.ModelAdmin):
 
     @admin.action(description="Approve selected bookings")
     def approve_bookings(self, request, queryset):
-        queryset.update(status=Booking.Status.CONFIRMED)
+        approved, conflicting = booking_batch.approve_bookings(queryset)
+        self.message_user(request, f"{approved} booking(s) approved.", messages.SUCCESS)
+        if conflicting:
+            self.message_user(
+                request,
+                "Skipped overlapping booking(s): " + ", ".join(str(booking.id) for booking in conflicting),
+                messages.WARNING,
+            )
 
     @admin.action(description="Mark selected bookings as cancelled")
     def mark_cancelled(self, request, queryset):
+        space_ids = set(queryset.values_list("space_id", flat=True))
+        days = booking_days(queryset.values_list("id", flat=True))
         queryset.update(status=Booking.Status.CANCELLED)
+        schedule_status_refresh(space_ids)
+        schedule_rollup_refresh(cowork_days=days)
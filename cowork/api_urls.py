@@ -1,17 +1,21 @@
 from django.urls import path
 
 from .api_views import (
+    CoworkAvailabilityAPIView,
     CoworkBookingPreviewAPIView,
     CoworkBookingsAPIView,
     CoworkMyBookingsAPIView,
     CoworkSpacesAPIView,
+    CoworkStaffBulkBookingsAPIView,
 )
 
 app_name = "cowork_api"
 
 urlpatterns = [
     path("spaces/", CoworkSpacesAPIView.as_view(), name="spaces"),
+    path("availability/", CoworkAvailabilityAPIView.as_view(), name="availability"),
     path("bookings/preview/", CoworkBookingPreviewAPIView.as_view(), name="booking_preview"),
     path("bookings/", CoworkBookingsAPIView.as_view(), name="bookings"),
+    path("staff/bookings/bulk/", CoworkStaffBulkBookingsAPIView.as_view(), name="staff_bulk_bookings"),
     path("my-bookings/", CoworkMyBookingsAPIView.as_view(), name="my_bookings"),
 ]
@@ -1,13 +1,23 @@
 ﻿import jdatetime
-from django.db.models import Exists, OuterRef
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from accounts.idempotency import idempotent
+from accounts.models import CustomUser
+from accounts.staff_api_views import AdminPermission
+from accounts.utils import normalize_digits, parse_jalali_date
+from config.conditional import revalidated_response
+
+from .availability import availability_calendar
+from .booking_batch import BookingBatchError, BookingDraft, create_bookings
+from .floor_plan import get_floor_plan
 from .forms import BookingForm
+from .pricing import get_pricing_matrix
 from .models import Booking, Space
 
 
@@ -40,6 +50,8 @@ def _serialize_space(space):
         "status": space.status,
         "capacity": space.capacity,
         "is_nested": space.is_nested,
+        "x_pos": space.x_pos,
+        "y_pos": space.y_pos,
         "plan": _serialize_plan(space.pricing_plan),
         "seats": [
             {
@@ -47,6 +59,8 @@ def _serialize_space(space):
                 "name": seat.name,
                 "status": seat.status,
                 "capacity": seat.capacity,
+                "x_pos": seat.x_pos,
+                "y_pos": seat.y_pos,
                 "plan": _serialize_plan(seat.pricing_plan),
             }
             for seat in space.seats.all()
@@ -75,51 +89,88 @@ def _to_jalali_string(value):
     return jdatetime.date.fromgregorian(date=value).strftime("%Y/%m/%d")
 
 
-def _refresh_space_statuses():
-    now = timezone.now().date()
-    active_booking_exists = Booking.objects.filter(
-        space=OuterRef("pk"),
-        status=Booking.Status.CONFIRMED,
-        start_time__lte=now,
-        end_time__gte=now,
+def _build_floor_plan_structure():
+    spaces = (
+        Space.objects.filter(is_active=True, parent_table__isnull=True)
+        .select_related("pricing_plan")
+        .prefetch_related("seats__pricing_plan")
     )
-    active_spaces = Space.objects.filter(is_active=True).annotate(has_active_booking=Exists(active_booking_exists))
-
-    spaces_to_update = []
-    for space in active_spaces:
-        if space.status == Space.Status.UNAVAILABLE:
-            continue
-        new_status = Space.Status.OCCUPIED if space.has_active_booking else Space.Status.AVAILABLE
-        if space.status != new_status:
-            space.status = new_status
-            spaces_to_update.append(space)
-
-    if spaces_to_update:
-        Space.objects.bulk_update(spaces_to_update, ["status"])
+    spaces_by_zone = {}
+    for space in spaces:
+        spaces_by_zone.setdefault(space.zone, []).append(_serialize_space(space))
+    return {
+        "zones": [
+            {"code": code, "label": str(label), "spaces": spaces_by_zone.get(code, [])}
+            for code, label in Space.ZoneType.choices
+        ]
+    }
 
 
 class CoworkSpacesAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        _refresh_space_statuses()
-        spaces = (
-            Space.objects.filter(is_active=True, parent_table__isnull=True)
-            .select_related("pricing_plan")
-            .prefetch_related("seats__pricing_plan")
-        )
+        payload, etag = get_floor_plan(_build_floor_plan_structure)
+        return revalidated_response(request, etag, lambda: Response(payload))
+
+
+MAX_AVAILABILITY_DAYS = 366
+
 
-        zones = []
-        for code, label in Space.ZoneType.choices:
-            zone_spaces = [space for space in spaces if space.zone == code]
-            zones.append(
-                {
-                    "code": code,
-                    "label": label,
-                    "spaces": [_serialize_space(space) for space in zone_spaces],
-                }
+class CoworkAvailabilityAPIView(APIView):
+    """
+    Occupancy calendar for a zone or a single space over an inclusive Jalali date range
+    (``?zone=DESK&from=1405-01-01&to=1405-01-31`` or ``?space_id=...``).
+    """
+
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        first_day = parse_jalali_date(request.query_params.get("from"))
+        last_day = parse_jalali_date(request.query_params.get("to"))
+        if not first_day or not last_day:
+            return Response({"detail": "from and to must be dates (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+        if last_day < first_day:
+            return Response({"detail": "to must not be before from."}, status=status.HTTP_400_BAD_REQUEST)
+        if (last_day - first_day).days >= MAX_AVAILABILITY_DAYS:
+            return Response(
+                {"detail": f"The range can cover at most {MAX_AVAILABILITY_DAYS} days."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        return Response({"zones": zones, "has_spaces": any(zone["spaces"] for zone in zones)})
+
+        zone = request.query_params.get("zone")
+        space_id = request.query_params.get("space_id")
+        spaces = Space.objects.filter(is_active=True)
+        if space_id:
+            spaces = spaces.filter(id=space_id) if str(space_id).isdigit() else spaces.none()
+        elif zone in Space.ZoneType.values:
+            spaces = spaces.filter(zone=zone)
+        else:
+            return Response({"detail": "A valid zone or space_id is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        spaces = list(spaces.only("id", "name", "zone", "status"))
+        calendar = availability_calendar(first_day, last_day, spaces)
+        return Response(
+            {
+                "from": first_day.strftime("%Y-%m-%d"),
+                "to": last_day.strftime("%Y-%m-%d"),
+                "days": (last_day - first_day).days + 1,
+                "spaces": [
+                    {
+                        "id": space.id,
+                        "name": space.name,
+                        "zone": space.zone,
+                        "status": space.status,
+                        "occupied": [
+                            [start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")]
+                            for start, end in calendar[space.id]["occupied"]
+                        ],
+                        "free": calendar[space.id]["free"],
+                    }
+                    for space in spaces
+                ],
+            }
+        )
 
 
 class CoworkBookingPreviewAPIView(APIView):
@@ -130,32 +181,43 @@ class CoworkBookingPreviewAPIView(APIView):
         if not space_id:
             return Response({"detail": "space_id is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        space = get_object_or_404(Space, id=space_id)
-        form_data = {
-            "booking_type": request.query_params.get("booking_type"),
-            "start_time": request.query_params.get("start_time"),
-        }
-        form = BookingForm(data=form_data, space=space)
-        if not form.is_valid():
+        pricing = get_pricing_matrix().get(int(space_id)) if str(space_id).isdigit() else None
+        if pricing is None:
+            return Response({"detail": "Space not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        errors = {}
+        booking_type = request.query_params.get("booking_type")
+        start_time = parse_jalali_date(request.query_params.get("start_time"))
+        if start_time is None:
+            errors["start_time"] = ["Enter a valid date."]
+        if booking_type not in pricing.prices:
+            errors["booking_type"] = ["Invalid booking type for selected space."]
+        if errors:
+            return Response({"valid": False, "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        price, end_time = pricing.quote(booking_type, start_time)
+        # Same model validation as a real booking, including the overlap check. Booking.clean only
+        # reads the space's zone and id, which the cached pricing entry already has.
+        preview_booking = Booking(
+            space=Space(id=pricing.space_id, zone=pricing.zone),
+            booking_type=booking_type,
+            start_time=start_time,
+            end_time=end_time,
+        )
+        try:
+            preview_booking.clean()
+        except ValidationError as exc:
             return Response(
-                {"valid": False, "errors": form.errors},
+                {"valid": False, "errors": {NON_FIELD_ERRORS: exc.messages}},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        preview_booking = Booking(
-            space=space,
-            booking_type=form.cleaned_data["booking_type"],
-            start_time=form.cleaned_data["start_time"],
-            end_time=form.cleaned_data["end_time"],
-        )
-        price = preview_booking.calculate_price()
         return Response(
             {
                 "valid": True,
                 "price": _as_price(price),
-                "start_time": preview_booking.start_time.strftime("%Y-%m-%d"),
-                "end_time": preview_booking.end_time.strftime("%Y-%m-%d"),
-                "end_time_jalali": _to_jalali_string(preview_booking.end_time),
+                "start_time": start_time.strftime("%Y-%m-%d"),
+                "end_time": end_time.strftime("%Y-%m-%d"),
+                "end_time_jalali": _to_jalali_string(end_time),
             }
         )
 
@@ -163,6 +225,7 @@ class CoworkBookingPreviewAPIView(APIView):
 class CoworkBookingsAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent("cowork_bookings")
     def post(self, request):
         space_id = request.data.get("space_id")
         if not space_id:
@@ -182,8 +245,12 @@ class CoworkBookingsAPIView(APIView):
         booking.space = space
         booking.status = Booking.Status.PENDING_PAYMENT
         booking.price_charged = booking.calculate_price()
-        booking.save()
-        space.refresh_status()
+        try:
+            with transaction.atomic():
+                booking.save()
+        except IntegrityError:
+            # A concurrent booking took the slot between validation and insert.
+            return Response({"detail": "This space is already booked for the selected time."}, status=status.HTTP_409_CONFLICT)
         return Response(
             {
                 "booking": _serialize_booking(booking),
@@ -200,3 +267,45 @@ class CoworkMyBookingsAPIView(APIView):
     def get(self, request):
         bookings = Booking.objects.filter(user=request.user).select_related("space").order_by("-start_time")
         return Response({"bookings": [_serialize_booking(booking) for booking in bookings]})
+
+
+class CoworkStaffBulkBookingsAPIView(APIView):
+    """
+    Creates many bookings at once, e.g. a company renting several desks. Body:
+    ``{"phone_number", "confirm", "bookings": [{space_id, booking_type, start_time, phone_number?}]}``.
+    All bookings are created or none are.
+    """
+
+    permission_classes = [AdminPermission]
+
+    @idempotent("cowork_staff_bulk_bookings")
+    def post(self, request):
+        entries = request.data.get("bookings")
+        if not isinstance(entries, list) or not entries or any(not isinstance(entry, dict) for entry in entries):
+            return Response({"detail": "bookings must be a non-empty list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+
+        default_phone = normalize_digits(request.data.get("phone_number") or "").strip()
+        phones = [normalize_digits(entry.get("phone_number") or "").strip() or default_phone for entry in entries]
+        users = {user.phone_number: user for user in CustomUser.objects.filter(phone_number__in=set(phones) - {""})}
+
+        errors = []
+        drafts = []
+        for index, (entry, phone) in enumerate(zip(entries, phones)):
+            start_time = parse_jalali_date(entry.get("start_time"))
+            space_id = entry.get("space_id")
+            if phone not in users:
+                errors.append({"index": index, "detail": "Customer not found."})
+            elif start_time is None:
+                errors.append({"index": index, "detail": "start_time must be a date (YYYY-MM-DD)."})
+            elif not str(space_id).isdigit():
+                errors.append({"index": index, "detail": "space_id is required."})
+            else:
+                drafts.append(BookingDraft(users[phone], int(space_id), entry.get("booking_type"), start_time))
+        if errors:
+            return Response({"detail": "Some bookings are invalid.", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            bookings = create_bookings(drafts, confirm=bool(request.data.get("confirm")))
+        except BookingBatchError as exc:
+            return Response({"detail": exc.detail, "errors": exc.errors}, status=exc.status_code)
+        return Response({"bookings": [_serialize_booking(booking) for booking in bookings]}, status=status.HTTP_201_CREATED)
@@ -0,0 +1,110 @@
+"""
+Booking availability queries.
+
+Date ranges are half-open, ``[start, end)``, matching Booking.clean and the PostgreSQL
+exclusion constraint: a booking ending on a day does not block another starting that day.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Exists, OuterRef
+
+from .models import Booking, Space
+
+
+def overlapping_bookings(start, end, space_ids=None):
+    bookings = Booking.objects.overlapping(start, end)
+    if space_ids is not None:
+        bookings = bookings.filter(space_id__in=space_ids)
+    return bookings
+
+
+def free_spaces(start, end, zone=None):
+    """
+    Active, bookable spaces with no blocking booking in ``[start, end)``, in one query.
+    """
+    spaces = Space.objects.filter(is_active=True).exclude(status=Space.Status.UNAVAILABLE)
+    if zone:
+        spaces = spaces.filter(zone=zone)
+    return spaces.filter(~Exists(Booking.objects.overlapping(start, end).filter(space=OuterRef("pk"))))
+
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def availability_calendar(first_day, last_day, spaces):
+    """
+    Per-space occupancy for the inclusive day range, from one scan of the overlapping bookings.
+
+    Returns ``{space_id: {"occupied": [[start, end), ...], "free": "1101..."}}`` where intervals
+    are clipped to the range and merged, and ``free`` has one character per day ("1" = free).
+    A same-day booking (start == end) still occupies its start day.
+    """
+    range_end = last_day + timedelta(days=1)
+    day_count = (range_end - first_day).days
+    space_ids = [space.id for space in spaces]
+    intervals = {space_id: [] for space_id in space_ids}
+
+    # Start a day early so same-day bookings on first_day are included; the loop clips them.
+    rows = overlapping_bookings(first_day - timedelta(days=1), range_end, space_ids=space_ids).values_list(
+        "space_id", "start_time", "end_time"
+    )
+    for space_id, start, end in rows:
+        end = max(end, start + timedelta(days=1))
+        if end <= first_day:
+            continue
+        intervals[space_id].append((max(start, first_day), min(end, range_end)))
+
+    calendar = {}
+    for space_id, space_intervals in intervals.items():
+        occupied = _merge_intervals(space_intervals)
+        free = ["1"] * day_count
+        for start, end in occupied:
+            for offset in range((start - first_day).days, (end - first_day).days):
+                free[offset] = "0"
+        calendar[space_id] = {"occupied": occupied, "free": "".join(free)}
+    return calendar
+
+
+def find_conflicts(intervals, exclude_booking_ids=()):
+    """
+    Checks candidate bookings against each other and against stored blocking bookings.
+
+    ``intervals`` is ``[(key, space_id, start, end), ...]``; returns the set of keys that overlap
+    anything. Stored bookings are read with a single range query.
+    """
+    if not intervals:
+        return set()
+    first_day = min(start for _, _, start, _ in intervals)
+    last_day = max(end for _, _, _, end in intervals)
+    space_ids = {space_id for _, space_id, _, _ in intervals}
+
+    by_space = defaultdict(list)
+    existing = overlapping_bookings(first_day, last_day, space_ids=space_ids).exclude(pk__in=exclude_booking_ids)
+    for space_id, start, end in existing.values_list("space_id", "start_time", "end_time"):
+        by_space[space_id].append((start, end, None))
+    for key, space_id, start, end in intervals:
+        by_space[space_id].append((start, end, key))
+
+    conflicts = set()
+    for entries in by_space.values():
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+        active = []
+        for start, end, key in entries:
+            active = [entry for entry in active if entry[1] > start]
+            if start >= end:
+                continue
+            if active:
+                conflicts.update(entry[2] for entry in active if entry[2] is not None)
+                if key is not None:
+                    conflicts.add(key)
+            active.append((start, end, key))
+    return conflicts
@@ -0,0 +1,137 @@
+"""Bulk booking creation and approval for staff."""
+
+from dataclasses import dataclass
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from rest_framework import status
+
+from analytics.rollups import booking_days, local_day, schedule_rollup_refresh
+
+from .availability import find_conflicts
+from .models import Booking, Space
+from .pricing import END_DATE_OFFSETS, ZONE_BOOKING_TYPES, plan_price
+from .space_status import schedule_status_refresh
+
+MAX_BATCH_BOOKINGS = 100
+
+
+class BookingBatchError(Exception):
+    def __init__(self, detail, status_code=status.HTTP_400_BAD_REQUEST, errors=None):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+        self.errors = errors or []
+
+
+@dataclass
+class BookingDraft:
+    user: object
+    space_id: int
+    booking_type: str
+    start_time: object  # jdatetime.date
+
+
+def _lock_spaces(space_ids):
+    """
+    Serialises booking writes for these spaces until the surrounding transaction ends, so a
+    conflict check and the insert that follows it cannot interleave with another batch.
+
+    SQLite has no SELECT ... FOR UPDATE; there a no-op UPDATE takes the database write lock
+    before the conflict check reads anything.
+    """
+    spaces = Space.objects.filter(id__in=space_ids)
+    if connection.features.has_select_for_update:
+        list(spaces.order_by("id").select_for_update().values_list("id", flat=True))
+    else:
+        spaces.update(status=F("status"))
+
+
+def create_bookings(drafts, confirm=False):
+    """
+    Validates every draft against the zone rules, each other and stored bookings, then
+    inserts them in one statement. Nothing is written if any draft is invalid.
+
+    Prices come from the spaces' current pricing plans, read inside the transaction that
+    holds the space locks.
+    """
+    if not drafts:
+        raise BookingBatchError("No bookings given.")
+    if len(drafts) > MAX_BATCH_BOOKINGS:
+        raise BookingBatchError(f"At most {MAX_BATCH_BOOKINGS} bookings per request.")
+
+    space_ids = {draft.space_id for draft in drafts}
+    try:
+        with transaction.atomic():
+            _lock_spaces(space_ids)
+            spaces = Space.objects.select_related("pricing_plan").in_bulk(space_ids)
+            bookings = _build_bookings(drafts, spaces, confirm)
+
+            conflicts = find_conflicts(
+                [(index, booking.space_id, booking.start_time, booking.end_time) for index, booking in enumerate(bookings)]
+            )
+            if conflicts:
+                raise BookingBatchError(
+                    "Some bookings overlap existing bookings or each other.",
+                    status.HTTP_409_CONFLICT,
+                    [
+                        {"index": index, "detail": "This space is already booked for the selected time."}
+                        for index in sorted(conflicts)
+                    ],
+                )
+
+            Booking.objects.bulk_create(bookings)
+            schedule_status_refresh(booking.space_id for booking in bookings)
+            schedule_rollup_refresh(cowork_days=[local_day(booking.created_at) for booking in bookings])
+    except IntegrityError:
+        raise BookingBatchError(
+            "Some bookings overlap existing bookings or each other.", status.HTTP_409_CONFLICT
+        ) from None
+    return bookings
+
+
+def _build_bookings(drafts, spaces, confirm):
+    errors = []
+    bookings = []
+    for index, draft in enumerate(drafts):
+        space = spaces.get(draft.space_id)
+        if space is None:
+            errors.append({"index": index, "detail": f"Space {draft.space_id} not found."})
+            continue
+        if draft.booking_type not in ZONE_BOOKING_TYPES.get(space.zone, ()):
+            errors.append({"index": index, "detail": "Invalid booking type for selected space."})
+            continue
+        bookings.append(
+            Booking(
+                user=draft.user,
+                space=space,
+                booking_type=draft.booking_type,
+                start_time=draft.start_time,
+                end_time=draft.start_time + END_DATE_OFFSETS[draft.booking_type],
+                status=Booking.Status.CONFIRMED if confirm else Booking.Status.PENDING_PAYMENT,
+                price_charged=plan_price(space.pricing_plan, draft.booking_type),
+            )
+        )
+    if errors:
+        raise BookingBatchError("Some bookings are invalid.", errors=errors)
+    return bookings
+
+
+def approve_bookings(queryset):
+    """
+    Confirms the selected bookings that do not overlap other blocking bookings (or each other),
+    with one range query and one UPDATE. Returns ``(approved_count, conflicting_bookings)``.
+    """
+    with transaction.atomic():
+        pending = queryset.exclude(status=Booking.Status.CONFIRMED)
+        _lock_spaces(pending.values("space_id"))
+        candidates = list(pending.only("id", "space_id", "start_time", "end_time"))
+        conflicts = find_conflicts(
+            [(booking.id, booking.space_id, booking.start_time, booking.end_time) for booking in candidates],
+            exclude_booking_ids=[booking.id for booking in candidates],
+        )
+        approved = [booking for booking in candidates if booking.id not in conflicts]
+        Booking.objects.filter(id__in=[booking.id for booking in approved]).update(status=Booking.Status.CONFIRMED)
+        schedule_status_refresh(booking.space_id for booking in approved)
+        schedule_rollup_refresh(cowork_days=booking_days(booking.id for booking in approved))
+    return len(approved), [booking for booking in candidates if booking.id in conflicts]
@@ -0,0 +1,56 @@
+"""
+Versioned floor-plan document for the public spaces endpoint.
+
+The structure (zones, spaces, seats, plans, positions) is cached per version and rebuilt only
+after space or plan edits (see cowork.signals). Statuses change with bookings, so they are read
+fresh on every request and overlaid on the cached structure.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+
+from config.cache_versions import bump_version, get_version
+
+from .models import Space
+
+FLOOR_PLAN_VERSION_NAMESPACE = "cowork_floor_plan"
+# Spaces or plans edited without their post_save signal (queryset.update(), raw SQL) keep the old
+# version, so the cached structure is also dropped after ten minutes. Statuses are never cached.
+FLOOR_PLAN_TIMEOUT = 60 * 10
+
+
+def invalidate_floor_plan():
+    bump_version(FLOOR_PLAN_VERSION_NAMESPACE)
+
+
+def _overlay(space, statuses):
+    overlaid = {**space, "status": statuses.get(space["id"], space["status"])}
+    if "seats" in space:
+        overlaid["seats"] = [_overlay(seat, statuses) for seat in space["seats"]]
+    return overlaid
+
+
+def get_floor_plan(build_structure):
+    """
+    Returns ``(payload, etag)``: the cached structure with current statuses applied.
+
+    ``build_structure`` is called only when no document exists for the current version; it must
+    return ``{"zones": [{..., "spaces": [{"id", "status", "seats": [...]}]}]}``.
+    """
+    version = get_version(FLOOR_PLAN_VERSION_NAMESPACE)
+    key = f"cowork_floor_plan:{version}"
+    structure = cache.get(key)
+    if structure is None:
+        structure = build_structure()
+        cache.set(key, structure, timeout=FLOOR_PLAN_TIMEOUT)
+
+    statuses = dict(Space.objects.values_list("id", "status"))
+    status_digest = ",".join(f"{space_id}:{statuses[space_id]}" for space_id in sorted(statuses))
+    etag = hashlib.sha256(f"{version}|{status_digest}".encode("utf-8")).hexdigest()[:32]
+
+    zones = [
+        {**zone, "spaces": [_overlay(space, statuses) for space in zone["spaces"]]}
+        for zone in structure["zones"]
+    ]
+    return {"zones": zones, "has_spaces": any(zone["spaces"] for zone in zones)}, f'"{etag}"'
@@ -1,7 +1,7 @@
 from django import forms
 from django.utils.translation import gettext_lazy as _
 from .models import Booking, Space
-from datetime import timedelta
+from .pricing import END_DATE_OFFSETS
 from django.utils import timezone
 import jdatetime
 from django_jalali import forms as jforms
@@ -73,19 +73,10 @@ class BookingForm(DigitNormalizationMixin, forms.ModelForm):
         
         # Auto-calculate end date if needed
         if start_date:
-            if booking_type == Booking.BookingType.HOURLY:
-                # Date-only booking model: treat hourly as same-day slot boundary.
-                cleaned_data['end_time'] = start_date + timedelta(days=1)
-            elif booking_type == Booking.BookingType.DAILY:
-                cleaned_data['end_time'] = start_date + timedelta(days=1)
-            elif booking_type == Booking.BookingType.MONTHLY:
-                cleaned_data['end_time'] = start_date + timedelta(days=30)
-            elif booking_type == Booking.BookingType.SIX_MONTH:
-                cleaned_data['end_time'] = start_date + timedelta(days=180)
-            elif booking_type == Booking.BookingType.YEARLY:
-                cleaned_data['end_time'] = start_date + timedelta(days=365)
-            else:
+            offset = END_DATE_OFFSETS.get(booking_type)
+            if offset is None:
                 raise forms.ValidationError(_("Invalid booking type for selected space."))
+            cleaned_data['end_time'] = start_date + offset
             
             end_date = cleaned_data['end_time']
             if not end_date:
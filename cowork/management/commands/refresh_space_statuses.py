@@ -0,0 +1,68 @@
+import time
+from datetime import datetime, timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+from cowork.space_status import refresh_space_statuses
+
+# This loop is the deployment's only long-running worker, so periodic housekeeping from the
+# other apps runs on each of its wake-ups as well.
+MAINTENANCE_COMMANDS = (
+    ("refresh_related_posts", {"due": True}),
+    ("prune_order_events", {}),
+    ("purge_idempotency_keys", {}),
+    ("purge_stale_carts", {}),
+    ("purge_rate_limit_buckets", {}),
+)
+
+
+def _seconds_until_next_day():
+    now = timezone.localtime()
+    midnight = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+    return max((midnight - now).total_seconds(), 0)
+
+
+class Command(BaseCommand):
+    help = "Recomputes space statuses from today's confirmed bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, refresh again at every local day boundary and run MAINTENANCE_COMMANDS.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=900,
+            help="With --loop, also refresh at least this often in seconds (default: 900).",
+        )
+
+    def handle(self, *args, **options):
+        if not options["loop"]:
+            self._refresh()
+            return
+        while True:
+            # A long-running loop must outlive database restarts; retry on the next wake-up.
+            close_old_connections()
+            try:
+                self._refresh()
+            except DatabaseError as exc:
+                self.stderr.write(f"Space status refresh failed: {exc}")
+            self._run_maintenance()
+            # Wake just after midnight so day-boundary transitions are applied promptly.
+            time.sleep(min(_seconds_until_next_day() + 1, options["interval"]))
+
+    def _run_maintenance(self):
+        for name, options in MAINTENANCE_COMMANDS:
+            try:
+                call_command(name, stdout=self.stdout, stderr=self.stderr, **options)
+            except DatabaseError as exc:
+                self.stderr.write(f"{name} failed: {exc}")
+
+    def _refresh(self):
+        updated = refresh_space_statuses()
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} space status(es)."))
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.9 on 2026-10-18 00:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+# PostgreSQL only: reject overlapping blocking bookings at the database level. Other backends
+# rely on Booking.clean plus the partial index below.
+EXCLUSION_CONSTRAINT = 'cowork_booking_no_overlap'
+BLOCKING_STATUSES = "('PENDING', 'CONFIRMED', 'COMPLETED')"
+MAX_REPORTED_CONFLICTS = 20
+
+
+def _overlapping_pairs(connection):
+    # Same overlap test as the constraint, so an empty result means ADD CONSTRAINT succeeds.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT a.id, b.id, a.space_id FROM cowork_booking a "
+            "JOIN cowork_booking b ON b.space_id = a.space_id AND b.id > a.id "
+            "AND daterange(a.start_time, a.end_time, '[)') && daterange(b.start_time, b.end_time, '[)') "
+            f"WHERE a.status IN {BLOCKING_STATUSES} AND b.status IN {BLOCKING_STATUSES} "
+            f"ORDER BY a.id, b.id LIMIT {MAX_REPORTED_CONFLICTS}"
+        )
+        return cursor.fetchall()
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    conflicts = _overlapping_pairs(schema_editor.connection)
+    if conflicts:
+        pairs = ', '.join(f'#{first} and #{second} (space {space_id})' for first, second, space_id in conflicts)
+        raise RuntimeError(
+            f'Cannot add {EXCLUSION_CONSTRAINT}: blocking bookings overlap '
+            f'(at most {MAX_REPORTED_CONFLICTS} pairs listed): {pairs}. '
+            'Cancel or move one booking of each pair, then run migrate again.'
+        )
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        f"ALTER TABLE cowork_booking ADD CONSTRAINT {EXCLUSION_CONSTRAINT} "
+        "EXCLUDE USING gist (space_id WITH =, daterange(start_time, end_time, '[)') WITH &&) "
+        f"WHERE (status IN {BLOCKING_STATUSES})"
+    )
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'ALTER TABLE cowork_booking DROP CONSTRAINT IF EXISTS {EXCLUSION_CONSTRAINT}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cowork', '0015_alter_booking_status_alter_space_zone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ('PENDING', 'CONFIRMED', 'COMPLETED'))), fields=['space', 'end_time', 'start_time'], name='cowork_booking_overlap_idx'),
+        ),
+        migrations.RunPython(add_exclusion_constraint, drop_exclusion_constraint),
+    ]
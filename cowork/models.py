@@ -75,7 +75,7 @@ class Space(models.Model):
         if self.status == self.Status.UNAVAILABLE:
             return
 
-        now = timezone.now().date()
+        now = timezone.localdate()
         active_booking = self.bookings.filter(
             status=Booking.Status.CONFIRMED,
             start_time__lte=now,
@@ -94,6 +94,19 @@ class Space(models.Model):
         return self.zone in self._NESTED_ZONES
 
 
+# Bookings in these states hold their space; cancelled and refunded ones do not.
+BLOCKING_BOOKING_STATUSES = ('PENDING', 'CONFIRMED', 'COMPLETED')
+
+
+class BookingQuerySet(models.QuerySet):
+    def blocking(self):
+        return self.filter(status__in=BLOCKING_BOOKING_STATUSES)
+
+    def overlapping(self, start, end):
+        """Blocking bookings intersecting the half-open date range ``[start, end)``."""
+        return self.blocking().filter(start_time__lt=end, end_time__gt=start)
+
+
 class Booking(models.Model):
     class BookingType(models.TextChoices):
         HOURLY = 'HOURLY', _('Hourly')
@@ -126,10 +139,20 @@ class Booking(models.Model):
     created_at = jmodels.jDateTimeField(auto_now_add=True)
     updated_at = jmodels.jDateTimeField(auto_now=True)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Booking")
         verbose_name_plural = _("Bookings")
         ordering = ['-start_time']
+        indexes = [
+            # Overlap checks seek on (space, end_time > start) and filter start_time from the index.
+            models.Index(
+                fields=['space', 'end_time', 'start_time'],
+                condition=Q(status__in=BLOCKING_BOOKING_STATUSES),
+                name='cowork_booking_overlap_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['space', 'start_time', 'end_time'],
@@ -155,25 +178,11 @@ class Booking(models.Model):
 
     def calculate_price(self):
         """Calculates the price based on booking type and pricing plan."""
-        if not self.space or not self.space.pricing_plan:
-            return Decimal('0')
+        from .pricing import plan_price
 
-        plan = self.space.pricing_plan
-        if plan.is_contact_for_price:
+        if not self.space:
             return Decimal('0')
-
-        if self.booking_type == self.BookingType.HOURLY:
-            return plan.hourly_rate or Decimal('0')
-        if self.booking_type == self.BookingType.DAILY:
-            return plan.daily_rate or Decimal('0')
-        if self.booking_type == self.BookingType.MONTHLY:
-            return plan.monthly_rate or Decimal('0')
-        if self.booking_type == self.BookingType.SIX_MONTH:
-            return plan.six_month_rate or Decimal('0')
-        if self.booking_type == self.BookingType.YEARLY:
-            return plan.yearly_rate or Decimal('0')
-
-        return Decimal('0')
+        return plan_price(self.space.pricing_plan, self.booking_type)
 
     def clean(self):
         if self.space and self.space.zone == Space.ZoneType.LONG_TABLE:
@@ -198,11 +207,8 @@ class Booking(models.Model):
             if self.start_time > self.end_time:
                 raise ValidationError(_('End time must be after start time.'))
 
-            overlapping = Booking.objects.filter(
+            overlapping = Booking.objects.overlapping(self.start_time, self.end_time).filter(
                 space=self.space,
-                status__in=[self.Status.PENDING_PAYMENT, self.Status.CONFIRMED, self.Status.COMPLETED],
-                start_time__lt=self.end_time,
-                end_time__gt=self.start_time,
             ).exclude(pk=self.pk)
 
             if overlapping.exists():
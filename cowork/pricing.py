@@ -0,0 +1,112 @@
+"""
+In-memory pricing matrix for booking previews and price calculation.
+
+Each process keeps ``{space_id: SpacePricing}`` and rebuilds it only when the pricing version
+moves; plan and space edits bump that database counter through cowork.signals, so every
+worker picks up the change once it commits.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from config.cache_versions import bump_version, get_version
+
+from .models import Booking, Space
+
+PRICING_VERSION_NAMESPACE = "cowork_pricing"
+
+# Date-only booking model: hourly bookings take a same-day slot that ends the next day.
+END_DATE_OFFSETS = {
+    Booking.BookingType.HOURLY: timedelta(days=1),
+    Booking.BookingType.DAILY: timedelta(days=1),
+    Booking.BookingType.MONTHLY: timedelta(days=30),
+    Booking.BookingType.SIX_MONTH: timedelta(days=180),
+    Booking.BookingType.YEARLY: timedelta(days=365),
+}
+
+RATE_FIELDS = {
+    Booking.BookingType.HOURLY: "hourly_rate",
+    Booking.BookingType.DAILY: "daily_rate",
+    Booking.BookingType.MONTHLY: "monthly_rate",
+    Booking.BookingType.SIX_MONTH: "six_month_rate",
+    Booking.BookingType.YEARLY: "yearly_rate",
+}
+
+# Booking types offered per zone (BookingForm choices combined with Booking.clean).
+ZONE_BOOKING_TYPES = {
+    Space.ZoneType.LONG_TABLE: (Booking.BookingType.DAILY,),
+    Space.ZoneType.DESK: (Booking.BookingType.DAILY, Booking.BookingType.MONTHLY),
+    Space.ZoneType.SHARED_DESK: (Booking.BookingType.MONTHLY,),
+    Space.ZoneType.PRIVATE_ROOM_2: (
+        Booking.BookingType.DAILY,
+        Booking.BookingType.MONTHLY,
+        Booking.BookingType.SIX_MONTH,
+        Booking.BookingType.YEARLY,
+    ),
+    Space.ZoneType.PRIVATE_ROOM_3: (
+        Booking.BookingType.DAILY,
+        Booking.BookingType.MONTHLY,
+        Booking.BookingType.SIX_MONTH,
+        Booking.BookingType.YEARLY,
+    ),
+    Space.ZoneType.MEETING_ROOM: (
+        Booking.BookingType.HOURLY,
+        Booking.BookingType.DAILY,
+        Booking.BookingType.MONTHLY,
+    ),
+}
+
+
+def plan_price(plan, booking_type):
+    if not plan or plan.is_contact_for_price or booking_type not in RATE_FIELDS:
+        return Decimal("0")
+    return getattr(plan, RATE_FIELDS[booking_type]) or Decimal("0")
+
+
+@dataclass(frozen=True)
+class SpacePricing:
+    space_id: int
+    zone: str
+    prices: dict  # {booking_type: Decimal} for the types the zone offers
+
+    def quote(self, booking_type, start_date):
+        """Returns ``(price, end_date)``, or None if the zone does not offer ``booking_type``."""
+        if booking_type not in self.prices:
+            return None
+        return self.prices[booking_type], start_date + END_DATE_OFFSETS[booking_type]
+
+
+_lock = threading.Lock()
+_loaded_version = None
+_matrix = {}
+
+
+def invalidate_pricing():
+    bump_version(PRICING_VERSION_NAMESPACE)
+
+
+def _load():
+    return {
+        space.id: SpacePricing(
+            space_id=space.id,
+            zone=space.zone,
+            prices={
+                booking_type: plan_price(space.pricing_plan, booking_type)
+                for booking_type in ZONE_BOOKING_TYPES.get(space.zone, ())
+            },
+        )
+        for space in Space.objects.select_related("pricing_plan")
+    }
+
+
+def get_pricing_matrix():
+    global _loaded_version, _matrix
+    version = get_version(PRICING_VERSION_NAMESPACE)
+    if version != _loaded_version:
+        with _lock:
+            if version != _loaded_version:
+                _matrix = _load()
+                _loaded_version = version
+    return _matrix
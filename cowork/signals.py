@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .floor_plan import invalidate_floor_plan
+from .models import Booking, PricingPlan, Space
+from .pricing import invalidate_pricing
+from .space_status import schedule_status_refresh
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def refresh_space_on_booking_change(sender, instance, **kwargs):
+    schedule_status_refresh([instance.space_id])
+
+
+@receiver([post_save, post_delete], sender=PricingPlan)
+@receiver([post_save, post_delete], sender=Space)
+def invalidate_space_caches_on_change(sender, **kwargs):
+    invalidate_pricing()
+    invalidate_floor_plan()
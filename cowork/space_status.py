@@ -0,0 +1,51 @@
+"""
+Space status maintenance.
+
+``Space.status`` is derived from confirmed bookings covering today. It is recomputed when a
+booking changes (see cowork.signals) and at day boundaries by the ``refresh_space_statuses``
+management command, so read endpoints can serve the stored value as-is.
+"""
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Booking, Space
+
+
+def refresh_space_statuses(space_ids=None, today=None):
+    """
+    Recomputes AVAILABLE/OCCUPIED for active spaces (optionally only ``space_ids``) and writes
+    only the rows that changed. UNAVAILABLE spaces are left alone. Returns the number updated.
+    """
+    today = today or timezone.localdate()
+    active_booking_exists = Booking.objects.filter(
+        space=OuterRef("pk"),
+        status=Booking.Status.CONFIRMED,
+        start_time__lte=today,
+        end_time__gte=today,
+    )
+    spaces = Space.objects.filter(is_active=True).exclude(status=Space.Status.UNAVAILABLE)
+    if space_ids is not None:
+        spaces = spaces.filter(id__in=space_ids)
+    spaces = spaces.annotate(has_active_booking=Exists(active_booking_exists)).only("id", "status")
+
+    spaces_to_update = []
+    for space in spaces:
+        new_status = Space.Status.OCCUPIED if space.has_active_booking else Space.Status.AVAILABLE
+        if space.status != new_status:
+            space.status = new_status
+            spaces_to_update.append(space)
+
+    if spaces_to_update:
+        Space.objects.bulk_update(spaces_to_update, ["status"])
+    return len(spaces_to_update)
+
+
+def schedule_status_refresh(space_ids):
+    """
+    Refreshes the given spaces once the current transaction commits.
+    """
+    space_ids = set(space_ids)
+    if space_ids:
+        transaction.on_commit(lambda: refresh_space_statuses(space_ids))
@@ -4,6 +4,7 @@ import jdatetime
 from datetime import timedelta
 from decimal import Decimal
 from .factories import SpaceFactory, BookingFactory, PricingPlanFactory
+from .availability import free_spaces
 from .models import Booking, Space
 from accounts.factories import UserFactory
 
@@ -76,3 +77,17 @@ class CoworkLogicTests(TestCase):
         for zone in [Space.ZoneType.DESK, Space.ZoneType.LONG_TABLE, Space.ZoneType.MEETING_ROOM]:
             space = SpaceFactory(zone=zone)
             self.assertFalse(space.is_nested, f"Zone {zone} should not be nested")
+
+    def test_free_spaces_excludes_overlapping_blocking_bookings(self):
+        start = jdatetime.date.today() + timedelta(days=10)
+        busy = SpaceFactory(zone=Space.ZoneType.DESK)
+        cancelled = SpaceFactory(zone=Space.ZoneType.DESK)
+        back_to_back = SpaceFactory(zone=Space.ZoneType.DESK)
+        BookingFactory(space=busy, start_time=start - timedelta(days=30), end_time=start + timedelta(days=5))
+        BookingFactory(space=cancelled, start_time=start, end_time=start + timedelta(days=1), status=Booking.Status.CANCELLED)
+        BookingFactory(space=back_to_back, start_time=start - timedelta(days=1), end_time=start)
+
+        with self.assertNumQueries(1):
+            free = set(free_spaces(start, start + timedelta(days=2), zone=Space.ZoneType.DESK).values_list("id", flat=True))
+
+        self.assertEqual(free, {self.space.id, cancelled.id, back_to_back.id})
@@ -1,10 +1,22 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
 import jdatetime
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 
 from accounts.factories import UserFactory
-from cowork.factories import SpaceFactory
-from cowork.models import Booking
+from accounts.models import CacheVersion
+from cowork.booking_batch import approve_bookings
+from cowork.factories import BookingFactory, SpaceFactory
+from cowork.floor_plan import FLOOR_PLAN_VERSION_NAMESPACE
+from cowork.models import Booking, PricingPlan, Space
 
 
 class CoworkSPAApiTests(TestCase):
@@ -19,6 +31,113 @@ class CoworkSPAApiTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("zones", response.data)
 
+    def test_spaces_endpoint_is_read_only(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/api/cowork/spaces/")
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn("UPDATE", sql)
+        self.assertNotIn("cowork_booking", sql)
+
+    def test_spaces_endpoint_serves_cached_floor_plan_with_live_status(self):
+        first = self.client.get("/api/cowork/spaces/")
+        etag = first["ETag"]
+
+        with self.assertNumQueries(2):  # floor-plan version and live statuses
+            cached = self.client.get("/api/cowork/spaces/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        Space.objects.filter(id=self.space.id).update(status=Space.Status.OCCUPIED)
+        changed = self.client.get("/api/cowork/spaces/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+        zone = next(zone for zone in changed.data["zones"] if zone["code"] == self.space.zone)
+        self.assertEqual(zone["spaces"][0]["status"], Space.Status.OCCUPIED)
+
+        self.space.name = "Renamed desk"
+        self.space.save()
+        renamed = self.client.get("/api/cowork/spaces/")
+        zone = next(zone for zone in renamed.data["zones"] if zone["code"] == self.space.zone)
+        self.assertEqual(zone["spaces"][0]["name"], "Renamed desk")
+
+    def test_floor_plan_follows_version_bumped_by_another_process(self):
+        first = self.client.get("/api/cowork/spaces/")
+
+        # Simulates an edit handled by another worker: no signal or cache write reaches this one.
+        Space.objects.filter(id=self.space.id).update(name="Window desk")
+        CacheVersion.objects.filter(namespace=FLOOR_PLAN_VERSION_NAMESPACE).update(version=F("version") + 1)
+
+        second = self.client.get("/api/cowork/spaces/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        zone = next(zone for zone in second.data["zones"] if zone["code"] == self.space.zone)
+        self.assertEqual(zone["spaces"][0]["name"], "Window desk")
+
+    def test_booking_changes_refresh_space_status(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = BookingFactory(space=self.space, status=Booking.Status.CONFIRMED)
+        self.space.refresh_from_db()
+        self.assertEqual(self.space.status, Space.Status.OCCUPIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.status = Booking.Status.CANCELLED
+            booking.save()
+        self.space.refresh_from_db()
+        self.assertEqual(self.space.status, Space.Status.AVAILABLE)
+
+    def test_refresh_command_applies_day_boundary_transitions(self):
+        # bulk_create skips signals, like a booking that simply starts today.
+        today = jdatetime.date.today()
+        Booking.objects.bulk_create(
+            [
+                Booking(
+                    user=self.user,
+                    space=self.space,
+                    booking_type=Booking.BookingType.DAILY,
+                    start_time=today,
+                    end_time=today,
+                    status=Booking.Status.CONFIRMED,
+                )
+            ]
+        )
+        call_command("refresh_space_statuses", stdout=StringIO())
+        self.space.refresh_from_db()
+        self.assertEqual(self.space.status, Space.Status.OCCUPIED)
+
+    def test_refresh_loop_runs_the_housekeeping_commands(self):
+        output = StringIO()
+        # Stop the loop at its first sleep.
+        with mock.patch("cowork.management.commands.refresh_space_statuses.time.sleep", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command("refresh_space_statuses", "--loop", stdout=output)
+
+        self.assertIn("related-post list(s)", output.getvalue())
+        self.assertIn("order event(s)", output.getvalue())
+        self.assertIn("idempotency record(s)", output.getvalue())
+        self.assertIn("stale cart line(s)", output.getvalue())
+        self.assertIn("rate-limit bucket(s)", output.getvalue())
+
+    def test_availability_returns_intervals_and_free_days(self):
+        first_day = jdatetime.date(1405, 1, 1)
+        other = SpaceFactory()
+        BookingFactory(space=self.space, start_time=jdatetime.date(1404, 12, 25), end_time=jdatetime.date(1405, 1, 3))
+        BookingFactory(space=self.space, start_time=jdatetime.date(1405, 1, 6), end_time=jdatetime.date(1405, 1, 6))
+        BookingFactory(space=other, start_time=first_day, end_time=jdatetime.date(1405, 1, 2), status=Booking.Status.CANCELLED)
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/cowork/availability/", {"zone": self.space.zone, "from": "۱۴۰۵-۰۱-۰۱", "to": "1405-01-07"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["days"], 7)
+        by_id = {space["id"]: space for space in response.data["spaces"]}
+        self.assertEqual(by_id[self.space.id]["occupied"], [["1405-01-01", "1405-01-03"], ["1405-01-06", "1405-01-07"]])
+        self.assertEqual(by_id[self.space.id]["free"], "0011101")
+        self.assertEqual(by_id[other.id]["free"], "1111111")
+
+    def test_availability_validates_range_and_target(self):
+        bad_range = self.client.get("/api/cowork/availability/", {"zone": self.space.zone, "from": "1405-02-01", "to": "1405-01-01"})
+        self.assertEqual(bad_range.status_code, 400)
+        missing_zone = self.client.get("/api/cowork/availability/", {"from": "1405-01-01", "to": "1405-01-02"})
+        self.assertEqual(missing_zone.status_code, 400)
+
     def test_preview_endpoint_returns_price(self):
         response = self.client.get(
             "/api/cowork/bookings/preview/",
@@ -32,6 +151,39 @@ class CoworkSPAApiTests(TestCase):
         self.assertTrue(response.data["valid"])
         self.assertIn("price", response.data)
 
+    def test_preview_is_served_from_pricing_matrix(self):
+        params = {"space_id": self.space.id, "booking_type": Booking.BookingType.MONTHLY, "start_time": "1405-01-01"}
+        self.client.get("/api/cowork/bookings/preview/", params)
+
+        with self.assertNumQueries(2):  # pricing version, then the overlap check in Booking.clean
+            response = self.client.get("/api/cowork/bookings/preview/", params)
+        self.assertEqual(response.data["price"], 3000000)
+        self.assertEqual(response.data["end_time"], "1405-01-31")
+
+        plan = self.space.pricing_plan
+        plan.monthly_rate = 3500000
+        plan.save()
+        self.assertEqual(self.client.get("/api/cowork/bookings/preview/", params).data["price"], 3500000)
+
+        hourly = self.client.get("/api/cowork/bookings/preview/", {**params, "booking_type": Booking.BookingType.HOURLY})
+        self.assertEqual(hourly.status_code, 400)
+        self.assertIn("booking_type", hourly.data["errors"])
+
+    def test_preview_rejects_overlapping_booking(self):
+        BookingFactory(
+            space=self.space,
+            booking_type=Booking.BookingType.MONTHLY,
+            start_time=jdatetime.date(1405, 1, 10),
+            end_time=jdatetime.date(1405, 2, 10),
+            status=Booking.Status.CONFIRMED,
+        )
+        params = {"space_id": self.space.id, "booking_type": Booking.BookingType.MONTHLY, "start_time": "1405-01-01"}
+
+        response = self.client.get("/api/cowork/bookings/preview/", params)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data["valid"])
+        self.assertEqual(response.data["errors"], {"__all__": ["This space is already booked for the selected time."]})
+
     def test_preview_requires_space_id_and_valid_payload(self):
         missing_space = self.client.get("/api/cowork/bookings/preview/")
         self.assertEqual(missing_space.status_code, 400)
@@ -88,6 +240,100 @@ class CoworkSPAApiTests(TestCase):
         self.assertEqual(list_response.status_code, 200)
         self.assertEqual(len(list_response.data["bookings"]), 1)
 
+    def test_create_booking_is_idempotent_per_key(self):
+        self.client.force_authenticate(user=self.user)
+        payload = {
+            "space_id": self.space.id,
+            "booking_type": Booking.BookingType.DAILY,
+            "start_time": self.start_date,
+        }
+        first = self.client.post("/api/cowork/bookings/", payload, format="json", HTTP_IDEMPOTENCY_KEY="booking-1")
+        retry = self.client.post("/api/cowork/bookings/", payload, format="json", HTTP_IDEMPOTENCY_KEY="booking-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.data["booking"]["id"], first.data["booking"]["id"])
+        self.assertEqual(Booking.objects.filter(user=self.user).count(), 1)
+
     def test_my_bookings_requires_authentication(self):
         response = self.client.get("/api/cowork/my-bookings/")
         self.assertIn(response.status_code, [401, 403])
+
+
+class CoworkStaffBulkBookingsAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = UserFactory()
+        admin_group, _ = Group.objects.get_or_create(name="Admin")
+        self.admin.groups.add(admin_group)
+        self.customer = UserFactory()
+        self.desks = [SpaceFactory(zone=Space.ZoneType.DESK) for _ in range(3)]
+        self.client.force_authenticate(user=self.admin)
+
+    def _payload(self, spaces, start_time="1405-02-01"):
+        return {
+            "phone_number": self.customer.phone_number,
+            "confirm": True,
+            "bookings": [
+                {"space_id": space.id, "booking_type": Booking.BookingType.MONTHLY, "start_time": start_time}
+                for space in spaces
+            ],
+        }
+
+    def test_bulk_create_confirms_all_bookings(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/cowork/staff/bookings/bulk/", self._payload(self.desks), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["bookings"]), 3)
+        bookings = Booking.objects.filter(user=self.customer)
+        self.assertEqual(bookings.filter(status=Booking.Status.CONFIRMED).count(), 3)
+        self.assertEqual(bookings.first().price_charged, 3000000)
+
+    def test_bulk_create_prices_from_current_plans_under_space_locks(self):
+        # A queryset update skips the signals that invalidate cached pricing.
+        PricingPlan.objects.filter(id=self.desks[0].pricing_plan_id).update(monthly_rate=3200000)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/cowork/staff/bookings/bulk/", self._payload(self.desks[:1]), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Booking.objects.get(user=self.customer).price_charged, 3200000)
+        sql = [query["sql"] for query in ctx.captured_queries]
+        lock = next(index for index, query in enumerate(sql) if 'UPDATE "cowork_space"' in query or "FOR UPDATE" in query)
+        conflict_check = next(index for index, query in enumerate(sql) if query.startswith("SELECT") and '"cowork_booking"' in query)
+        self.assertLess(lock, conflict_check)
+
+    def test_bulk_create_rejects_overlaps_without_writing(self):
+        BookingFactory(space=self.desks[0], start_time=jdatetime.date(1405, 2, 10), end_time=jdatetime.date(1405, 2, 12))
+        existing_conflict = self.client.post("/api/cowork/staff/bookings/bulk/", self._payload(self.desks), format="json")
+        self.assertEqual(existing_conflict.status_code, 409)
+        self.assertEqual([error["index"] for error in existing_conflict.data["errors"]], [0])
+
+        duplicate = self.client.post("/api/cowork/staff/bookings/bulk/", self._payload([self.desks[1], self.desks[1]]), format="json")
+        self.assertEqual(duplicate.status_code, 409)
+        self.assertFalse(Booking.objects.filter(user=self.customer).exists())
+
+    def test_bulk_create_requires_admin(self):
+        self.client.force_authenticate(user=self.customer)
+        response = self.client.post("/api/cowork/staff/bookings/bulk/", self._payload(self.desks), format="json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_approve_bookings_skips_overlaps(self):
+        start = jdatetime.date(1405, 3, 1)
+        cancelled = BookingFactory(
+            space=self.desks[0], start_time=start, end_time=start + timedelta(days=2), status=Booking.Status.CANCELLED
+        )
+        BookingFactory(space=self.desks[0], start_time=start, end_time=start + timedelta(days=5))
+        pending = BookingFactory(
+            space=self.desks[1], start_time=start, end_time=start + timedelta(days=2), status=Booking.Status.PENDING_PAYMENT
+        )
+
+        approved, conflicting = approve_bookings(Booking.objects.filter(id__in=[cancelled.id, pending.id]))
+
+        self.assertEqual(approved, 1)
+        self.assertEqual(conflicting, [cancelled])
+        cancelled.refresh_from_db()
+        pending.refresh_from_db()
+        self.assertEqual(cancelled.status, Booking.Status.CANCELLED)
+        self.assertEqual(pending.status, Booking.Status.CONFIRMED)
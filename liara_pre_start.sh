@@ -2,4 +2,5 @@
 set -e
 
 python manage.py migrate --noinput
+python manage.py rebuild_rollups --if-empty
 python manage.py collectstatic --noinput
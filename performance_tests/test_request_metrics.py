@@ -0,0 +1,49 @@
+import json
+
+from django.test import TestCase, override_settings
+
+from config import request_metrics
+
+
+@override_settings(REQUEST_METRICS_SAMPLE_RATE=1.0, REQUEST_METRICS_FLUSH_SECONDS=3600, REQUEST_METRICS_SERVER_TIMING=True)
+class RequestMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        request_metrics.reset()
+
+    def test_server_timing_log_line_and_route_aggregate(self):
+        with self.assertLogs("config.request_metrics", level="INFO") as logs:
+            response = self.client.get("/api/blog/posts/", {"page_size": 5})
+        self.assertEqual(response.status_code, 200)
+
+        timing = response["Server-Timing"]
+        self.assertIn("app;dur=", timing)
+        self.assertIn("render;dur=", timing)
+
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(entry["request_id"], response["X-Request-ID"])
+        self.assertEqual(entry["route"], "api/blog/posts/")
+        self.assertEqual(entry["response_bytes"], len(response.content))
+        self.assertIn(f'db;dur={entry["db_ms"]:.1f};desc="{entry["queries"]} queries"', timing)
+
+        self.client.get("/api/blog/posts/")
+        stats = request_metrics.route_stats()["GET api/blog/posts/"]
+        self.assertEqual(stats["count"], 2)
+        self.assertEqual(stats["statuses"], {"200": 2})
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=False)
+    def test_server_timing_header_can_be_turned_off(self):
+        response = self.client.get("/api/blog/posts/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(request_metrics.route_stats()["GET api/blog/posts/"]["count"], 1)
+
+    def test_summaries_are_logged_when_the_flush_interval_passes(self):
+        with override_settings(REQUEST_METRICS_SAMPLE_RATE=0.0, REQUEST_METRICS_FLUSH_SECONDS=0):
+            client = self.client_class()
+            with self.assertLogs("config.request_metrics", level="INFO") as logs:
+                client.get("/api/blog/posts/missing-post/")
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        entry = next(entry for entry in entries if entry["event"] == "route_summary")
+        self.assertEqual(entry["route"], "GET api/blog/posts/<slug:slug>/")
+        self.assertEqual(entry["statuses"], {"404": 1})
+        self.assertEqual(request_metrics.route_stats(), {})